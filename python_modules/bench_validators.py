@@ -0,0 +1,174 @@
+# bench_validators.py
+"""
+Benchmark the requirement validators against local_index_server.py.
+
+For each requirements size (default 10, 100 and 1000 lines) a synthetic index
+and requirements.txt are generated, then every validator is run cold (no
+verdict cache) and warm (cache from the cold run). Reported per run:
+wall time, index requests issued, bytes transferred, and the verdict mix.
+
+    python bench_validators.py
+    python bench_validators.py --sizes 10 100 --latency 0.02 --error-rate 0.05
+    python bench_validators.py --deps --json results.json
+    python bench_validators.py --certfile cert.pem --keyfile key.pem --tls-failure 0.1
+
+With a self-signed certificate every fetch goes through the validators'
+insecure-SSL fallback, which is the path corporate TLS proxies exercise.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from local_index_server import LocalIndexServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+VALIDATORS = {
+    "withOUT-packaging": "py_VENV-Manager_Validate-Requirements_withOUT-packaging-module.py",
+    "with-packaging": "py_VENV-Manager_Validate-Requirements_with-packaging-module.py",
+}
+
+
+def make_fixtures(count):
+    """
+    count projects, each with three releases covering the verdicts the
+    validators distinguish: universal wheel (2.0.0), wheel for another
+    interpreter plus sdist (1.1.0), sdist only (1.0.0).
+    Every fifth project depends on its successor so --deps has a graph to walk.
+    """
+    fixtures = {}
+    for i in range(count):
+        name = f"benchpkg{i:04d}"
+        dep = [f"benchpkg{i + 1:04d}>=1.0"] if i % 5 == 0 and i + 1 < count else []
+        fixtures[name] = {
+            "1.0.0": {"files": [f"{name}-1.0.0.tar.gz"]},
+            "1.1.0": {"files": [f"{name}-1.1.0-py2-none-any.whl", f"{name}-1.1.0.tar.gz"]},
+            "2.0.0": {
+                "requires_python": ">=3.7",
+                "requires_dist": dep,
+                "files": [f"{name}-2.0.0-py3-none-any.whl", f"{name}-2.0.0.tar.gz"],
+            },
+        }
+    return fixtures
+
+
+def make_requirements(count):
+    """One line per fixture project, rotating through pins, ranges, markers and misses."""
+    lines = ["# generated by bench_validators.py"]
+    for i in range(count):
+        name = f"benchpkg{i:04d}"
+        kind = i % 6
+        if kind == 0:
+            lines.append(f"{name}==2.0.0")
+        elif kind == 1:
+            lines.append(f"{name}>=1.0,<2")
+        elif kind == 2:
+            lines.append(f"{name}==1.0.0")
+        elif kind == 3:
+            lines.append(f"{name}~=2.0")
+        elif kind == 4:
+            lines.append(f'{name}==2.0.0 ; python_version < "3"')
+        else:
+            lines.append(f"{name}==9.9.9")
+    return "\n".join(lines) + "\n"
+
+
+def load_validator(label, filename, index_url, cafile=None):
+    path = os.path.join(HERE, filename)
+    spec = importlib.util.spec_from_file_location(f"bench_{label.replace('-', '_')}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.PYPI_URL = index_url
+    module.PYPI_JSON_URL = index_url + "/pypi/{}/json"
+    module.PYPI_RELEASE_JSON_URL = index_url + "/pypi/{}/{}/json"
+    if cafile:
+        import ssl
+        module._default_ctx = module.default_context = ssl.create_default_context(cafile=cafile)
+    return module
+
+
+def verdict_mix(output):
+    mix = {}
+    for line in str(output).splitlines():
+        mark = line[:1] if line else ""
+        if mark in "✅⚠❌⏭ℹ":
+            mix[mark] = mix.get(mark, 0) + 1
+    return mix
+
+
+def run_once(module, project_dir, server, check_deps):
+    before = server.stats.snapshot()
+    start = time.perf_counter()
+    output = module.python_main(project_dir, True, check_deps)
+    elapsed = time.perf_counter() - start
+    after = server.stats.snapshot()
+    return {
+        "seconds": round(elapsed, 4),
+        "requests": after["requests"] - before["requests"],
+        "bytes": after["bytes_sent"] - before["bytes_sent"],
+        "errors": after["errors"] - before["errors"],
+        "tls_failures": after["tls_failures"] - before["tls_failures"],
+        "verdicts": verdict_mix(output),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--validators", nargs="+", choices=sorted(VALIDATORS), default=sorted(VALIDATORS))
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per index request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tls-failure", type=float, default=0.0)
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    parser.add_argument("--cafile", help="trust this CA instead of taking the insecure fallback")
+    parser.add_argument("--deps", action="store_true", help="also run the dependency-closure check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_validators_")
+    try:
+        for size in args.sizes:
+            fixtures = make_fixtures(size)
+            with LocalIndexServer(fixtures, latency=args.latency, error_rate=args.error_rate,
+                                  tls_failure=args.tls_failure, certfile=args.certfile,
+                                  keyfile=args.keyfile, seed=args.seed) as server:
+                for label in args.validators:
+                    module = load_validator(label, VALIDATORS[label], server.url, args.cafile)
+                    if hasattr(module, "PLATFORM_TAGS") and module.python_init(workdir, True) != "init":
+                        print(f"⏭️ {label}: packaging not importable, skipped")
+                        continue
+                    project_dir = os.path.join(workdir, f"{label}-{size}")
+                    os.makedirs(project_dir, exist_ok=True)
+                    with open(os.path.join(project_dir, "requirements.txt"), "w", encoding="utf-8") as f:
+                        f.write(make_requirements(size))
+                    cache_path = os.path.join(project_dir, module.CACHE_FILENAME)
+                    if os.path.exists(cache_path):
+                        os.remove(cache_path)
+                    for phase in ("cold", "warm"):
+                        row = {"validator": label, "lines": size, "phase": phase}
+                        row.update(run_once(module, project_dir, server, args.deps))
+                        results.append(row)
+                        mix = " ".join(f"{k}{v}" for k, v in sorted(row["verdicts"].items()))
+                        print(f"{label:<18} {size:>5} lines  {phase:<4}  {row['seconds']:>8.3f}s  "
+                              f"{row['requests']:>5} req  {row['bytes'] / 1024:>9.1f} KiB  "
+                              f"{row['errors']:>3} err  {row['tls_failures']:>3} tls  {mix}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
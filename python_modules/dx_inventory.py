@@ -0,0 +1,237 @@
+"""
+Installed-distribution inventory via importlib.metadata, without running pip.
+
+'pip list' starts a new interpreter, imports pip and re-reads every METADATA
+file on each call. Here each sys.path entry (or venv site-packages) is scanned
+once and remembered together with the directory's mtime; installing or
+removing a distribution adds or deletes a *.dist-info folder, which bumps that
+mtime, so only changed directories are read again on the next call.
+
+plan_uninstall() uses the same dependency graph to find what removing some
+distributions leaves orphaned: dependencies nothing else installed needs.
+
+Bundle for injection like any other helper:
+    python generator.py dx_inventory.py > dx_inventory_gz64.txt
+"""
+
+import os
+import re
+import sys
+import glob
+from collections import namedtuple
+from importlib import metadata
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ImportError:  # marker evaluation falls back to a plain 'extra' check
+    Requirement = None
+
+# requested: pip's REQUESTED marker is present (installed by name, not as a dependency)
+Distribution = namedtuple("Distribution", "name key version location requires requested")
+
+PROTECTED = ("pip", "setuptools", "wheel")  # never pruned as orphans
+_SCAN_CACHE = {}    # directory -> (mtime_ns, [Distribution, ...])
+_REQ_NAME_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def site_packages(venv_path):
+    """site-packages folder(s) of a venv on disk (Windows or POSIX layout)."""
+    found = [os.path.join(venv_path, "Lib", "site-packages")] if sys.platform == "win32" else []
+    found += sorted(glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")))
+    return [p for p in found if os.path.isdir(p)]
+
+
+def _read_directory(path):
+    dists = []
+    for dist in metadata.distributions(path=[path]):
+        try:
+            name = dist.metadata["Name"]
+            version = dist.version
+        except Exception:
+            continue  # half-removed or corrupt metadata; pip list skips these too
+        if not name or not version:
+            continue
+        requested = dist.read_text("REQUESTED") is not None
+        dists.append(Distribution(name, canonical_name(name), version, path, tuple(dist.requires or ()), requested))
+    return dists
+
+
+def _scan(path):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _SCAN_CACHE.pop(path, None)
+        return []
+    cached = _SCAN_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    dists = _read_directory(path)
+    _SCAN_CACHE[path] = (mtime, dists)
+    return dists
+
+
+def installed_distributions(paths=None):
+    """
+    Distributions importable from paths (default: sys.path), first one wins
+    when a name appears in several directories, as with imports.
+    Returns {canonical name: Distribution}.
+    """
+    found = {}
+    for path in (sys.path if paths is None else paths):
+        path = os.path.abspath(path or os.getcwd())
+        if not os.path.isdir(path):
+            continue
+        for dist in _scan(path):
+            found.setdefault(dist.key, dist)
+    return found
+
+
+def installed_pins(paths=None, exclude=()):
+    """Sorted (name, version) pairs, skipping names in exclude (any spelling)."""
+    skip = {canonical_name(n) for n in exclude}
+    dists = installed_distributions(paths)
+    return [(d.name, d.version) for key, d in sorted(dists.items()) if key not in skip]
+
+
+def _dependency_name(text):
+    """
+    Canonical name a Requires-Dist entry pulls in for a plain install, or None
+    when it is gated behind an extra or its marker is false here. Extras are
+    treated as not requested: a package installed for 'foo[bar]' then stays
+    top-level, which keeps it in the output instead of silently dropping it.
+    """
+    if Requirement is not None:
+        try:
+            req = Requirement(text)
+        except InvalidRequirement:
+            return None
+        if req.marker is not None and not req.marker.evaluate({"extra": ""}):
+            return None
+        return canonical_name(req.name)
+    requirement, _, marker = text.partition(";")
+    if re.search(r"\bextra\b", marker):
+        return None
+    m = _REQ_NAME_RX.match(requirement)
+    return canonical_name(m.group(1)) if m else None
+
+
+def dependency_graph(dists=None):
+    """{canonical name: set of installed canonical names it requires}."""
+    if dists is None:
+        dists = installed_distributions()
+    graph = {}
+    for key, dist in dists.items():
+        deps = (_dependency_name(r) for r in dist.requires)
+        graph[key] = {d for d in deps if d in dists and d != key}
+    return graph
+
+
+def top_level(dists=None, exclude=()):
+    """
+    Distributions nothing else installed depends on, plus those pip marked as
+    explicitly requested (e.g. numpy installed by name next to opencv-python,
+    which also requires it), sorted by name. A venv built from a full pin list
+    has every pin marked, so all of them stay. Packages in exclude neither
+    appear nor count as parents.
+    Members of a dependency cycle with no outside parent are still covered:
+    one of them is promoted so every remaining distribution is reachable.
+    """
+    if dists is None:
+        dists = installed_distributions()
+    skip = {canonical_name(n) for n in exclude}
+    graph = {k: deps - skip for k, deps in dependency_graph(dists).items() if k not in skip}
+    required = set().union(*graph.values()) if graph else set()
+    roots = sorted(k for k in graph if k not in required or dists[k].requested)
+
+    reached = set()
+    stack = list(roots)
+    while True:
+        while stack:
+            key = stack.pop()
+            if key not in reached:
+                reached.add(key)
+                stack.extend(graph[key] - reached)
+        unreached = sorted(set(graph) - reached)
+        if not unreached:
+            break
+        roots.append(unreached[0])
+        stack.append(unreached[0])
+    return [dists[k] for k in sorted(roots)]
+
+
+def plan_uninstall(names, dists=None, protected=PROTECTED):
+    """
+    What uninstalling names (any spelling, version specifiers ignored) removes
+    when their orphaned dependencies go too. A dependency is orphaned when
+    nothing outside the removal set still requires it, directly or through
+    other dependencies; protected names and distributions pip marked as
+    explicitly requested are never orphaned.
+    Returns {"remove": [Distribution] (requested), "orphans": [Distribution],
+             "kept": [(Distribution, [names still requiring it])],
+             "broken": [(requested Distribution, [names still requiring it])], "missing": [names]}.
+    """
+    if dists is None:
+        dists = installed_distributions()
+    graph = dependency_graph(dists)
+    targets, missing = set(), []
+    for name in names:
+        m = _REQ_NAME_RX.match(name)
+        key = canonical_name(m.group(1)) if m else canonical_name(name)
+        if key in dists:
+            targets.add(key)
+        else:
+            missing.append(name)
+
+    # Every dependency reachable from the targets may become an orphan ...
+    candidates = set()
+    stack = [d for t in targets for d in graph[t]]
+    while stack:
+        key = stack.pop()
+        if key not in candidates and key not in targets:
+            candidates.add(key)
+            stack.extend(graph[key])
+    # ... unless it is reachable from what stays installed
+    kept = set()
+    stack = [k for k in dists if k not in targets and k not in candidates]
+    stack += [canonical_name(p) for p in protected if canonical_name(p) in candidates]
+    stack += [k for k in candidates if dists[k].requested]  # installed by name, as top_level() treats them
+    while stack:
+        key = stack.pop()
+        if key not in kept and key not in targets:
+            kept.add(key)
+            stack.extend(graph[key])
+    removal = targets | (candidates - kept)
+
+    def requirers(key):
+        return sorted(dists[k].name for k, deps in graph.items() if key in deps and k not in removal)
+
+    return {"remove": [dists[k] for k in sorted(targets)],
+            "orphans": [dists[k] for k in sorted(candidates - kept)],
+            "kept": [(dists[k], requirers(k)) for k in sorted(candidates & kept)],
+            "broken": [(dists[k], requirers(k)) for k in sorted(targets) if requirers(k)],
+            "missing": missing}
+
+
+def _kept_reason(dist, parents):
+    if parents:
+        return f"still needed by {', '.join(parents)}"
+    return "explicitly installed" if dist.requested else "protected"
+
+
+def format_uninstall_plan(plan):
+    lines = [f"[Uninstall] Plan: {len(plan['remove'])} requested, {len(plan['orphans'])} orphaned "
+             f"dependencies, {len(plan['kept'])} dependencies kept"]
+    lines += [f"  - {d.name}=={d.version}" for d in plan["remove"]]
+    lines += [f"  - {d.name}=={d.version} (orphaned)" for d in plan["orphans"]]
+    lines += [f"  = {d.name}=={d.version} ({_kept_reason(d, parents)})" for d, parents in plan["kept"]]
+    lines += [f"  ! {d.name} is still required by {', '.join(parents)}" for d, parents in plan["broken"]]
+    lines += [f"  ? {name} (not installed)" for name in plan["missing"]]
+    return "\n".join(lines)
+
+
+def clear_cache():
+    _SCAN_CACHE.clear()
@@ -0,0 +1,243 @@
+"""
+Hash pins for requirements.txt, for use with pip's --require-hashes mode.
+
+Digests for name==version are taken, in order, from:
+  1. a wheelhouse folder: sha256 of the local wheels/sdists of that release
+  2. HASH_CACHE_FILENAME: file digests recorded on an earlier run
+  3. the index release JSON (/pypi/<name>/<version>/json), whose "urls"
+     list the sha256 of every published file of the release
+
+Only the files pip would pick for the running (Pythoner) interpreter are
+locked: the wheels whose tags match its sys_tags() (from packaging, or the
+copy vendored in pip), or the sdist when no wheel matches. Without either
+packaging every file of the release is locked, as before.
+
+Published files never change, so index digests are cached per file without
+expiry; wheelhouse digests are cached per (path, size, mtime).
+
+A pin without digests makes the whole file uninstallable (one hashed line
+puts pip in hash-checking mode), so format_hashed_pin refuses to write one.
+
+Bundle for injection like any other helper:
+    python generator.py dx_lockfile.py > dx_lockfile_gz64.txt
+"""
+
+import os
+import re
+import json
+import ssl
+import hashlib
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+PYPI_URL = os.environ.get("DX_PYPI_URL", "https://pypi.org").rstrip("/")
+PYPI_RELEASE_JSON_URL = PYPI_URL + "/pypi/{}/{}/json"
+HASH_CACHE_FILENAME = ".requirements_hash_cache.json"
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 30
+
+_default_ctx = ssl.create_default_context()
+_DIST_EXTENSIONS = (".whl", ".tar.gz", ".zip")
+_SUPPORTED_TAGS = None  # set of (interpreter, abi, platform) for this interpreter, or False if unknown
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _dist_name_version(filename):
+    """(canonical name, version) for a wheel or sdist filename, or None."""
+    lower = filename.lower()
+    if lower.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        if len(parts) in (5, 6):
+            return canonical_name(parts[0]), parts[1]
+        return None
+    for ext in (".tar.gz", ".zip"):
+        if lower.endswith(ext):
+            name, sep, version = filename[:-len(ext)].rpartition("-")
+            return (canonical_name(name), version) if sep else None
+    return None
+
+
+def supported_tags():
+    """Wheel tags this interpreter accepts, or None when packaging is not available."""
+    global _SUPPORTED_TAGS
+    if _SUPPORTED_TAGS is None:
+        _SUPPORTED_TAGS = False
+        for module in ("packaging.tags", "pip._vendor.packaging.tags"):
+            try:
+                tags = __import__(module, fromlist=["sys_tags"])
+                _SUPPORTED_TAGS = {(t.interpreter, t.abi, t.platform) for t in tags.sys_tags()}
+                break
+            except Exception:
+                continue
+    return _SUPPORTED_TAGS or None
+
+
+def _wheel_tags(filename):
+    """Expanded (interpreter, abi, platform) set of a wheel filename (compressed tag sets allowed)."""
+    parts = filename[:-4].split("-")
+    if len(parts) not in (5, 6):
+        return set()
+    py, abi, plat = (p.lower() for p in parts[-3:])
+    return {(i, a, p) for i in py.split(".") for a in abi.split(".") for p in plat.split(".")}
+
+
+def select_digests(files, tags=None):
+    """
+    Digests of the files pip would install here, from {filename: sha256}:
+    the compatible wheels, else the sdists. All files when tags are unknown.
+    """
+    tags = supported_tags() if tags is None else tags
+    if not tags:
+        return sorted(set(files.values()))
+    wheels = {d for f, d in files.items() if f.lower().endswith(".whl") and _wheel_tags(f) & tags}
+    if wheels:
+        return sorted(wheels)
+    return sorted({d for f, d in files.items() if f.lower().endswith((".tar.gz", ".zip"))})
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_hash_cache(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, HASH_CACHE_FILENAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == 1:
+            return {"index": data.get("index", {}), "files": data.get("files", {})}
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"index": {}, "files": {}}
+
+
+def save_hash_cache(cache_dir, cache):
+    """Atomic write; a read-only project folder just means no cache."""
+    path = os.path.join(cache_dir, HASH_CACHE_FILENAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, **cache}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def wheelhouse_hashes(wheelhouse, cache=None):
+    """
+    {(canonical name, version): {filename: sha256}} for every dist in the folder.
+    Files whose size and mtime match the cache are not re-read.
+    """
+    found = {}
+    files_cache = cache["files"] if cache is not None else {}
+    try:
+        entries = list(os.scandir(wheelhouse))
+    except OSError:
+        return found
+    for entry in entries:
+        if not entry.is_file() or not entry.name.lower().endswith(_DIST_EXTENSIONS):
+            continue
+        key = _dist_name_version(entry.name)
+        if key is None:
+            continue
+        st = entry.stat()
+        cached = files_cache.get(entry.path)
+        if cached and cached.get("size") == st.st_size and cached.get("mtime") == st.st_mtime:
+            digest = cached["sha256"]
+        else:
+            try:
+                digest = _sha256_file(entry.path)
+            except OSError:
+                continue
+            files_cache[entry.path] = {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest}
+        found.setdefault(key, {})[entry.name] = digest
+    return found
+
+
+def _fetch_release_json(url):
+    try:
+        with urllib.request.urlopen(url, context=_default_ctx, timeout=FETCH_TIMEOUT) as resp:
+            return json.load(resp)
+    except urllib.error.URLError as e:
+        # Same insecure fallback the validators use for broken cert stores
+        if isinstance(getattr(e, "reason", None), ssl.SSLError):
+            with urllib.request.urlopen(url, context=ssl._create_unverified_context(),
+                                        timeout=FETCH_TIMEOUT) as resp:
+                return json.load(resp)
+        raise
+
+
+def index_hashes(name, version):
+    """
+    sha256 of every file the index publishes for name==version.
+    Returns ({filename: digest}, error message or None).
+    """
+    try:
+        data = _fetch_release_json(PYPI_RELEASE_JSON_URL.format(name, version))
+    except Exception as e:
+        return {}, f"{name}=={version}: {e}"
+    files = {f.get("filename"): f.get("digests", {}).get("sha256") for f in data.get("urls") or []}
+    files = {f: d for f, d in files.items() if f and d}
+    if not files:
+        return {}, f"{name}=={version}: index lists no files"
+    return files, None
+
+
+def lock_hashes(pins, cache_dir, wheelhouse=None):
+    """
+    Resolve digests for a list of (name, version) pins.
+    Returns ({(name, version): sorted digests}, [error messages]); a pin
+    with an error is not in the dict.
+    Pins found in the wheelhouse are locked to the local files only, so
+    'pip install --no-index --find-links <wheelhouse>' verifies cleanly.
+    """
+    cache = load_hash_cache(cache_dir)
+    local = wheelhouse_hashes(wheelhouse, cache) if wheelhouse else {}
+    files, missing, errors = {}, [], []
+    for name, version in pins:
+        key = (canonical_name(name), version)
+        cached = cache["index"].get(f"{key[0]}=={version}")
+        if key in local:
+            files[(name, version)] = local[key]
+        elif isinstance(cached, dict):  # older caches kept a bare digest list without filenames
+            files[(name, version)] = cached
+        else:
+            missing.append((name, version))
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(missing))) as pool:
+            fetched = list(pool.map(lambda pin: index_hashes(*pin), missing))
+        for (name, version), (found, error) in zip(missing, fetched):
+            if error:
+                errors.append(error)
+                continue
+            cache["index"][f"{canonical_name(name)}=={version}"] = found
+            files[(name, version)] = found
+    save_hash_cache(cache_dir, cache)
+
+    result = {}
+    for pin, found in files.items():
+        digests = select_digests(found)
+        if digests:
+            result[pin] = digests
+        else:
+            errors.append(f"{pin[0]}=={pin[1]}: no file of this release installs on this interpreter")
+    return result, errors
+
+
+def format_hashed_pin(name, version, digests):
+    """
+    'name==version \\' followed by one indented --hash line per digest.
+    Raises ValueError without digests: pip would reject the whole file.
+    """
+    if not digests:
+        raise ValueError(f"{name}=={version} has no hashes")
+    hashes = " \\\n".join(f"    --hash=sha256:{d}" for d in digests)
+    return f"{name}=={version} \\\n{hashes}\n"
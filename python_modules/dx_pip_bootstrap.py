@@ -0,0 +1,236 @@
+"""
+Policy for Stage 2 of venv creation (pip upgrading itself).
+
+'pip install --upgrade pip' asks the index every time, even when the pip
+virtualenv seeded is already current, and fails slowly when offline. Here the
+installed pip version is read from the venv's metadata (no subprocess) and
+compared with a known-good version:
+
+    1. the newest pip wheel in the shared wheelhouse, if any: upgrade offline
+       from it when the venv's pip is older
+    2. else the newest release on the index whose Requires-Python accepts
+       the venv's Python (read from pyvenv.cfg), cached per Python version in
+       KNOWN_GOOD_FILENAME for CACHE_TTL seconds (a stale cache is still used
+       when the index is unreachable); it only decides whether to upgrade,
+       the upgrade itself is unpinned so pip picks the release
+    3. nothing known: keep the installed pip unless it is older than MIN_PIP,
+       the oldest pip whose features (--report) the venv scripts rely on
+
+Policies: "auto" (the above), "always" (old behaviour), "never".
+
+Bundle for injection like any other helper:
+    python generator.py dx_pip_bootstrap.py > dx_pip_bootstrap_gz64.txt
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import platform
+from importlib import metadata
+from urllib.request import urlopen
+
+try:
+    from packaging.version import Version, InvalidVersion
+    from packaging.specifiers import SpecifierSet, InvalidSpecifier
+except ImportError:  # numeric comparison of the release segment
+    Version = None
+
+MIN_PIP = "22.2"
+CACHE_TTL = 7 * 24 * 3600
+INDEX_TIMEOUT = 3.0
+KNOWN_GOOD_FILENAME = "pip_known_good.json"
+POLICIES = ("auto", "always", "never")
+_PIP_WHEEL_RX = re.compile(r"^pip-([0-9][^-]*)-py3-none-any\.whl$", re.IGNORECASE)
+_FINAL_RX = re.compile(r"^\d+(\.\d+)*$")
+_CLAUSE_RX = re.compile(r"^\s*(~=|===?|!=|<=|>=|<|>)\s*([0-9][0-9.]*?)(\.\*)?\s*$")
+
+
+def _version_key(text):
+    if Version is not None:
+        try:
+            return Version(text)
+        except InvalidVersion:
+            pass
+    return tuple(int(p) for p in re.findall(r"\d+", text.split("+")[0])[:4])
+
+
+def is_older(installed, target):
+    try:
+        return _version_key(installed) < _version_key(target)
+    except TypeError:  # mixed Version/tuple after a parse failure
+        return installed != target
+
+
+def _release(text):
+    return tuple(int(p) for p in re.findall(r"\d+", text.split("+")[0])[:4])
+
+
+def requires_python_ok(requires_python, python_version):
+    """True if python_version (e.g. "3.11.7") satisfies a Requires-Python string; unparsable means yes."""
+    if not requires_python:
+        return True
+    if Version is not None:
+        try:
+            return SpecifierSet(requires_python).contains(python_version, prereleases=True)
+        except (InvalidSpecifier, InvalidVersion):
+            return True
+    current = _release(python_version)
+    for clause in requires_python.split(","):
+        m = _CLAUSE_RX.match(clause)
+        if not m:
+            continue
+        op, text, wildcard = m.groups()
+        want = _release(text)
+        if wildcard:
+            if (current[:len(want)] == want) != (op != "!="):
+                return False
+            continue
+        size = max(len(current), len(want))
+        a, b = current + (0,) * (size - len(current)), want + (0,) * (size - len(want))
+        ok = {"==": a == b, "===": a == b, "!=": a != b, "<=": a <= b, ">=": a >= b, "<": a < b, ">": a > b,
+              "~=": a >= b and a[:len(want) - 1] == b[:len(want) - 1]}[op]
+        if not ok:
+            return False
+    return True
+
+
+def venv_python_version(venv_path):
+    """Python version a venv was made with (pyvenv.cfg), else the running one."""
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version_info", "version"):
+                    return ".".join(value.strip().split(".")[:3])
+    except OSError:
+        pass
+    return platform.python_version()
+
+
+def newest_compatible(release_json, python_version):
+    """Newest final, non-yanked pip release that installs on python_version, or None."""
+    releases = release_json.get("releases")
+    if not releases:
+        return release_json["info"]["version"]
+    best = None
+    for version, files in releases.items():
+        files = [f for f in files if not f.get("yanked")]
+        if not _FINAL_RX.match(version) or not files:
+            continue
+        if any(requires_python_ok(f.get("requires_python"), python_version) for f in files):
+            if best is None or is_older(best, version):
+                best = version
+    return best
+
+
+def _cache_dir():
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "TroikaTronix")
+    if platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Caches/TroikaTronix")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dx-venv")
+
+
+def installed_pip_version(venv_path):
+    """pip version installed in a venv on disk, or None."""
+    paths = [os.path.join(venv_path, "Lib", "site-packages")] if sys.platform == "win32" else []
+    paths += glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages"))
+    for dist in metadata.distributions(name="pip", path=[p for p in paths if os.path.isdir(p)]):
+        return dist.version
+    return None
+
+
+def wheelhouse_pip(wheelhouse):
+    """(version, path) of the newest pip wheel in the wheelhouse, or (None, None)."""
+    best = (None, None)
+    try:
+        names = os.listdir(wheelhouse)
+    except OSError:
+        return best
+    for name in names:
+        m = _PIP_WHEEL_RX.match(name)
+        if m and (best[0] is None or is_older(best[0], m.group(1))):
+            best = (m.group(1), os.path.join(wheelhouse, name))
+    return best
+
+
+def _load_known_good(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if data.get("version") == 1 else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def remember_known_good(version, python_version, cache_path=None):
+    cache_path = cache_path or os.path.join(_cache_dir(), KNOWN_GOOD_FILENAME)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "pip": version, "python": python_version, "checked": time.time()}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def known_good_version(python_version, cache_path=None, index_url=None):
+    """(version, source) for python_version from the cache or the index; (None, reason) if neither has one."""
+    cache_path = cache_path or os.path.join(_cache_dir(), KNOWN_GOOD_FILENAME)
+    cached = _load_known_good(cache_path)
+    if cached and cached.get("python") != python_version:
+        cached = None  # recorded for another interpreter
+    if cached and time.time() - cached.get("checked", 0) < CACHE_TTL:
+        return cached["pip"], "cached"
+    index_url = (index_url or os.environ.get("DX_PYPI_URL", "https://pypi.org")).rstrip("/")
+    try:
+        with urlopen(f"{index_url}/pypi/pip/json", timeout=INDEX_TIMEOUT) as resp:
+            newest = newest_compatible(json.load(resp), python_version)
+    except Exception as e:
+        if cached:
+            return cached["pip"], "cached (stale; index unreachable)"
+        return None, f"index unreachable ({type(e).__name__})"
+    if newest is None:
+        return None, f"no pip release on the index supports Python {python_version}"
+    remember_known_good(newest, python_version, cache_path)
+    return newest, "index"
+
+
+def plan_upgrade(venv_path, policy="auto", wheelhouse=None, cache_path=None, index_url=None):
+    """
+    Decide Stage 2. Returns (action, target, reason) with action one of
+    "skip", "wheelhouse" (install target from the wheelhouse) or "index".
+    """
+    installed = installed_pip_version(venv_path)
+    if policy == "never":
+        return "skip", installed, "pip upgrade disabled"
+    if policy == "always" or installed is None:
+        return "index", None, "upgrade always requested" if installed else "pip version unknown"
+
+    wh_version, _ = wheelhouse_pip(wheelhouse) if wheelhouse else (None, None)
+    if wh_version:
+        if is_older(installed, wh_version):
+            return "wheelhouse", wh_version, f"pip {installed} < {wh_version} in wheelhouse"
+        return "skip", installed, f"pip {installed} is current with the wheelhouse"
+
+    target, source = known_good_version(venv_python_version(venv_path), cache_path, index_url)
+    if target is None:
+        if is_older(installed, MIN_PIP):
+            return "index", None, f"pip {installed} < {MIN_PIP} and {source}"
+        return "skip", installed, f"pip {installed} kept; {source}"
+    if is_older(installed, target):
+        return "index", target, f"pip {installed} < {target} ({source})"
+    return "skip", installed, f"pip {installed} is current ({source})"
+
+
+def upgrade_command(python_path, action, target=None, wheelhouse=None):
+    """From the index pip is not pinned: pip itself picks the newest release this interpreter supports."""
+    cmd = [python_path, "-m", "pip", "install", "--disable-pip-version-check", "--upgrade"]
+    if action == "wheelhouse":
+        return cmd + ["--no-index", "--find-links", wheelhouse, f"pip=={target}"]
+    return cmd + ["pip"]
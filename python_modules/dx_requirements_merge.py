@@ -0,0 +1,174 @@
+"""
+Merge a freshly generated requirements.txt into the existing one instead of
+overwriting it, so hand-written comments, grouping, option lines and
+non-exact specifiers survive a regeneration.
+
+Rules, per requirement (matched by canonical name):
+  - pinned with == in the old file and still generated: the version (and any
+    --hash lines) are updated in place; extras, marker and trailing comment stay
+  - written with any other specifier: kept verbatim (a deliberate range),
+    except when the new file is hash-locked: then it is replaced by the new
+    hashed pin, since one unhashed line makes pip reject the whole file
+  - no longer generated: removed, together with its continuation lines
+  - newly generated: appended at the end, in generated order
+Generator header comments (timestamp, interpreter, platform) are refreshed in
+place; new option/comment lines (e.g. '-c constraints.txt') are inserted after
+the leading comment block when missing.
+
+Bundle for injection like any other helper:
+    python generator.py dx_requirements_merge.py > dx_requirements_merge_gz64.txt
+"""
+
+import re
+
+# Generator header line prefix -> header it stands for (either 'created' line replaces the other)
+HEADER_PREFIXES = {
+    "# Created with Pythoner running Python version": "created",
+    "# Created from python_modules imports with Python": "created",
+    "# Created on platform": "platform",
+    "# Timestamp:": "timestamp",
+}
+
+_NAME_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_PIN_RX = re.compile(r"^(\s*[A-Za-z0-9][A-Za-z0-9._-]*\s*(?:\[[^\]]*\])?\s*===?\s*)([^\s;#,\\]+)(.*)$")
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _parse(text):
+    """
+    Logical entries of a requirements file, in order:
+    ("req", canonical name, [physical lines]) or ("other", None, [line]).
+    Backslash continuations (e.g. --hash lines) stay with their requirement.
+    """
+    entries = []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        block = [lines[i]]
+        while block[-1].rstrip().endswith("\\") and i + 1 < len(lines):
+            i += 1
+            block.append(lines[i])
+        i += 1
+        first = block[0].strip()
+        m = _NAME_RX.match(first)
+        if first and not first.startswith(("#", "-")) and m:
+            entries.append(("req", canonical_name(m.group(1)), block))
+        else:
+            entries.append(("other", None, block))
+    return entries
+
+
+def _pinned_version(first_line):
+    m = _PIN_RX.match(first_line)
+    return m.group(2) if m else None
+
+
+def _header_prefix(line):
+    return next((h for p, h in HEADER_PREFIXES.items() if line.startswith(p)), None)
+
+
+def _update_pin(old_block, new_block):
+    """
+    Old first line with the new version; the new block's --hash lines, if any.
+    pip joins continuations before stripping comments, so a trailing comment
+    on a hashed requirement is moved to its own line above it.
+    """
+    new_version = _pinned_version(new_block[0])
+    m = _PIN_RX.match(old_block[0])
+    rest = m.group(3).rstrip()
+    if rest.endswith("\\"):
+        rest = rest[:-1].rstrip()
+    comment = ""
+    if "#" in rest:
+        rest, comment = rest[:rest.index("#")].rstrip(), rest[rest.index("#"):]
+    first = m.group(1) + new_version + rest
+    hash_lines = new_block[1:]
+    if hash_lines:
+        return ([comment] if comment else []) + [first + " \\"] + hash_lines
+    return [first + ("  " + comment if comment else "")]
+
+
+def merge_requirements(old_text, new_text):
+    """Returns (merged text, summary dict); see format_summary()."""
+    newline = "\r\n" if "\r\n" in old_text else "\n"
+    old_entries = _parse(old_text)
+    new_entries = _parse(new_text)
+    new_reqs = {key: block for kind, key, block in new_entries if kind == "req"}
+    new_headers = {_header_prefix(block[0]): block[0] for kind, _, block in new_entries
+                   if kind == "other" and _header_prefix(block[0])}
+    old_other = {block[0].strip() for kind, _, block in old_entries if kind == "other"}
+    old_prefixes = {_header_prefix(block[0]) for kind, _, block in old_entries if kind == "other"}
+
+    summary = {"added": [], "removed": [], "changed": [], "kept": [], "unchanged": 0}
+    merged, seen = [], set()
+    for kind, key, block in old_entries:
+        if kind == "other":
+            prefix = _header_prefix(block[0])
+            merged.extend([new_headers[prefix]] if prefix in new_headers else block)
+            continue
+        if key in seen:
+            merged.extend(block)  # duplicate entry: not ours to fix
+            continue
+        seen.add(key)
+        if key not in new_reqs:
+            summary["removed"].append(block[0].split("#")[0].strip().rstrip("\\").strip())
+            continue
+        old_version = _pinned_version(block[0])
+        new_version = _pinned_version(new_reqs[key][0])
+        if old_version is None and new_version is not None and any("--hash" in l for l in new_reqs[key]):
+            old_text, _, comment = block[0].partition("#")
+            old_text = old_text.strip().rstrip("\\").strip()
+            summary["changed"].append((key, old_text[_NAME_RX.match(old_text).end():].strip(), new_version))
+            # as in _update_pin, a trailing comment moves above the hashed requirement
+            comment = comment.rstrip().rstrip("\\").rstrip()
+            merged.extend(([f"#{comment}"] if comment.strip() else []) + new_reqs[key])
+            continue
+        if old_version is None or new_version is None:
+            summary["kept"].append(block[0].split("#")[0].strip().rstrip("\\").strip())
+            merged.extend(block)
+            continue
+        updated = _update_pin(block, new_reqs[key])
+        if old_version != new_version or updated != block:  # new version and/or new hashes
+            summary["changed"].append((key, old_version, new_version))
+        else:
+            summary["unchanged"] += 1
+        merged.extend(updated)
+
+    # Option/comment lines the generator now emits but the old file lacks
+    missing = [block[0] for kind, _, block in new_entries
+               if kind == "other" and block[0].strip() and block[0].strip() not in old_other
+               and _header_prefix(block[0]) not in old_prefixes - {None}]
+    for line in missing:
+        if _header_prefix(line):
+            # next to the other generator header lines
+            headers = [i for i, l in enumerate(merged) if _header_prefix(l)]
+            insert_at = headers[-1] + 1 if headers else 0
+        else:
+            # after the leading comment block
+            insert_at = 0
+            while insert_at < len(merged) and merged[insert_at].startswith("#"):
+                insert_at += 1
+        merged.insert(insert_at, line)
+
+    for kind, key, block in new_entries:
+        if kind == "req" and key not in seen:
+            seen.add(key)
+            summary["added"].append(block[0].rstrip("\\").strip())
+            merged.extend(block)
+
+    return newline.join(merged) + newline, summary
+
+
+def format_summary(summary, filename="requirements.txt"):
+    """One status line plus one line per change."""
+    lines = [f"Merged {filename}: +{len(summary['added'])} added, -{len(summary['removed'])} removed, "
+             f"~{len(summary['changed'])} changed, {len(summary['kept'])} kept (not ==), "
+             f"{summary['unchanged']} unchanged"]
+    lines += [f"  + {req}" for req in summary["added"]]
+    lines += [f"  - {req}" for req in summary["removed"]]
+    lines += [f"  ~ {name} {old} → {new}" if old != new else f"  ~ {name} {new} (hashes updated)"
+              for name, old, new in summary["changed"]]
+    return "\n".join(lines)
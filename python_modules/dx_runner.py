@@ -0,0 +1,316 @@
+"""
+Streaming subprocess runner shared by the venv scripts and the install /
+uninstall actors.
+
+  - output is read as it arrives (selectors on POSIX, a reader thread on
+    Windows, where pipes are not selectable) with an overall and an idle
+    timeout; only the last TAIL_LINES lines stay in memory, the full output is
+    appended to a log file on disk
+  - cancel() (from any thread) kills the running command and its children
+  - wall, user and sys time are recorded per named stage; user/sys are the
+    command's own CPU times (wait4 rusage on POSIX, GetProcessTimes on Windows)
+  - progress is reported as structured events to an optional callback:
+        {"event": "stage", "stage": ...}
+        {"event": "start", "stage": ..., "cmd": [...], "pid": ...}
+        {"event": "line", "stage": ..., "line": ...}
+        {"event": "end", "stage": ..., "returncode": ..., "wall": ..., "user": ..., "sys": ...}
+        {"event": "stage_end", "stage": ..., "wall": ..., "user": ..., "sys": ...}
+
+    runner = Runner(log_path="venv_creation.log", on_event=print)
+    with runner.stage("install"):
+        runner.run([python, "-m", "pip", "install", "-r", "requirements.txt"])
+    print(runner.timing_summary())
+
+Scripts with banner-style stages use runner.enter_stage(name) instead, which
+closes the previous stage; runner.finish_stage() closes the last one.
+
+Bundle for injection like any other helper:
+    python generator.py dx_runner.py > dx_runner_gz64.txt
+"""
+
+import os
+import sys
+import time
+import queue
+import signal
+import threading
+import selectors
+import subprocess
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+TAIL_LINES = 200
+POLL_INTERVAL = 0.2
+_READ_SIZE = 65536
+
+RunResult = namedtuple("RunResult", "returncode output log_path wall user sys")
+
+
+class RunCancelled(Exception):
+    pass
+
+
+def _creationflags():
+    return subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+def _windows_cpu_times(process):
+    """(user, sys) seconds of a finished Windows process, from its still-open handle."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+        times = [wintypes.FILETIME() for _ in range(4)]
+        ok = ctypes.windll.kernel32.GetProcessTimes(int(process._handle), *[ctypes.byref(t) for t in times])
+        if not ok:
+            return 0.0, 0.0
+        to_seconds = lambda ft: ((ft.dwHighDateTime << 32) | ft.dwLowDateTime) / 1e7
+        return to_seconds(times[3]), to_seconds(times[2])
+    except Exception:
+        return 0.0, 0.0
+
+
+class Runner:
+    """One build's worth of commands: shared log, tail, stage timings and cancel flag."""
+
+    def __init__(self, log_path=None, tail_lines=TAIL_LINES, on_event=None, echo=None):
+        self.log_path = log_path
+        self.tail = deque(maxlen=tail_lines)
+        self.on_event = on_event
+        self.echo = echo            # e.g. print; None keeps the monitor quiet
+        self.cancelled = threading.Event()
+        self.timings = {}           # stage -> {"wall", "user", "sys", "commands"}
+        self.current_stage = None
+        self._stage_started = None  # set while a stage opened by enter_stage() runs
+        self._run_tail = None
+        self._process = None
+        self._lock = threading.Lock()
+
+    # ---------- events / stages ----------
+
+    def _emit(self, event, **fields):
+        if self.on_event is not None:
+            fields["event"] = event
+            fields.setdefault("stage", self.current_stage)
+            try:
+                self.on_event(fields)
+            except Exception:
+                pass  # a broken progress callback must not break the build
+
+    def _add_time(self, stage, wall=0.0, user=0.0, sys_time=0.0, commands=0):
+        t = self.timings.setdefault(stage, {"wall": 0.0, "user": 0.0, "sys": 0.0, "commands": 0})
+        t["wall"] += wall
+        t["user"] += user
+        t["sys"] += sys_time
+        t["commands"] += commands
+
+    @contextmanager
+    def stage(self, name):
+        """Time everything run inside the block under name (wall from the block, CPU from its commands)."""
+        previous, self.current_stage = self.current_stage, name
+        self._add_time(name)
+        self._emit("stage")
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            wall = time.perf_counter() - started
+            self._add_time(name, wall=wall)
+            t = self.timings[name]
+            self._emit("stage_end", wall=t["wall"], user=t["user"], sys=t["sys"])
+            self.current_stage = previous
+
+    def enter_stage(self, name):
+        """Non-nested form of stage(): closes the current stage, if any, and opens name."""
+        self.finish_stage()
+        self.current_stage = name
+        self._add_time(name)
+        self._stage_started = time.perf_counter()
+        self._emit("stage")
+
+    def finish_stage(self):
+        if self._stage_started is None:
+            return
+        self._add_time(self.current_stage, wall=time.perf_counter() - self._stage_started)
+        t = self.timings[self.current_stage]
+        self._emit("stage_end", wall=t["wall"], user=t["user"], sys=t["sys"])
+        self.current_stage = self._stage_started = None
+
+    def timing_summary(self):
+        parts = [f"{name} {t['wall']:.1f}s (user {t['user']:.1f}s, sys {t['sys']:.1f}s)"
+                 for name, t in self.timings.items()]
+        return "[Timing] " + "; ".join(parts) if parts else ""
+
+    # ---------- cancel ----------
+
+    def cancel(self):
+        self.cancelled.set()
+        with self._lock:
+            process = self._process
+        if process is not None:
+            _kill(process)
+
+    # ---------- running ----------
+
+    def _line(self, raw, log):
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        line = line.rsplit("\r", 1)[-1]  # progress bars redraw with \r; keep the final state
+        self.tail.append(line)
+        self._run_tail.append(line)
+        if self.echo is not None:
+            self.echo(line)
+        self._emit("line", line=line)
+
+    def run(self, cmd, cwd=None, env=None, timeout=None, idle_timeout=None, check=True):
+        """
+        Run cmd to completion. Returns a RunResult whose output is the tail of
+        this command's output. Raises RunCancelled, subprocess.TimeoutExpired
+        and, with check, subprocess.CalledProcessError (output = tail).
+        """
+        if self.cancelled.is_set():
+            raise RunCancelled(cmd[0])
+        log = open(self.log_path, "ab") if self.log_path else None
+        self._run_tail = deque(maxlen=self.tail.maxlen)
+        self.tail.append(f"$ {subprocess.list2cmdline(cmd)}")
+        if log:
+            log.write(f"\n$ {subprocess.list2cmdline(cmd)}\n".encode("utf-8"))
+        started = time.perf_counter()
+        kwargs = {"creationflags": _creationflags()} if sys.platform == "win32" else {"start_new_session": True}
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL, cwd=cwd, env=env, **kwargs)
+        with self._lock:
+            self._process = process
+        self._emit("start", cmd=list(cmd), pid=process.pid)
+        stop = None
+        try:
+            reader = self._read_posix if sys.platform != "win32" else self._read_threaded
+            stop = reader(process, log, started, timeout, idle_timeout)
+            if stop is None and self.cancelled.is_set():
+                stop = "cancel"  # killed by cancel() from another thread, seen as EOF
+        finally:
+            if stop is not None or sys.exc_info()[0] is not None:
+                _kill(process)
+            returncode, user, sys_time = _reap(process)
+            with self._lock:
+                self._process = None
+            wall = time.perf_counter() - started
+            if log:
+                log.write(f"[exit {returncode} after {wall:.1f}s]\n".encode("utf-8"))
+                log.close()
+            if self.current_stage is None:  # not inside stage(): time the command on its own
+                self._add_time("other", wall=wall, user=user, sys_time=sys_time, commands=1)
+            else:
+                self._add_time(self.current_stage, user=user, sys_time=sys_time, commands=1)
+            self._emit("end", returncode=returncode, wall=wall, user=user, sys=sys_time)
+
+        output = "\n".join(self._run_tail)
+        if stop == "cancel":
+            raise RunCancelled(cmd[0])
+        if stop == "timeout":
+            raise subprocess.TimeoutExpired(cmd, timeout or idle_timeout, output=output)
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, output)
+        return RunResult(returncode, output, self.log_path, wall, user, sys_time)
+
+    def _check_stop(self, started, last_output, timeout, idle_timeout):
+        now = time.perf_counter()
+        if self.cancelled.is_set():
+            return "cancel"
+        if timeout and now - started > timeout:
+            return "timeout"
+        if idle_timeout and now - last_output > idle_timeout:
+            return "timeout"
+        return None
+
+    def _read_posix(self, process, log, started, timeout, idle_timeout):
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        pending = b""
+        last_output = time.perf_counter()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while True:
+                stop = self._check_stop(started, last_output, timeout, idle_timeout)
+                if stop:
+                    return stop
+                if not sel.select(POLL_INTERVAL):
+                    continue
+                try:
+                    chunk = os.read(fd, _READ_SIZE)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    break
+                last_output = time.perf_counter()
+                if log:
+                    log.write(chunk)
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for raw in lines:
+                    self._line(raw, log)
+        if pending:
+            self._line(pending, log)
+        return None
+
+    def _read_threaded(self, process, log, started, timeout, idle_timeout):
+        chunks = queue.Queue()
+
+        def pump():
+            for raw in iter(process.stdout.readline, b""):
+                chunks.put(raw)
+            chunks.put(None)
+
+        threading.Thread(target=pump, name="runner-output", daemon=True).start()
+        last_output = time.perf_counter()
+        while True:
+            stop = self._check_stop(started, last_output, timeout, idle_timeout)
+            if stop:
+                return stop
+            try:
+                raw = chunks.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if raw is None:
+                return None
+            last_output = time.perf_counter()
+            if log:
+                log.write(raw)
+            self._line(raw, log)
+
+
+def _kill(process):
+    """Kill a command and whatever it started (pip build backends, compilers)."""
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           capture_output=True, creationflags=_creationflags())
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        pass
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def _reap(process):
+    """(returncode, user, sys) once the command has exited."""
+    try:
+        process.stdout.close()
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        returncode = process.wait()
+        user, sys_time = _windows_cpu_times(process)
+        return returncode, user, sys_time
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        return process.returncode, usage.ru_utime, usage.ru_stime
+    except ChildProcessError:  # already reaped elsewhere
+        return process.wait(), 0.0, 0.0
+
+
+def run(cmd, cwd=None, env=None, timeout=None, check=True, log_path=None):
+    """One-off command with a throwaway Runner."""
+    return Runner(log_path=log_path).run(cmd, cwd=cwd, env=env, timeout=timeout, check=check)
@@ -5,9 +5,40 @@ using the embedded Python bundled with Pythoner. The functionality targets
 different operating systems (Windows and macOS) to initialize and manage the
 virtual environment required for the project.
 
+Venv Backend picks how the venv is created (dx_venv_backends): virtualenv,
+stdlib venv with pip seeded from local wheels, or in-process; on auto the
+fastest working one from a once-per-interpreter benchmark is used.
+
+With Use Template on, a freshly created venv is kept in the per-user template
+cache (dx_venv_template) and later venvs are cloned from it instead of running
+virtualenv again.
+
+Health checks are cached inside the venv (dx_venv_health): while the venv
+interpreter and pyvenv.cfg are unchanged, triggering again on an existing
+venv reports the stored result instead of starting its python. Deep Health
+Check also imports every installed distribution, only when that setup or
+site-packages changed.
+
+Pack Mode rolls one approved venv out to several machines (dx_venv_pack):
+1 packs the health-checked venv into Archive Path (default
+<project root>/Virtual_Env.tar.xz, or .tar.gz for zlib) with a manifest of file
+hashes; 2, on a machine without a venv, unpacks that archive instead of creating
+one -- rejected for another platform or Pythoner build, paths rewritten, every
+hash verified before the venv is moved into place.
+
+Layered (dx_venv_layers) links the project venv to a shared base venv (Base
+Venv, default: the per-user DX-VenvBase folder) through a .pth file, so heavy
+common packages are installed once in the base and each project venv only
+holds its extras. The report shows how many distributions each layer provides
+and any conflicts (a project package shadowing a different base version,
+unmet requirements across layers); the full per-distribution listing goes to
+the monitor. A packed layered venv needs the same base on the target machine.
+
 Functions:
-    python_init(trigger): Initializes the actor upon activation.
-    python_main(trigger): Ensures the virtual environment is created and ready for use.
+    python_init(trigger, use_template, venv_backend, deep_health_check, pack_mode, archive_path,
+                layered, base_venv): Initializes the actor upon activation.
+    python_main(trigger, use_template, venv_backend, deep_health_check, pack_mode, archive_path,
+                layered, base_venv): Ensures the virtual environment is created and ready for use.
 """
 
 # Creates Virtual_Env if it doesn't exist yet and creates VENV in this folder
@@ -15,15 +46,62 @@ Functions:
 # Pythoner will 'see' this folder on startup and use this local VENV for the project.
 
 import os
+import sys
+import shutil
 import subprocess
 import platform
 import glob
+import tarfile
+import importlib
+import contextlib
 
 # iz_input 1 "Trigger"
+# iz_input 2 "Use Template"   # 0/1: clone from / store into the venv template cache
+# iz_input 3 "Venv Backend"   # 0: auto (fastest benchmarked), 1: virtualenv, 2: venv + seed wheels, 3: in-process
+# iz_input 4 "Deep Health Check"  # 0/1: also import every installed distribution (cached until the venv changes)
+# iz_input 5 "Pack Mode"      # 0: off, 1: pack the venv into Archive Path, 2: unpack Archive Path when there is no venv
+# iz_input 6 "Archive Path"   # optional; defaults to <project root>/Virtual_Env.tar.xz
+# iz_input 7 "Layered"        # 0/1: link the venv to a shared base venv and report the layers
+# iz_input 8 "Base Venv"      # optional; defaults to DX_VENV_BASE or the per-user DX-VenvBase folder
 # iz_output 1 "Status"
 
+venv_template = None  # dx_venv_template, only needed for Use Template
+runner = None         # dx_runner; streams output to LOG_FILENAME and times each stage
+venv_backends = None  # dx_venv_backends; without it the venv is always created by virtualenv
+VENV_BACKENDS = {1: "virtualenv", 2: "venv", 3: "inprocess"}  # 0: auto
+venv_health = None    # dx_venv_health; without it every health check starts the venv's python
+venv_pack = None      # dx_venv_pack, only needed for Pack Mode
+venv_layers = None    # dx_venv_layers, only needed for Layered
+_active = None        # dx_runner.Runner of the current python_main call
+LOG_FILENAME = "venv_creation.log"
+
+
+def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
+    try:
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            mod = importlib.import_module(module_name)
+        elif reload:
+            mod = importlib.reload(mod)
+        return mod
+    except Exception as e:
+        print(f"Import failed for '{module_name}': {type(e).__name__}: {e}")
+        print("Hint: ensure your injector actor ran and remains active, or the module is on sys.path.")
+        if strict:
+            raise RuntimeError(f"Required module not available: {module_name}") from e
+        return None
+
+
 # python_init is called when the actor is first activated
-def python_init(trigger):
+def python_init(trigger, use_template=0, venv_backend=0, deep_health_check=0, pack_mode=0, archive_path="",
+                layered=0, base_venv=""):
+    global venv_template, runner, venv_backends, venv_health, venv_pack, venv_layers
+    venv_template = import_injected("dx_venv_template")
+    runner = import_injected("dx_runner")
+    venv_backends = import_injected("dx_venv_backends")
+    venv_health = import_injected("dx_venv_health")
+    venv_pack = import_injected("dx_venv_pack")
+    venv_layers = import_injected("dx_venv_layers")
     return "init"
 
 
@@ -48,8 +126,13 @@ def _venv_exists(path: str) -> bool:
         os.path.join(scripts_dir, "python.exe" if _is_windows() else "python")
     )
 
-def _run(cmd, creationflags=0):
-    return subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags)
+def _run(cmd, creationflags=0, stage="other"):
+    if _active is None:
+        return subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags)
+    # Same shape as subprocess.run; stderr is merged into stdout (last lines only)
+    with _active.stage(stage):
+        result = _active.run(cmd, check=False)
+    return subprocess.CompletedProcess(cmd, result.returncode, result.output, "")
 
 def _ensure_windows_dlls_folder(embedded_python: str):
     """
@@ -100,25 +183,118 @@ def _ensure_stdlib_for_embedded_windows(embedded_python: str, venv_path: str):
     except Exception as e:
         return f"Warning: Could not write {os.path.basename(pth_path)}:\n{e}"
 
-def _health_check(venv_path: str, creationflags=0):
-    """Smoke test that the venv can import encodings and report its version."""
+def _run_checked(cmd, creationflags=0, stage="create"):
+    """_run that raises CalledProcessError, as dx_venv_backends expects."""
+    r = _run(cmd, creationflags, stage)
+    if r.returncode != 0:
+        raise subprocess.CalledProcessError(r.returncode, cmd, "\n".join(s for s in [r.stderr, r.stdout] if s))
+    return r
+
+
+def _choose_backend(venv_backend, embedded_python: str, creationflags=0):
+    """(backend name, note for the report) from the input, or the cached/new benchmark on auto."""
+    if venv_backends is None:
+        return "virtualenv", ("Warning: Venv Backend needs the dx_venv_backends module." if venv_backend else None)
+    if VENV_BACKENDS.get(int(venv_backend or 0)):
+        return VENV_BACKENDS[int(venv_backend)], None
+    backend, results, fresh = venv_backends.choose(
+        embedded_python, False, lambda cmd: _run_checked(cmd, creationflags, "benchmark"),
+        before_seed=lambda path: _ensure_stdlib_for_embedded_windows(embedded_python, path))
+    note = f"Backend: {backend} ({'benchmarked' if fresh else 'cached benchmark'})"
+    return backend, note + ("\n" + venv_backends.format_results(results) if fresh else "")
+
+
+def _health_check(venv_path: str, creationflags=0, deep=False):
+    """Smoke test that the venv can import encodings and report its version (cached by dx_venv_health)."""
     py = os.path.join(venv_path, "Scripts" if _is_windows() else "bin",
                       "python.exe" if _is_windows() else "python")
+    if venv_health is not None:
+        ok, msg, _ = venv_health.check(venv_path, lambda cmd: _run_checked(cmd, creationflags, "health check").stdout,
+                                       deep, py)
+        return ok, msg
     try:
-        r = _run([py, "-c", "import encodings, sys; print('OK', sys.version)"], creationflags)
+        r = _run([py, "-c", "import encodings, sys; print('OK', sys.version)"], creationflags, "health check")
         return r.returncode == 0, (r.stdout or r.stderr).strip()
     except Exception as e:
         return False, str(e)
 
 
+def _clone_from_template(template_path: str, venv_path: str, creationflags=0):
+    """Health-checked clone of a stored template, or None to create normally."""
+    try:
+        seconds, counts = venv_template.clone_template(template_path, venv_path)
+    except OSError:
+        return None
+    ok, msg = _health_check(venv_path, creationflags)
+    if not ok:
+        shutil.rmtree(venv_path, ignore_errors=True)
+        os.makedirs(venv_path, exist_ok=True)
+        return None
+    return (f"Virtual environment cloned from template in {seconds:.1f}s "
+            f"({venv_template.format_counts(counts)}):\n{venv_path}\nHealth: OK - {msg}")
+
+
+def _pack_venv(venv_path: str, archive_path: str, embedded_python: str):
+    """Pack a health-checked venv; a line for the report."""
+    if venv_pack is None:
+        return "Warning: Pack Mode needs the dx_venv_pack module."
+    try:
+        with (_active.stage("pack") if _active is not None else contextlib.nullcontext()):
+            seconds, counts = venv_pack.pack(venv_path, archive_path, interpreter=embedded_python)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        return f"Warning: Could not pack the venv:\n{e}"
+    return f"Packed in {seconds:.1f}s ({venv_pack.format_counts(counts)}):\n{archive_path}"
+
+
+def _unpack_venv(archive_path: str, venv_path: str, embedded_python: str, creationflags=0):
+    """(report or None to create normally, note) for an unpacked, health-checked venv."""
+    if venv_pack is None:
+        return None, "Warning: Pack Mode needs the dx_venv_pack module."
+    if not os.path.isfile(archive_path):
+        return None, f"No venv archive at {archive_path}; creating the venv instead."
+    try:
+        with (_active.stage("unpack") if _active is not None else contextlib.nullcontext()):
+            seconds, counts, _ = venv_pack.unpack(archive_path, venv_path, interpreter=embedded_python)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        os.makedirs(venv_path, exist_ok=True)
+        return None, f"Could not unpack {archive_path}; creating the venv instead:\n{e}"
+    warn_stdlib = _ensure_stdlib_for_embedded_windows(embedded_python, venv_path)
+    ok, msg = _health_check(venv_path, creationflags)
+    report = (f"Virtual environment unpacked in {seconds:.1f}s ({venv_pack.format_counts(counts)}):\n"
+              f"{venv_path}\nHealth: {'OK' if ok else 'FAIL'}{(' - ' + msg) if msg else ''}")
+    return report + ("\n" + warn_stdlib if warn_stdlib else ""), None
+
+
+def _link_layers(venv_path: str, base_venv: str):
+    """Link the venv to the shared base (when it exists) and summarize the layers; a line for the report."""
+    if venv_layers is None:
+        return "Warning: Layered needs the dx_venv_layers module."
+    base_venv = (base_venv or "").strip() or venv_layers.base_root()
+    if not venv_layers.site_packages(base_venv):
+        return (f"Layered: no base venv at {base_venv} yet; create it there (e.g. with the VENV-Manager "
+                f"creator) and trigger again to share its packages.")
+    try:
+        venv_layers.link_base(venv_path, base_venv)
+    except (OSError, ValueError) as e:
+        return f"Warning: Could not link the base venv:\n{e}"
+    report = venv_layers.layer_report(venv_path)
+    print(venv_layers.format_report(report))
+    return venv_layers.format_report(report, list_distributions=False)
+
+
 # ---------- main ----------
 
-def python_main(trigger):
+def python_main(trigger, use_template=0, venv_backend=0, deep_health_check=0, pack_mode=0, archive_path="",
+                layered=0, base_venv=""):
+    global _active
     if not trigger:
         return
 
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     venv_path = os.path.join(project_root, "Virtual_Env")
+    archive_path = (archive_path or "").strip() or os.path.join(project_root, "Virtual_Env.tar.xz")
+    pack_mode = int(pack_mode or 0)
+    _active = runner.Runner(log_path=os.path.join(project_root, LOG_FILENAME)) if runner is not None else None
 
     if _is_windows():
         embedded_python = r"C:\Program Files\Common Files\TroikaTronix\Isadora Plugins\Pythoner.izzyplug\python.exe"
@@ -143,23 +319,54 @@ def python_main(trigger):
 
     # If already a venv, short-circuit
     if _venv_exists(venv_path):
-        ok, msg = _health_check(venv_path, creationflags)
+        ok, msg = _health_check(venv_path, creationflags, bool(deep_health_check))
         base = f"Virtual environment already present:\n{venv_path}\nHealth: {'OK' if ok else 'FAIL'}{(' - ' + msg) if msg else ''}"
         if warn_dlls:
             base += "\n" + warn_dlls
+        if layered:
+            base += "\n" + _link_layers(venv_path, base_venv)
+        if ok and pack_mode == 1:
+            base += "\n" + _pack_venv(venv_path, archive_path, embedded_python)
         return base
 
+    warn_pack = None
+    if pack_mode == 2:
+        unpacked, warn_pack = _unpack_venv(archive_path, venv_path, embedded_python, creationflags)
+        if unpacked:
+            return (unpacked + ("\n" + warn_dlls if warn_dlls else "")
+                    + ("\n" + _link_layers(venv_path, base_venv) if layered else ""))
+
+    backend, backend_note = _choose_backend(venv_backend, embedded_python, creationflags)
+    # Same flags (and so the same template key) as the VENV-Manager creator on Windows
+    if venv_backends is not None:
+        create_args = venv_backends.create_args(backend, embedded_python, False)
+    else:
+        create_args = ["--copies", "--no-download", "--python", embedded_python]
+    template_key = None
+    warn_template = "Warning: Use Template needs the dx_venv_template module." if use_template and venv_template is None else None
+    if use_template and venv_template is not None:
+        template_key = venv_template.template_key(embedded_python, None, create_args + ["bare"])
+        template_path = venv_template.find_template(template_key)
+        if template_path:
+            cloned = _clone_from_template(template_path, venv_path, creationflags)
+            if cloned:
+                return (cloned + ("\n" + warn_dlls if warn_dlls else "")
+                        + ("\n" + _link_layers(venv_path, base_venv) if layered else ""))
+
     # Build the environment using Pythoner's embedded interpreter (no downloads)
-    cmd = [
-        embedded_python, "-m", "virtualenv",
-        "--copies",
-        "--no-download",
-        "--python", embedded_python,
-        venv_path
-    ]
+    cmd = [embedded_python, "-m", "virtualenv", *create_args, venv_path]
 
     try:
-        result = _run(cmd, creationflags)
+        if backend == "virtualenv":
+            result = _run(cmd, creationflags, "create")
+        else:
+            try:
+                venv_backends.create(backend, embedded_python, venv_path, False,
+                                     lambda c: _run_checked(c, creationflags),
+                                     before_seed=lambda path: _ensure_stdlib_for_embedded_windows(embedded_python, path))
+            except (subprocess.CalledProcessError, RuntimeError) as e:
+                return f"{backend} backend failed:\n{getattr(e, 'output', None) or e}"
+            result = subprocess.CompletedProcess(cmd, 0, "", "")
         stdout = (result.stdout or "").strip()
         stderr = (result.stderr or "").strip()
 
@@ -172,11 +379,29 @@ def python_main(trigger):
 
         # Health check: can the venv import encodings and run?
         ok, msg = _health_check(venv_path, creationflags)
+        if ok and template_key:
+            try:
+                venv_template.store_template(venv_path, template_key)
+            except OSError as e:
+                msg += f"\nWarning: Could not store venv template: {e}"
         base_report = f"Virtual environment created at:\n{venv_path}\nHealth: {'OK' if ok else 'FAIL'}{(' - ' + msg) if msg else ''}"
         if warn_dlls:
             base_report += "\n" + warn_dlls
         if warn_stdlib:
             base_report += "\n" + warn_stdlib
+        if warn_template:
+            base_report += "\n" + warn_template
+        if warn_pack:
+            base_report += "\n" + warn_pack
+        if ok and layered:
+            # After storing the template, which stays a plain venv
+            base_report += "\n" + _link_layers(venv_path, base_venv)
+        if ok and pack_mode == 1:
+            base_report += "\n" + _pack_venv(venv_path, archive_path, embedded_python)
+        if backend_note:
+            base_report += "\n" + backend_note
+        if _active is not None:
+            base_report += "\n" + _active.timing_summary()
         if stdout and not ok:
             base_report += "\n" + stdout
         if not ok and stderr:
@@ -5,6 +5,11 @@ This module detects the platform-specific path of the `pip` executable within a
 environment and installs user-specified modules using it when triggered. It supports
 error handling for invalid module names and unsupported operating systems.
 
+The whole list is installed with one `pip install` call, so pip resolves the set
+together and starts once. Per-module outcomes come from pip's `--report` JSON.
+If the batch fails, modules pip names as unresolvable are dropped and the rest are
+tried together once more; only if that fails too is each module retried on its own.
+
 Functions:
     python_main(trigger, module_list): Executes module installation based on input trigger
     and provided module list.
@@ -17,18 +22,109 @@ Functions:
 # The default 'opencv-python, numpy' will provide essentials for supporting video IO in Pythoner.
 
 import os
+import re
+import sys
+import json
+import tempfile
 import subprocess
 import platform
+import importlib
 
 # iz_input 1 "Install Trigger"
 # iz_input 2 "Module List"
 # iz_output 1 "Status"
 
+runner = None  # dx_runner; streams pip output to LOG_FILENAME and times each pip call
+LOG_FILENAME = "pip_actions.log"
+
+_NAME_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+# pip's messages for a requirement it cannot resolve at all
+_UNRESOLVABLE_RX = re.compile(r"(?:No matching distribution found for|"
+                              r"Could not find a version that satisfies the requirement|"
+                              r"Invalid requirement:)\s+'?([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
+    try:
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            mod = importlib.import_module(module_name)
+        elif reload:
+            mod = importlib.reload(mod)
+        return mod
+    except Exception as e:
+        print(f"Import failed for '{module_name}': {type(e).__name__}: {e}")
+        print("Hint: ensure your injector actor ran and remains active, or the module is on sys.path.")
+        if strict:
+            raise RuntimeError(f"Required module not available: {module_name}") from e
+        return None
+
 
 def python_init(trigger, module_list):
+    global runner
+    runner = import_injected("dx_runner")
     return "init"
 
 
+def _run_pip(active, cmd, creationflags, stage):
+    """subprocess.run-shaped result; through dx_runner (stderr merged into stdout) when loaded."""
+    if active is None:
+        return subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags)
+    with active.stage(stage):
+        result = active.run(cmd, check=False)
+    return subprocess.CompletedProcess(cmd, result.returncode, result.output, "")
+
+
+def _canonical(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _module_key(module):
+    m = _NAME_RX.match(module)
+    return _canonical(m.group(1)) if m else _canonical(module)
+
+
+def _failure_text(result):
+    return (result.stderr or result.stdout or f"exit code {result.returncode}").strip()
+
+
+def _install_batch(active, pip_path, modules, creationflags, stage):
+    """
+    One 'pip install' for modules. Returns (result, {key: version}) where the
+    dict holds what pip's --report says it installed; None when no report was
+    written (failed resolution, or a pip older than 22.2 without --report).
+    """
+    fd, report_path = tempfile.mkstemp(prefix="pip-report-", suffix=".json")
+    os.close(fd)
+    try:
+        cmd = [pip_path, "install", "--disable-pip-version-check", "--report", report_path, *modules]
+        result = _run_pip(active, cmd, creationflags, stage)
+        if result.returncode != 0 and "no such option: --report" in _failure_text(result):
+            return _run_pip(active, cmd[:3] + modules, creationflags, stage), None
+        try:
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            installed = {_canonical(item["metadata"]["name"]): item["metadata"]["version"]
+                         for item in report.get("install", [])}
+        except (OSError, ValueError, KeyError, TypeError):
+            installed = None
+        return result, installed
+    finally:
+        try:
+            os.remove(report_path)
+        except OSError:
+            pass
+
+
+def _outcome(module, installed):
+    version = (installed or {}).get(_module_key(module))
+    if version:
+        return f"✓ {module} installed ({version})."
+    if installed is not None:
+        return f"✓ {module} already satisfied."
+    return f"✓ {module} installed."
+
+
 def python_main(trigger, module_list):
     if not trigger or not module_list:
         return "Waiting for trigger and module list..."
@@ -56,20 +152,41 @@ def python_main(trigger, module_list):
         return "No valid module names provided."
 
     results = []
-
-    for module in modules:
-        try:
-            result = subprocess.run(
-                [pip_path, "install", module],
-                capture_output=True,
-                text=True,
-                creationflags=creationflags
-            )
-            if result.returncode == 0:
-                results.append(f"✓ {module} installed.")
-            else:
-                results.append(f"✗ {module} failed:\n{result.stderr.strip()}")
-        except Exception as e:
-            results.append(f"✗ {module} exception:\n{e}")
-
+    active = runner.Runner(log_path=os.path.join(project_root, LOG_FILENAME)) if runner is not None else None
+
+    outcomes = {}
+    try:
+        # One resolver pass for the whole list
+        batch = list(modules)
+        result, installed = _install_batch(active, pip_path, batch, creationflags, "install")
+        if result.returncode != 0:
+            # Drop what pip could not resolve at all and try the rest together once more
+            named = {_canonical(n) for n in _UNRESOLVABLE_RX.findall(_failure_text(result))}
+            for module in batch:
+                if _module_key(module) in named:
+                    outcomes[module] = f"✗ {module} failed:\n{_failure_text(result)}"
+            rest = [m for m in batch if m not in outcomes]
+            if rest and len(rest) < len(batch):
+                batch = rest
+                result, installed = _install_batch(active, pip_path, batch, creationflags, "install (retry)")
+        if result.returncode == 0:
+            outcomes.update((m, _outcome(m, installed)) for m in batch)
+        elif len(batch) == 1:
+            outcomes.setdefault(batch[0], f"✗ {batch[0]} failed:\n{_failure_text(result)}")
+        else:
+            # Last resort: one call per module still open, to tell which of them fail
+            for module in [m for m in batch if m not in outcomes]:
+                result, installed = _install_batch(active, pip_path, [module], creationflags, module)
+                if result.returncode == 0:
+                    outcomes[module] = _outcome(module, installed)
+                else:
+                    outcomes[module] = f"✗ {module} failed:\n{_failure_text(result)}"
+    except Exception as e:
+        for module in modules:
+            outcomes.setdefault(module, f"✗ {module} exception:\n{e}")
+
+    results.extend(outcomes[m] for m in modules)
+
+    if active is not None:
+        results.append(active.timing_summary())
     return "\n".join(results)
@@ -5,6 +5,17 @@ appropriate virtual environment, and uses pip to uninstall the requested
 modules. It supports multiple module names via a comma-separated list and
 generates detailed status messages regarding successes or failures during
 uninstallation.
+
+The whole list goes to one `pip uninstall -y` call. Per-module outcomes are read
+from pip's "Successfully uninstalled" / "Skipping ... not installed" lines; only
+modules the batch left without an outcome (pip stops at the first error) are
+retried on their own.
+
+With Prune Orphans, dependencies that only the named modules needed go too: the
+venv's dependency graph is read once from importlib.metadata (dx_inventory, no
+pip call), anything another installed distribution still requires is kept, and
+the plan is returned first (1) or printed and applied in the same single
+`pip uninstall` call (2). pip, setuptools and wheel are never pruned.
 """
 
 # Enter the name as required by PIP to uninstall the requested module.
@@ -12,19 +23,93 @@ uninstallation.
 # Supports multiple comma separated names.
 
 import os
+import re
+import sys
 import subprocess
 import platform
+import importlib
 
 # iz_input 1 "Uninstall Trigger"
 # iz_input 2 "Module List"
+# iz_input 3 "Prune Orphans"  # 0: named modules only, 1: show the plan with orphaned dependencies, 2: remove them too
 # iz_output 1 "Status"
 
+runner = None  # dx_runner; streams pip output to LOG_FILENAME and times each pip call
+inventory = None  # dx_inventory, only needed for Prune Orphans
+LOG_FILENAME = "pip_actions.log"
+
+_UNINSTALLED_RX = re.compile(r"Successfully uninstalled ([A-Za-z0-9][A-Za-z0-9._-]*)-(\S+)")
+_SKIPPED_RX = re.compile(r"Skipping ([A-Za-z0-9][A-Za-z0-9._-]*) as it is not installed")
+
+
+def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
+    try:
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            mod = importlib.import_module(module_name)
+        elif reload:
+            mod = importlib.reload(mod)
+        return mod
+    except Exception as e:
+        print(f"Import failed for '{module_name}': {type(e).__name__}: {e}")
+        print("Hint: ensure your injector actor ran and remains active, or the module is on sys.path.")
+        if strict:
+            raise RuntimeError(f"Required module not available: {module_name}") from e
+        return None
 
-def python_init(trigger, module_list):
+
+def python_init(trigger, module_list, prune_orphans=0):
+    global runner, inventory
+    runner = import_injected("dx_runner")
+    inventory = import_injected("dx_inventory")
     return "init"
 
 
-def python_main(trigger, module_list):
+def _run_pip(active, cmd, creationflags, stage):
+    """subprocess.run-shaped result; through dx_runner (stderr merged into stdout) when loaded."""
+    if active is None:
+        return subprocess.run(cmd, capture_output=True, text=True, creationflags=creationflags)
+    with active.stage(stage):
+        result = active.run(cmd, check=False)
+    return subprocess.CompletedProcess(cmd, result.returncode, result.output, "")
+
+
+def _canonical(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _parse_uninstall(text):
+    """({key: removed version}, {keys pip skipped as not installed}) from pip's output."""
+    removed = {_canonical(n): v for n, v in _UNINSTALLED_RX.findall(text)}
+    skipped = {_canonical(n) for n in _SKIPPED_RX.findall(text)}
+    return removed, skipped
+
+
+def _outcomes(modules, result, outcomes, labels=None):
+    """Fill outcomes for the modules pip's output accounts for."""
+    text = "\n".join(s for s in [result.stdout, result.stderr] if s)
+    removed, skipped = _parse_uninstall(text)
+    for module in modules:
+        key = _canonical(module)
+        if key in removed:
+            label = f", {labels[module]}" if labels and module in labels else ""
+            outcomes[module] = f"✓ {module} uninstalled ({removed[key]}{label})."
+        elif key in skipped:
+            outcomes[module] = f"✓ {module} was already not installed."
+
+
+def _plan(venv_path, modules):
+    """(pip names to remove, {name: label for the outcome}, plan text) including orphans."""
+    inventory.clear_cache()  # the venv may have changed since the last trigger
+    dists = inventory.installed_distributions(inventory.site_packages(venv_path))
+    plan = inventory.plan_uninstall(modules, dists)
+    # Names that are not installed stay in, so pip reports them as skipped
+    names = [d.name for d in plan["remove"]] + [d.name for d in plan["orphans"]] + plan["missing"]
+    labels = {d.name: "orphaned dependency" for d in plan["orphans"]}
+    return names, labels, inventory.format_uninstall_plan(plan)
+
+
+def python_main(trigger, module_list, prune_orphans=0):
     if not trigger or not module_list:
         return "Waiting for trigger and module list..."
 
@@ -52,24 +137,40 @@ def python_main(trigger, module_list):
         return "No valid module names provided."
 
     results = []
+    labels = {}
+    if prune_orphans and inventory is None:
+        results.append("Prune Orphans needs the dx_inventory module; removing the named modules only.")
+    elif prune_orphans:
+        names, labels, plan_text = _plan(venv_path, modules)
+        print(plan_text)
+        if int(prune_orphans) == 1:
+            return plan_text
+        results.append(plan_text)
+        modules = names
+    active = runner.Runner(log_path=os.path.join(project_root, LOG_FILENAME)) if runner is not None else None
 
-    for module in modules:
-        try:
-            result = subprocess.run(
-                [pip_path, "uninstall", "-y", module],
-                capture_output=True,
-                text=True,
-                creationflags=creationflags
-            )
+    outcomes = {}
+    try:
+        result = _run_pip(active, [pip_path, "uninstall", "-y", *modules], creationflags, "uninstall")
+        _outcomes(modules, result, outcomes, labels)
+        for module in [m for m in modules if m not in outcomes]:
             if result.returncode == 0:
-                results.append(f"✓ {module} uninstalled.")
-            else:
-                # Check if it's already not installed
-                if "not installed" in result.stdout.lower():
-                    results.append(f"✓ {module} was already not installed.")
+                outcomes[module] = f"✓ {module} uninstalled."
+                continue
+            # The batch stopped before this one: retry it alone
+            single = _run_pip(active, [pip_path, "uninstall", "-y", module], creationflags, module)
+            _outcomes([module], single, outcomes, labels)
+            if module not in outcomes:
+                if single.returncode == 0:
+                    outcomes[module] = f"✓ {module} uninstalled."
                 else:
-                    results.append(f"✗ {module} failed:\n{result.stderr.strip()}")
-        except Exception as e:
-            results.append(f"✗ {module} exception:\n{e}")
+                    outcomes[module] = f"✗ {module} failed:\n{(single.stderr or single.stdout).strip()}"
+    except Exception as e:
+        for module in modules:
+            outcomes.setdefault(module, f"✗ {module} exception:\n{e}")
+
+    results.extend(outcomes[m] for m in modules)
 
+    if active is not None:
+        results.append(active.timing_summary())
     return "\n".join(results)
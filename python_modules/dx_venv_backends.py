@@ -0,0 +1,240 @@
+"""
+Selectable backends for creating a venv with Pythoner's interpreter.
+
+    virtualenv  python -m virtualenv --no-download ...      (the original path)
+    venv        python -m venv --without-pip, then pip (and setuptools/wheel
+                when available) seeded offline from local wheels
+    inprocess   venv.EnvBuilder in this process, then the same seeding; only
+                when the running interpreter is the target one (never inside
+                Isadora, where sys.executable is the host application)
+
+Seed wheels come from the given folders (e.g. the shared wheelhouse), then
+the interpreter's ensurepip bundle, then virtualenv's embedded wheels.
+
+benchmark() creates a throwaway venv with each backend and records time,
+disk footprint and whether the result passes a health check; choose()
+caches that per interpreter fingerprint in BENCHMARK_FILENAME and returns the
+fastest working backend, so the benchmark runs once per Pythoner install.
+
+All subprocesses go through the caller's run(cmd) callable, which must raise
+subprocess.CalledProcessError on failure (the venv scripts pass their
+run_command_with_progress).
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_backends.py > dx_venv_backends_gz64.txt
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import shutil
+import tempfile
+import platform
+import sysconfig
+import subprocess
+import importlib.util
+
+BACKENDS = ("virtualenv", "venv", "inprocess")
+BENCHMARK_FILENAME = "venv_backend_benchmark.json"
+SEED_PACKAGES = ("pip", "setuptools", "wheel")
+_WHEEL_RX = re.compile(r"^(pip|setuptools|wheel)-([0-9][^-]*)-py[23.]*-none-any\.whl$", re.IGNORECASE)
+
+
+def _cache_dir():
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "TroikaTronix")
+    if platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Caches/TroikaTronix")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dx-venv")
+
+
+def venv_python(venv_path):
+    if platform.system() == "Windows":
+        return os.path.join(venv_path, "Scripts", "python.exe")
+    cand = os.path.join(venv_path, "bin", "python3")
+    return cand if os.path.exists(cand) else os.path.join(venv_path, "bin", "python")
+
+
+def _release(version):
+    return tuple(int(p) for p in re.findall(r"\d+", version)[:4])
+
+
+def _seed_dirs(extra_dirs=()):
+    dirs = list(extra_dirs)
+    dirs.append(os.path.join(sysconfig.get_path("stdlib"), "ensurepip", "_bundled"))
+    spec = importlib.util.find_spec("virtualenv")
+    if spec and spec.origin:
+        dirs.append(os.path.join(os.path.dirname(spec.origin), "seed", "wheels", "embed"))
+    return [d for d in dirs if d and os.path.isdir(d)]
+
+
+def seed_wheels(extra_dirs=()):
+    """{package: wheel path}, newest universal wheel of each seed package found."""
+    found = {}
+    for folder in _seed_dirs(extra_dirs):
+        for path in glob.glob(os.path.join(folder, "*.whl")):
+            m = _WHEEL_RX.match(os.path.basename(path))
+            if not m:
+                continue
+            name, version = m.group(1).lower(), m.group(2)
+            if name not in found or _release(version) > found[name][0]:
+                found[name] = (_release(version), path)
+    return {name: path for name, (_, path) in found.items()}
+
+
+def can_run_inprocess(interpreter):
+    base = getattr(sys, "_base_executable", None) or sys.executable
+    try:
+        return (importlib.util.find_spec("venv") is not None
+                and os.path.samefile(os.path.realpath(base), os.path.realpath(interpreter)))
+    except OSError:
+        return False
+
+
+def create_args(backend, interpreter, symlinks):
+    """Flags identifying a backend's output (for build/template keys); virtualenv keeps its historical flags."""
+    link = "--symlinks" if symlinks else "--copies"
+    if backend == "virtualenv":
+        return [link, "--no-download", "--python", interpreter]
+    return [f"--backend={backend}", link]
+
+
+def _seed(venv_path, run, seed_dirs):
+    wheels = seed_wheels(seed_dirs)
+    if "pip" not in wheels:
+        raise RuntimeError("no pip wheel found to seed the venv from")
+    # pip runs straight from its own wheel: no index, no download
+    run([venv_python(venv_path), os.path.join(wheels["pip"], "pip"), "install", "--no-index", "--no-deps",
+         "--disable-pip-version-check", "--no-warn-script-location",
+         *[wheels[n] for n in SEED_PACKAGES if n in wheels]])
+
+
+def create(backend, interpreter, venv_path, symlinks, run, seed_dirs=(), before_seed=None, prompt=None):
+    """
+    Create venv_path with backend. before_seed(venv_path) runs once the
+    interpreter layout exists but before anything is run from it (e.g. the
+    Windows stdlib ._pth fix). prompt replaces the folder name in the activate
+    scripts (for venvs built under a staging name). Raises
+    CalledProcessError/RuntimeError/OSError.
+    """
+    prompt_args = ["--prompt", prompt] if prompt else []
+    if backend == "virtualenv":
+        run([interpreter, "-m", "virtualenv", *create_args(backend, interpreter, symlinks), *prompt_args, venv_path])
+        return
+    if backend == "venv":
+        run([interpreter, "-m", "venv", "--without-pip", "--symlinks" if symlinks else "--copies", *prompt_args,
+             venv_path])
+    elif backend == "inprocess":
+        if not can_run_inprocess(interpreter):
+            raise RuntimeError("in-process creation needs the running interpreter to be the target one")
+        import venv
+        venv.EnvBuilder(with_pip=False, symlinks=symlinks, prompt=prompt).create(venv_path)
+    else:
+        raise ValueError(f"unknown venv backend: {backend}")
+    if before_seed is not None:
+        before_seed(venv_path)
+    _seed(venv_path, run, seed_dirs)
+
+
+def footprint(path):
+    """Bytes on disk under path; hardlinked files count once, symlinks are not followed."""
+    seen, total = set(), 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            total += st.st_size
+    return total
+
+
+# ----------------------------
+# Helpers: benchmark / choice
+# ----------------------------
+
+def _fingerprint(interpreter, symlinks):
+    st = os.stat(interpreter)
+    return f"{os.path.abspath(interpreter)}|{st.st_size}|{st.st_mtime_ns}|{int(bool(symlinks))}"
+
+
+def benchmark(interpreter, symlinks, run, seed_dirs=(), before_seed=None, scratch_dir=None):
+    """{backend: {"ok", "seconds", "bytes", "error"}} from one throwaway venv per backend."""
+    results = {}
+    for backend in BACKENDS:
+        if backend == "inprocess" and not can_run_inprocess(interpreter):
+            results[backend] = {"ok": False, "seconds": None, "bytes": None,
+                                "error": "not the running interpreter"}
+            continue
+        scratch = tempfile.mkdtemp(prefix=f"dx-venv-{backend}-", dir=scratch_dir)
+        venv_path = os.path.join(scratch, "venv")
+        started = time.perf_counter()
+        try:
+            create(backend, interpreter, venv_path, symlinks, run, seed_dirs, before_seed)
+            run([venv_python(venv_path), "-c", "import encodings, pip"])
+            results[backend] = {"ok": True, "seconds": round(time.perf_counter() - started, 3),
+                                "bytes": footprint(venv_path), "error": None}
+        except (subprocess.CalledProcessError, RuntimeError, OSError) as e:
+            results[backend] = {"ok": False, "seconds": None, "bytes": None,
+                                "error": f"{type(e).__name__}: {e}"}
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def fastest(results):
+    ok = [(r["seconds"], name) for name, r in results.items() if r.get("ok")]
+    return min(ok)[1] if ok else "virtualenv"
+
+
+def _load_benchmarks(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("results", {}) if data.get("version") == 1 else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_benchmarks(cache_path, all_results):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "results": all_results}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def choose(interpreter, symlinks, run, seed_dirs=(), before_seed=None, cache_path=None):
+    """(backend, results, fresh): cached benchmark for this interpreter, else a new one."""
+    cache_path = cache_path or os.path.join(_cache_dir(), BENCHMARK_FILENAME)
+    key = _fingerprint(interpreter, symlinks)
+    all_results = _load_benchmarks(cache_path)
+    if key in all_results:
+        return fastest(all_results[key]), all_results[key], False
+    results = benchmark(interpreter, symlinks, run, seed_dirs, before_seed)
+    all_results[key] = results
+    _save_benchmarks(cache_path, all_results)
+    return fastest(results), results, True
+
+
+def format_results(results):
+    lines = []
+    for name in BACKENDS:
+        r = results.get(name)
+        if r is None:
+            continue
+        if r["ok"]:
+            lines.append(f"  {name}: {r['seconds']:.2f}s, {r['bytes'] / 1048576:.1f} MB")
+        else:
+            lines.append(f"  {name}: unavailable ({r['error']})")
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+"""
+Cached venv health checks.
+
+The smoke test (start the venv's python, import encodings, print the
+version) costs a new interpreter every time; re-triggering an actor during
+rehearsals spawned one per trigger. The result is now kept in HEALTH_FILENAME
+inside the venv, keyed by a fingerprint of
+
+    the venv interpreter: path, size, mtime (of the target, for symlinked
+                          interpreters, so a replaced base install counts)
+    pyvenv.cfg contents   (home, version, include-system-site-packages)
+    Windows *._pth files  (the embedded-stdlib fix)
+
+A matching entry is returned without starting anything. A failed check is
+never cached.
+
+The optional deep check imports every top-level module of every installed
+distribution (except pip/setuptools/wheel), in parallel threads inside one child process, and reports
+those that fail. It runs only when the fingerprint or site-packages changed
+(installing or removing a distribution bumps the folder's mtime).
+
+All subprocesses go through the caller's run(cmd) callable, which returns
+the command's output and raises subprocess.CalledProcessError on failure
+(the venv scripts pass their run_command_with_progress).
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_health.py > dx_venv_health_gz64.txt
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import subprocess
+
+HEALTH_FILENAME = ".dx_health.json"
+IMPORT_WORKERS = 8
+# Venv tooling, not project packages; importing setuptools after pip trips its distutils override
+SKIP_DISTRIBUTIONS = ("pip", "setuptools", "wheel")
+
+BASIC_CHECK = "import encodings, sys; print('OK', sys.version)"
+
+# Runs in the venv's python; prints the basic check line, then one JSON line
+_DEEP_CHECK = r"""
+import encodings, sys, json, re
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor
+print('OK', sys.version, flush=True)
+names = set()
+for dist in metadata.distributions():
+    if (dist.metadata['Name'] or '').lower() in %r:
+        continue
+    top = dist.read_text('top_level.txt')
+    if top:
+        names.update(top.split())
+        continue
+    for f in dist.files or ():
+        parts = f.parts
+        if len(parts) == 1 and parts[0].endswith('.py'):
+            names.add(parts[0][:-3])
+        elif len(parts) == 2 and parts[1] == '__init__.py':
+            names.add(parts[0])
+names = sorted(n for n in names if re.match(r'^[A-Za-z][A-Za-z0-9_]*$', n))
+def probe(name):
+    try:
+        __import__(name)
+        return None
+    except BaseException as e:
+        return f'{type(e).__name__}: {e}'.splitlines()[0][:200]
+with ThreadPoolExecutor(max_workers=%d) as pool:
+    results = dict(zip(names, pool.map(probe, names)))
+print('DEEP ' + json.dumps({'checked': len(names), 'failed': {k: v for k, v in results.items() if v}}), flush=True)
+"""
+
+
+def venv_python(venv_path):
+    if sys.platform == "win32":
+        return os.path.join(venv_path, "Scripts", "python.exe")
+    return os.path.join(venv_path, "bin", "python")
+
+
+def _site_packages(venv_path):
+    found = [os.path.join(venv_path, "Lib", "site-packages")] if sys.platform == "win32" else []
+    found += sorted(glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")))
+    return [p for p in found if os.path.isdir(p)]
+
+
+def fingerprint(venv_path, python_path=None):
+    """Identity of the interpreter setup, or None when it cannot be read."""
+    python_path = python_path or venv_python(venv_path)
+    try:
+        st = os.stat(python_path)
+        h = hashlib.sha256()
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "rb") as f:
+            h.update(f.read())
+        for pth in sorted(glob.glob(os.path.join(os.path.dirname(python_path), "*._pth"))):
+            with open(pth, "rb") as f:
+                h.update(b"\0" + f.read())
+    except OSError:
+        return None
+    return {"python": os.path.abspath(python_path), "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns, "config": h.hexdigest()}
+
+
+def _packages_stamp(venv_path):
+    stamp = []
+    for path in _site_packages(venv_path):
+        try:
+            stamp.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            pass
+    return stamp
+
+
+def _load(venv_path):
+    try:
+        with open(os.path.join(venv_path, HEALTH_FILENAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if data.get("version") == 1 else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _save(venv_path, entry):
+    path = os.path.join(venv_path, HEALTH_FILENAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entry, version=1), f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def invalidate(venv_path):
+    try:
+        os.remove(os.path.join(venv_path, HEALTH_FILENAME))
+    except OSError:
+        pass
+
+
+def cached(venv_path, deep=False, python_path=None):
+    """The stored entry if it still matches this venv (and covers the deep check when asked), else None."""
+    entry = _load(venv_path)
+    if not entry or entry.get("fingerprint") != fingerprint(venv_path, python_path):
+        return None
+    if deep and (entry.get("deep") is None or entry["deep"].get("packages") != _packages_stamp(venv_path)):
+        return None
+    return entry
+
+
+def _deep_summary(deep):
+    failed = deep["failed"]
+    if not failed:
+        return f"imported {deep['checked']} top-level module(s)"
+    lines = [f"{len(failed)} of {deep['checked']} top-level module(s) failed to import:"]
+    lines += [f"  {name}: {error}" for name, error in sorted(failed.items())]
+    return "\n".join(lines)
+
+
+def _message(entry, venv_path):
+    msg = entry["message"]
+    if entry.get("deep") is not None and entry["deep"].get("packages") == _packages_stamp(venv_path):
+        msg += "; " + _deep_summary(entry["deep"])
+    return msg
+
+
+def check(venv_path, run, deep=False, python_path=None):
+    """
+    (ok, message, from_cache). The deep check fails the venv when any
+    top-level module does not import.
+    """
+    python_path = python_path or venv_python(venv_path)
+    entry = cached(venv_path, deep, python_path)
+    if entry is not None:
+        return True, _message(entry, venv_path) + " (cached)", True
+
+    script = _DEEP_CHECK % (SKIP_DISTRIBUTIONS, IMPORT_WORKERS) if deep else BASIC_CHECK
+    try:
+        output = run([python_path, "-c", script])
+    except (subprocess.CalledProcessError, OSError) as e:
+        return False, (getattr(e, "output", None) or str(e)).strip(), False
+    lines = (output or "").strip().splitlines()
+    basic = next((l for l in lines if l.startswith("OK ")), None)
+    if basic is None:
+        return False, "\n".join(lines) or "no output from the health check", False
+
+    entry = {"fingerprint": fingerprint(venv_path, python_path), "message": basic,
+             "checked": time.time(), "deep": None}
+    if deep:
+        report = next((l for l in reversed(lines) if l.startswith("DEEP ")), None)
+        if report is None:
+            return False, basic + "; deep check produced no report", False
+        entry["deep"] = dict(json.loads(report[5:]), packages=_packages_stamp(venv_path))
+        if entry["deep"]["failed"]:
+            return False, _message(entry, venv_path), False
+    if entry["fingerprint"] is not None:
+        _save(venv_path, entry)
+    return True, _message(entry, venv_path), False
+
@@ -0,0 +1,240 @@
+"""
+Layered venvs: a shared base environment with the heavy common packages,
+and per-project overlay venvs holding only their own extras.
+
+The overlay is linked to the base by BASE_PTH_NAME in its site-packages:
+
+    import site; site.addsitedir('<base site-packages>')
+
+so the base comes after the overlay on sys.path (overlay wins) and the
+base's own .pth files are processed too. pip in the overlay sees base
+packages as installed and only puts what is missing into the overlay; it
+refuses to uninstall anything outside the overlay, so the base stays
+read-only for projects. Console scripts of base packages stay in the base's
+bin/ or Scripts/ folder.
+
+layer_report() reads both layers' metadata (importlib.metadata, no
+subprocess) and lists each distribution with the layer it is imported from,
+plus conflicts:
+
+    interpreter  base and overlay made from different Python versions
+    missing      the linked base venv no longer exists
+    shadowed     the same distribution in both layers at different versions
+                 (pip/setuptools/wheel excepted)
+    unsatisfied  a requirement of an imported distribution that the imported
+                 version of its dependency does not meet (needs packaging),
+                 or that no layer provides
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_layers.py > dx_venv_layers_gz64.txt
+"""
+
+import os
+import re
+import sys
+import glob
+import platform
+from importlib import metadata
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ImportError:  # only missing dependencies are reported, not version mismatches
+    Requirement = None
+
+BASE_PTH_NAME = "_dx_base_layer.pth"
+TOOLING = ("pip", "setuptools", "wheel")  # every venv has its own; never reported as shadowing
+_BASE_LINE = "# dx base venv: "
+_NAME_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def base_root():
+    """Default base venv: DX_VENV_BASE, else a per-user folder."""
+    override = os.environ.get("DX_VENV_BASE", "").strip()
+    if override:
+        return override
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "TroikaTronix", "DX-VenvBase")
+    if platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Application Support/TroikaTronix/DX-VenvBase")
+    return os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "dx-venv-base")
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def site_packages(venv_path):
+    """site-packages folder(s) of a venv on disk (Windows or POSIX layout)."""
+    found = [os.path.join(venv_path, "Lib", "site-packages")] if sys.platform == "win32" else []
+    found += sorted(glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")))
+    return [p for p in found if os.path.isdir(p)]
+
+
+def _python_version(venv_path):
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return ".".join(value.strip().split(".")[:2])
+    except OSError:
+        pass
+    return None
+
+
+# ----------------------------
+# Linking
+# ----------------------------
+
+def link_base(overlay_path, base_path):
+    """
+    Point the overlay at the base (replacing any earlier link). Raises
+    ValueError when either is not a venv or their Python versions differ.
+    Returns the .pth path written.
+    """
+    overlay_sp, base_sp = site_packages(overlay_path), site_packages(base_path)
+    if not overlay_sp:
+        raise ValueError(f"not a venv (no site-packages): {overlay_path}")
+    if not base_sp:
+        raise ValueError(f"base is not a venv (no site-packages): {base_path}")
+    if os.path.abspath(overlay_path) == os.path.abspath(base_path):
+        raise ValueError("a venv cannot be its own base")
+    ours, theirs = _python_version(overlay_path), _python_version(base_path)
+    if ours and theirs and ours != theirs:
+        raise ValueError(f"base uses Python {theirs}, this venv Python {ours}")
+
+    pth_path = os.path.join(overlay_sp[0], BASE_PTH_NAME)
+    content = f"{_BASE_LINE}{os.path.abspath(base_path)}\n" + "".join(
+        f"import site; site.addsitedir({os.path.abspath(sp)!r})\n" for sp in base_sp)
+    try:
+        with open(pth_path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                # Unchanged: rewriting would bump the site-packages mtime and
+                # invalidate the dx_venv_health and dx_inventory caches
+                return pth_path
+    except OSError:
+        pass
+    tmp_path = f"{pth_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, pth_path)
+    return pth_path
+
+
+def unlink_base(overlay_path):
+    removed = False
+    for sp in site_packages(overlay_path):
+        try:
+            os.remove(os.path.join(sp, BASE_PTH_NAME))
+            removed = True
+        except OSError:
+            pass
+    return removed
+
+
+def linked_base(overlay_path):
+    """The base venv the overlay's .pth points at (existing or not), or None."""
+    for sp in site_packages(overlay_path):
+        try:
+            with open(os.path.join(sp, BASE_PTH_NAME), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith(_BASE_LINE):
+                        return line[len(_BASE_LINE):].strip()
+        except OSError:
+            continue
+    return None
+
+
+# ----------------------------
+# Layer report
+# ----------------------------
+
+def _distributions(path):
+    dists = {}
+    for dist in metadata.distributions(path=[path]):
+        try:
+            name, version = dist.metadata["Name"], dist.version
+        except Exception:
+            continue
+        if name and version:
+            dists.setdefault(canonical_name(name), (name, version, tuple(dist.requires or ())))
+    return dists
+
+
+def _requirement(text):
+    """(canonical name, specifier or None) for a plain install of text, or None when its marker is false."""
+    if Requirement is not None:
+        try:
+            req = Requirement(text)
+        except InvalidRequirement:
+            return None
+        if req.marker is not None and not req.marker.evaluate({"extra": ""}):
+            return None
+        return canonical_name(req.name), req.specifier
+    requirement, _, marker = text.partition(";")
+    if re.search(r"\bextra\b", marker):
+        return None
+    m = _NAME_RX.match(requirement)
+    return (canonical_name(m.group(1)), None) if m else None
+
+
+def layer_report(overlay_path, base_path=None):
+    """
+    {"layers": [(layer, site-packages, count)],
+     "distributions": [(name, version, layer)] sorted by name (imported copy),
+     "conflicts": [(kind, text)]}. base_path defaults to the linked base.
+    """
+    layers = [("overlay", sp) for sp in site_packages(overlay_path)]
+    base_path = base_path or linked_base(overlay_path)
+    conflicts = []
+    if base_path:
+        base_sp = site_packages(base_path)
+        layers += [("base", sp) for sp in base_sp]
+        if not base_sp:
+            conflicts.append(("missing", f"linked base venv does not exist: {base_path}"))
+        ours, theirs = _python_version(overlay_path), _python_version(base_path)
+        if ours and theirs and ours != theirs:
+            conflicts.append(("interpreter", f"base uses Python {theirs}, overlay Python {ours}"))
+
+    effective, counts = {}, []
+    for layer, sp in layers:
+        dists = _distributions(sp)
+        counts.append((layer, sp, len(dists)))
+        for key, (name, version, requires) in dists.items():
+            if key not in effective:
+                effective[key] = (name, version, layer, requires)
+            elif effective[key][1] != version and key not in TOOLING:
+                conflicts.append(("shadowed", f"{name} {effective[key][1]} ({effective[key][2]}) shadows "
+                                              f"{version} ({layer})"))
+
+    for key, (name, version, layer, requires) in sorted(effective.items()):
+        for text in requires:
+            req = _requirement(text)
+            if req is None:
+                continue
+            dep, specifier = req
+            if dep not in effective:
+                conflicts.append(("unsatisfied", f"{name} ({layer}) requires {text.split(';')[0].strip()}, "
+                                                 f"not installed in any layer"))
+            elif specifier and not specifier.contains(effective[dep][1], prereleases=True):
+                conflicts.append(("unsatisfied", f"{name} ({layer}) requires {text.split(';')[0].strip()}, "
+                                                 f"imported {effective[dep][0]} {effective[dep][1]} "
+                                                 f"({effective[dep][2]})"))
+
+    return {"layers": counts,
+            "distributions": [(n, v, layer) for _, (n, v, layer, _) in sorted(effective.items())],
+            "conflicts": conflicts}
+
+
+def format_report(report, list_distributions=True):
+    lines = [f"[Layers] {layer}: {sp} ({count} distributions)" for layer, sp, count in report["layers"]]
+    if list_distributions:
+        width = max((len(n) + len(v) for n, v, _ in report["distributions"]), default=0) + 1
+        lines += [f"  {f'{n} {v}':<{width}}  {layer}" for n, v, layer in report["distributions"]]
+    if report["conflicts"]:
+        lines.append(f"[Layers] {len(report['conflicts'])} conflict(s):")
+        lines += [f"  ! {kind}: {text}" for kind, text in report["conflicts"]]
+    else:
+        lines.append("[Layers] No conflicts.")
+    return "\n".join(lines)
@@ -0,0 +1,316 @@
+"""
+Pack a built venv into one archive and unpack it on other machines with the
+same Pythoner build, instead of running virtualenv and pip on each of them.
+
+    pack:    a streamed tar (lzma for .tar.xz, zlib for .tar.gz) whose first
+             member is MANIFEST_NAME: source path, platform, Python version,
+             interpreter size and the sha256 and size of every file. Files
+             are hashed in parallel before they are streamed into the tar.
+    unpack:  the manifest is read and checked first, so an archive for
+             another platform or Pythoner build is rejected before anything
+             is written. Members are streamed into a staging folder beside
+             the target; pyvenv.cfg, *.pth and the scripts in bin/ or
+             Scripts/ are checked against their hash and have the packed
+             venv's path rewritten as they are extracted, as do symlink
+             targets. Everything else is verified in parallel afterwards.
+             The staging folder is renamed into place only when every file
+             matches, so a damaged copy never becomes the project's venv.
+
+File mtimes are kept, so the .pyc files in the archive stay valid.
+
+Member names are checked (no absolute paths, no '..', nothing below a
+symlink), since archives are copied around between machines.
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_pack.py > dx_venv_pack_gz64.txt
+"""
+
+import os
+import io
+import json
+import time
+import shutil
+import hashlib
+import tarfile
+import platform
+import configparser
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = ".dx_venv_manifest.json"
+DEFAULT_SUFFIX = ".tar.xz"
+COMPRESSION = {".tar.xz": "xz", ".txz": "xz", ".tar.gz": "gz", ".tgz": "gz"}
+HASH_WORKERS = 8
+SKIP_NAMES = (".dx_health.json", ".dx_build_journal.json")  # machine-specific state
+_CHUNK = 1024 * 1024
+
+
+def compression_for(archive_path):
+    for suffix, mode in COMPRESSION.items():
+        if archive_path.lower().endswith(suffix):
+            return mode
+    raise ValueError(f"unknown archive type (use {', '.join(COMPRESSION)}): {archive_path}")
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _needs_rewrite(rel_path):
+    parts = rel_path.split("/")
+    name = parts[-1]
+    if rel_path == "pyvenv.cfg" or name.endswith(".pth"):
+        return True
+    # console scripts and activation scripts live directly in bin/ or Scripts/
+    return len(parts) == 2 and parts[0] in ("bin", "Scripts")
+
+
+def _replacements(old_path, new_path):
+    pairs = [(old_path, new_path)]
+    if "\\" in old_path or "\\" in new_path:
+        pairs.append((old_path.replace("\\", "/"), new_path.replace("\\", "/")))
+    return [(o.encode("utf-8"), n.encode("utf-8")) for o, n in pairs]
+
+
+def _pyvenv_cfg(venv_path):
+    parser = configparser.ConfigParser()
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as f:
+            parser.read_string("[venv]\n" + f.read())
+    except (OSError, configparser.Error):
+        return {}
+    return dict(parser["venv"])
+
+
+# ----------------------------
+# Pack
+# ----------------------------
+
+def _walk(venv_path):
+    """(rel posix path, absolute path, kind) for every entry, each directory before its contents."""
+    entries = []
+    for root, dirs, files in os.walk(venv_path):
+        rel_root = os.path.relpath(root, venv_path).replace(os.sep, "/")
+        for name in sorted(dirs + files):
+            path = os.path.join(root, name)
+            rel = name if rel_root == "." else f"{rel_root}/{name}"
+            if rel_root == "." and name in SKIP_NAMES + (MANIFEST_NAME,):
+                continue
+            if os.path.islink(path):
+                entries.append((rel, path, "link"))
+            elif name in dirs:
+                entries.append((rel, path, "dir"))
+            else:
+                entries.append((rel, path, "file"))
+        dirs[:] = [d for d in sorted(dirs) if not os.path.islink(os.path.join(root, d))]
+    return entries
+
+
+def pack(venv_path, archive_path, interpreter=None):
+    """
+    Write venv_path to archive_path (type from its suffix). The archive is
+    written beside the target and renamed when complete.
+    Returns (seconds, {"files", "links", "bytes", "archive_bytes"}).
+    """
+    started = time.perf_counter()
+    venv_path = os.path.abspath(venv_path)
+    mode = compression_for(archive_path)
+    entries = _walk(venv_path)
+    files = [(rel, path) for rel, path, kind in entries if kind == "file"]
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        hashes = dict(zip((rel for rel, _ in files), pool.map(_sha256, (path for _, path in files))))
+
+    cfg = _pyvenv_cfg(venv_path)
+    manifest = {
+        "version": 1,
+        "source_path": venv_path,
+        "platform": platform.system(),
+        "machine": platform.machine(),
+        "python": cfg.get("version_info") or cfg.get("version"),
+        "home": cfg.get("home"),
+        "interpreter": None,
+        "created": time.time(),
+        "files": {},
+        "links": {rel: os.readlink(path) for rel, path, kind in entries if kind == "link"},
+    }
+    if interpreter:
+        st = os.stat(interpreter)
+        manifest["interpreter"] = {"path": interpreter, "size": st.st_size}
+    for rel, path in files:
+        manifest["files"][rel] = [hashes[rel], os.path.getsize(path)]
+
+    tmp_path = f"{archive_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as out, tarfile.open(fileobj=out, mode=f"w|{mode}") as tar:
+            data = json.dumps(manifest, indent=1).encode("utf-8")
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size, info.mtime = len(data), int(manifest["created"])
+            tar.addfile(info, io.BytesIO(data))
+            for rel, path, kind in entries:
+                st = os.lstat(path)
+                info = tarfile.TarInfo(rel)
+                info.mtime, info.mode = st.st_mtime, st.st_mode & 0o777
+                if kind == "dir":
+                    info.type = tarfile.DIRTYPE
+                    tar.addfile(info)
+                elif kind == "link":
+                    info.type, info.linkname = tarfile.SYMTYPE, manifest["links"][rel]
+                    tar.addfile(info)
+                else:
+                    info.size = manifest["files"][rel][1]
+                    with open(path, "rb") as f:
+                        tar.addfile(info, f)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    counts = {"files": len(files), "links": len(manifest["links"]),
+              "bytes": sum(size for _, size in manifest["files"].values()),
+              "archive_bytes": os.path.getsize(archive_path)}
+    return time.perf_counter() - started, counts
+
+
+# ----------------------------
+# Unpack
+# ----------------------------
+
+def read_manifest(archive_path):
+    """The manifest (first member) without reading the rest of the archive."""
+    with tarfile.open(archive_path, mode="r|*") as tar:
+        member = tar.next()
+        if member is None or member.name != MANIFEST_NAME:
+            raise ValueError(f"not a packed venv (no {MANIFEST_NAME} first): {archive_path}")
+        manifest = json.load(tar.extractfile(member))
+    if manifest.get("version") != 1:
+        raise ValueError(f"unsupported pack manifest version: {manifest.get('version')}")
+    return manifest
+
+
+def check_compatible(manifest, interpreter=None):
+    """Raise ValueError if the archive was packed for another platform or Pythoner build."""
+    here = (platform.system(), platform.machine())
+    there = (manifest.get("platform"), manifest.get("machine"))
+    if here != there:
+        raise ValueError(f"packed on {' '.join(filter(None, there))}, this is {' '.join(here)}")
+    packed = manifest.get("interpreter")
+    if interpreter and packed:
+        size = os.stat(interpreter).st_size
+        if size != packed["size"]:
+            raise ValueError(f"packed for a different Pythoner build ({packed['path']}, "
+                             f"{packed['size']} bytes; this one is {size} bytes)")
+    if manifest.get("home") and not os.path.isdir(manifest["home"]):
+        raise ValueError(f"the packed venv's base interpreter folder does not exist here: {manifest['home']}")
+
+
+def _member_path(staging, name, links):
+    """Destination of a member, refusing anything that could land outside staging."""
+    parts = name.split("/")
+    if name.startswith(("/", "\\")) or ":" in parts[0] or ".." in parts or "\\" in name:
+        raise ValueError(f"unsafe path in archive: {name}")
+    for i in range(1, len(parts)):
+        if "/".join(parts[:i]) in links:
+            raise ValueError(f"archive member below a symlink: {name}")
+    return os.path.join(staging, *parts)
+
+
+def _extract(tar, staging, manifest, replacements, old_path, new_path):
+    """Stream members into staging. Returns (rewritten count, [(rel, path)] to verify, [problems])."""
+    links, seen, verify, problems = set(), set(), [], []
+    rewritten = 0
+    for member in tar:
+        if member.name == MANIFEST_NAME:
+            continue  # read before extracting
+        dst = _member_path(staging, member.name, links)
+        if member.isdir():
+            os.makedirs(dst, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if member.issym():
+            target = member.linkname
+            if target.startswith(old_path):
+                target = new_path + target[len(old_path):]
+                rewritten += 1
+            os.symlink(target, dst)
+            links.add(member.name)
+            continue
+        if not member.isfile():
+            raise ValueError(f"unsupported member type in archive: {member.name}")
+        expected = manifest["files"].get(member.name)
+        if expected is None:
+            problems.append(f"{member.name}: not in manifest")
+            continue
+        seen.add(member.name)
+        src = tar.extractfile(member)
+        if _needs_rewrite(member.name):
+            data = src.read()
+            if hashlib.sha256(data).hexdigest() != expected[0]:
+                problems.append(f"{member.name}: hash mismatch")
+            new = data
+            for old, repl in replacements:
+                new = new.replace(old, repl)
+            rewritten += new != data
+            with open(dst, "wb") as f:
+                f.write(new)
+        else:
+            with open(dst, "wb") as f:
+                shutil.copyfileobj(src, f, _CHUNK)
+            verify.append((member.name, dst))
+        os.chmod(dst, member.mode & 0o777)
+        os.utime(dst, (member.mtime, member.mtime))
+    problems += [f"{rel}: missing from archive" for rel in sorted(set(manifest["files"]) - seen)]
+    return rewritten, verify, problems
+
+
+def unpack(archive_path, dest_venv, interpreter=None):
+    """
+    Extract a packed venv to dest_venv (missing or empty), relocated to that
+    path. Raises ValueError for an incompatible or damaged archive.
+    Returns (seconds, {"files", "links", "rewritten", "bytes"}, manifest).
+    """
+    started = time.perf_counter()
+    dest_venv = os.path.abspath(dest_venv)
+    manifest = read_manifest(archive_path)
+    check_compatible(manifest, interpreter)
+    if os.path.isdir(dest_venv) and os.listdir(dest_venv):
+        raise ValueError(f"target folder is not empty: {dest_venv}")
+
+    old_path = manifest["source_path"]
+    staging = f"{dest_venv}.unpacking-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        with tarfile.open(archive_path, mode="r|*") as tar:
+            rewritten, verify, problems = _extract(tar, staging, manifest,
+                                                   _replacements(old_path, dest_venv), old_path, dest_venv)
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            for (rel, _), digest in zip(verify, pool.map(_sha256, (path for _, path in verify))):
+                if digest != manifest["files"][rel][0]:
+                    problems.append(f"{rel}: hash mismatch")
+        if problems:
+            shown = "\n".join(problems[:10]) + (f"\n... and {len(problems) - 10} more" if len(problems) > 10 else "")
+            raise ValueError(f"{len(problems)} file(s) failed verification:\n{shown}")
+        if os.path.isdir(dest_venv):
+            os.rmdir(dest_venv)  # empty, checked above
+        os.replace(staging, dest_venv)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    counts = {"files": len(manifest["files"]), "links": len(manifest["links"]), "rewritten": rewritten,
+              "bytes": sum(size for _, size in manifest["files"].values())}
+    return time.perf_counter() - started, counts, manifest
+
+
+def format_counts(counts):
+    text = f"{counts['files']} files, {counts['bytes'] / 1048576:.1f} MB"
+    if counts.get("archive_bytes"):
+        text += f" -> {counts['archive_bytes'] / 1048576:.1f} MB archive"
+    if counts.get("links"):
+        text += f", {counts['links']} symlinks"
+    if counts.get("rewritten") is not None:
+        text += f", {counts['rewritten']} path reference(s) rewritten"
+    return text
@@ -0,0 +1,222 @@
+"""
+Incremental sync of an existing venv to requirements.txt.
+
+Instead of rebuilding the environment, compare what is installed (read from
+the venv's site-packages with dx_inventory, no subprocess) with what the
+requirements ask for, and derive three sets:
+
+    install   requested but not installed
+    upgrade   installed at a version the requirement does not allow
+    remove    installed, but neither requested nor needed by anything requested
+              (pip/setuptools/wheel are never removed)
+
+The plan is applied with at most one 'pip uninstall' and one 'pip install'
+call; the install call reads a generated requirements file holding only the
+lines that need work, so hashes, markers and index options carry over.
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_sync.py > dx_venv_sync_gz64.txt
+"""
+
+import os
+import re
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+    from packaging.version import Version, InvalidVersion
+except ImportError:  # exact pins are still compared; ranges are assumed satisfied
+    Requirement = None
+
+PROTECTED = ("pip", "setuptools", "wheel")
+SYNC_REQUIREMENTS_FILENAME = ".sync-requirements.txt"
+
+_NAME_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_PIN_RX = re.compile(r"^\s*[A-Za-z0-9][A-Za-z0-9._-]*\s*(?:\[[^\]]*\])?\s*===?\s*([^\s;#,\\*]+)\s*(?:;.*)?$")
+_HASH_RX = re.compile(r"\s--hash[=\s]\S+")
+_EXTRAS_RX = re.compile(r"^\s*[A-Za-z0-9][A-Za-z0-9._-]*\s*\[([^\]]*)\]")
+_EXTRA_MARKER_RX = re.compile(r"""\bextra\s*==\s*["']([^"']+)["']""")
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_requirements(req_path, _seen=None):
+    """
+    (requirements, option lines) from a requirements file, following -r.
+    Each requirement is a dict: key, line (logical, continuations joined),
+    block (physical lines, for rewriting), pin (exact version or None).
+    Editable (-e) and URL lines have no comparable version and are returned
+    as requirements with key None; the plan lists them as skipped.
+    """
+    _seen = _seen if _seen is not None else set()
+    real = os.path.realpath(req_path)
+    if real in _seen:
+        return [], []
+    _seen.add(real)
+    with open(req_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    requirements, options = [], []
+    i = 0
+    while i < len(lines):
+        block = [lines[i]]
+        while block[-1].rstrip().endswith("\\") and i + 1 < len(lines):
+            i += 1
+            block.append(lines[i])
+        i += 1
+        logical = " ".join(l.rstrip().rstrip("\\").strip() for l in block)
+        text = logical.split(" #")[0].strip()
+        if not text or text.startswith("#"):
+            continue
+        if text.startswith(("-r ", "--requirement")):
+            target = text.split(None, 1)[1].strip() if " " in text else text.split("=", 1)[1]
+            sub_reqs, sub_opts = read_requirements(os.path.join(os.path.dirname(req_path), target), _seen)
+            requirements += sub_reqs
+            options += sub_opts
+            continue
+        if text.startswith("-c ") or text.startswith("--constraint"):
+            target = text.split(None, 1)[1].strip() if " " in text else text.split("=", 1)[1]
+            options.append(f"-c {os.path.join(os.path.dirname(os.path.abspath(req_path)), target)}")
+            continue
+        if text.startswith("-") and not text.startswith(("-e", "--editable")):
+            options.append(text)
+            continue
+        if text.startswith("-") or "://" in text.split(";")[0]:
+            requirements.append({"key": None, "line": text, "block": block, "pin": None})
+            continue
+        m = _NAME_RX.match(text)
+        if not m:
+            continue
+        bare = _HASH_RX.sub("", text).strip()
+        pin = _PIN_RX.match(bare)
+        requirements.append({"key": canonical_name(m.group(1)), "line": bare, "block": block,
+                             "pin": pin.group(1) if pin else None})
+    return requirements, options
+
+
+def _applies(req_line):
+    """Marker check; without packaging every line applies."""
+    if Requirement is None:
+        return True
+    try:
+        req = Requirement(req_line)
+    except InvalidRequirement:
+        return True
+    return req.marker is None or req.marker.evaluate({"extra": ""})
+
+
+def _extra_dependencies(entry, dist):
+    """Canonical names pulled in by the extras a requirement asks for."""
+    if not dist.requires:
+        return set()
+    if Requirement is None:
+        # Plain 'extra == "x"' comparisons; any other marker on the line is not evaluated
+        m = _EXTRAS_RX.match(entry["line"])
+        extras = {canonical_name(e) for e in (m.group(1).split(",") if m else ()) if e.strip()}
+        names = set()
+        for text in dist.requires:
+            requirement, _, marker = text.partition(";")
+            name = _NAME_RX.match(requirement)
+            if name and extras & {canonical_name(e) for e in _EXTRA_MARKER_RX.findall(marker)}:
+                names.add(canonical_name(name.group(1)))
+        return names
+    try:
+        extras = Requirement(entry["line"]).extras
+    except InvalidRequirement:
+        return set()
+    names = set()
+    for text in dist.requires:
+        try:
+            req = Requirement(text)
+        except InvalidRequirement:
+            continue
+        if req.marker is not None and any(req.marker.evaluate({"extra": e}) for e in extras):
+            names.add(canonical_name(req.name))
+    return names
+
+
+def _satisfied(entry, installed_version):
+    if entry["pin"] is not None:
+        if Requirement is not None and "===" not in entry["line"]:
+            try:
+                return Version(entry["pin"]) == Version(installed_version)  # 1.26 == 1.26.0
+            except InvalidVersion:
+                pass
+        return entry["pin"] == installed_version
+    if Requirement is None:
+        return True
+    try:
+        return Requirement(entry["line"]).specifier.contains(installed_version, prereleases=True)
+    except (InvalidRequirement, ValueError):
+        return True
+
+
+def plan_sync(requirements, dists, graph, protected=PROTECTED):
+    """
+    requirements: from read_requirements(); dists/graph: dx_inventory
+    installed_distributions() and dependency_graph() of the target venv.
+    Returns {"install": [entry], "upgrade": [(entry, installed)], "remove": [Distribution],
+             "skipped": [entry], "unchanged": int}.
+    """
+    plan = {"install": [], "upgrade": [], "remove": [], "skipped": [], "unchanged": 0}
+    plan["skipped"] = [r for r in requirements if r["key"] is None]
+    if plan["skipped"]:
+        # Whatever those lines install is unknown here, so nothing is removed
+        protected = tuple(protected) + tuple(dists)
+    wanted = [r for r in requirements if r["key"] is not None and _applies(r["line"])]
+    for entry in wanted:
+        dist = dists.get(entry["key"])
+        if dist is None:
+            plan["install"].append(entry)
+        elif not _satisfied(entry, dist.version):
+            plan["upgrade"].append((entry, dist.version))
+        else:
+            plan["unchanged"] += 1
+
+    # Everything requested plus its installed dependency closure stays
+    keep = {canonical_name(p) for p in protected}
+    stack = [r["key"] for r in wanted]
+    for entry in wanted:
+        if entry["key"] in dists:
+            stack.extend(_extra_dependencies(entry, dists[entry["key"]]))
+    while stack:
+        key = stack.pop()
+        if key in keep:
+            continue
+        keep.add(key)
+        stack.extend(graph.get(key, ()))
+    plan["remove"] = [dists[k] for k in sorted(dists) if k not in keep]
+    return plan
+
+
+def format_plan(plan):
+    lines = [f"[Sync] Plan: {len(plan['install'])} to install, {len(plan['upgrade'])} to upgrade, "
+             f"{len(plan['remove'])} to remove, {plan['unchanged']} already satisfied"]
+    if plan["skipped"]:
+        lines[0] += f", {len(plan['skipped'])} not comparable (editable/URL; nothing removed)"
+    lines += [f"  + {e['line']}" for e in plan["install"]]
+    lines += [f"  ~ {e['line']} (installed {installed})" for e, installed in plan["upgrade"]]
+    lines += [f"  - {d.name}=={d.version}" for d in plan["remove"]]
+    return "\n".join(lines)
+
+
+def write_sync_requirements(path, plan, options):
+    """Requirements file with only the lines that need installing or upgrading."""
+    blocks = [e["block"] for e in plan["install"]] + [e["block"] for e, _ in plan["upgrade"]]
+    with open(path, "w", encoding="utf-8") as f:
+        for opt in options:
+            f.write(opt + "\n")
+        for block in blocks:
+            f.write("\n".join(block) + "\n")
+    return path
+
+
+def uninstall_command(python_path, plan):
+    return [python_path, "-m", "pip", "uninstall", "-y", "--disable-pip-version-check",
+            *[d.name for d in plan["remove"]]]
+
+
+def install_command(python_path, sync_requirements_path):
+    return [python_path, "-m", "pip", "install", "--disable-pip-version-check",
+            "-r", sync_requirements_path]
@@ -0,0 +1,363 @@
+"""
+Template cache for venv creation: a fully installed, health-checked venv is
+kept per requirements hash, and new project venvs are cloned from it instead
+of running virtualenv + pip again.
+
+    key:    sha256 of interpreter (path, size, mtime), platform, creation flags
+            and the normalized requirements text (comments/order ignored)
+    store:  <templates>/<key>/<venv folder name>  + TEMPLATE_MARKER
+    clone:  reflink (copy-on-write) where the filesystem supports it, else
+            hardlink, else a parallel copy; pyvenv.cfg, activation scripts,
+            console-script shebangs (also inside Windows .exe launchers),
+            *.pth files and symlinks have the template path rewritten.
+
+Hardlinked clones share file data with the template. pip replaces files
+rather than editing them, so installs in a clone never touch the template;
+set DX_VENV_TEMPLATE_LINK=copy if something edits site-packages in place.
+
+Location: DX_VENV_TEMPLATES, else the per-user cache folder (see template_root).
+Kept:     DX_VENV_TEMPLATES_KEEP most recently used templates (DEFAULT_KEEP).
+
+Bundle for injection like any other helper:
+    python generator.py dx_venv_template.py > dx_venv_template_gz64.txt
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+TEMPLATE_MARKER = ".dx_template.json"
+DEFAULT_KEEP = 5
+COPY_WORKERS = 8
+_FICLONE = 0x40049409          # linux/fs.h
+_reflink_unsupported = set()   # st_dev values where reflink already failed
+
+
+def template_root():
+    override = os.environ.get("DX_VENV_TEMPLATES", "").strip()
+    if override:
+        return override
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "TroikaTronix", "DX-VenvTemplates")
+    if platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Caches/TroikaTronix/DX-VenvTemplates")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dx-venv-templates")
+
+
+def _keep_count():
+    try:
+        return max(1, int(os.environ.get("DX_VENV_TEMPLATES_KEEP", DEFAULT_KEEP)))
+    except ValueError:
+        return DEFAULT_KEEP
+
+
+def _normalized_requirements(requirements_path):
+    if not requirements_path:
+        return []
+    with open(requirements_path, "r", encoding="utf-8") as f:
+        text = f.read().replace("\\\n", " ")
+    lines = (" ".join(line.split(" #")[0].split()) for line in text.splitlines())
+    return sorted(line for line in lines if line and not line.startswith("#"))
+
+
+def template_key(interpreter, requirements_path=None, flags=()):
+    """Hex key for a venv built by interpreter with flags from requirements_path (None: bare venv)."""
+    st = os.stat(interpreter)
+    h = hashlib.sha256()
+    for part in (os.path.abspath(interpreter), st.st_size, st.st_mtime_ns,
+                 platform.system(), platform.machine(), *flags):
+        h.update(f"{part}\0".encode("utf-8"))
+    h.update(b"\1")
+    for line in _normalized_requirements(requirements_path):
+        h.update(line.encode("utf-8") + b"\n")
+    return h.hexdigest()[:32]
+
+
+def _read_marker(key_dir):
+    try:
+        with open(os.path.join(key_dir, TEMPLATE_MARKER), "r", encoding="utf-8") as f:
+            marker = json.load(f)
+        return marker if marker.get("version") == 1 else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_marker(key_dir, marker):
+    path = os.path.join(key_dir, TEMPLATE_MARKER)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def find_template(key, root=None):
+    """Path of the stored venv for key, or None. Only complete, marked templates count."""
+    key_dir = os.path.join(root or template_root(), key)
+    marker = _read_marker(key_dir)
+    if marker is None:
+        return None
+    venv_path = os.path.join(key_dir, marker["folder"])
+    return venv_path if os.path.isfile(os.path.join(venv_path, "pyvenv.cfg")) else None
+
+
+# ----------------------------
+# Helpers: cloning
+# ----------------------------
+
+def _reflink(src, dst):
+    """Copy-on-write clone of one file; False when the filesystem can't."""
+    try:
+        dev = os.stat(src).st_dev
+    except OSError:
+        return False
+    if dev in _reflink_unsupported:
+        return False
+    try:
+        if sys.platform == "darwin":
+            import ctypes
+            libc = ctypes.CDLL("libc.dylib", use_errno=True)
+            if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+                raise OSError(ctypes.get_errno(), "clonefile failed")
+        elif sys.platform.startswith("linux"):
+            import fcntl
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+        else:
+            return False
+        return True
+    except (OSError, AttributeError, ImportError):
+        _reflink_unsupported.add(dev)
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+
+
+def _place_file(src, dst, mode):
+    """Reflink/hardlink/copy one file; returns the method actually used."""
+    if mode in ("auto", "reflink") and _reflink(src, dst):
+        return "reflink"
+    if mode in ("auto", "hardlink"):
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _needs_rewrite(rel_path):
+    parts = rel_path.replace("\\", "/").split("/")
+    name = parts[-1]
+    if rel_path == "pyvenv.cfg" or name.endswith(".pth"):
+        return True
+    # console scripts and activation scripts live directly in bin/ or Scripts/
+    return len(parts) == 2 and parts[0] in ("bin", "Scripts")
+
+
+def _rewrite_file(src, dst, replacements):
+    with open(src, "rb") as f:
+        data = f.read()
+    new = data
+    for old, repl in replacements:
+        new = new.replace(old, repl)
+    if new == data:
+        return False
+    with open(dst, "wb") as f:
+        f.write(new)
+    shutil.copymode(src, dst)
+    return True
+
+
+def _replacements(old_path, new_path):
+    pairs = [(old_path, new_path)]
+    if os.sep == "\\":
+        pairs.append((old_path.replace("\\", "/"), new_path.replace("\\", "/")))
+    return [(o.encode("utf-8"), n.encode("utf-8")) for o, n in pairs]
+
+
+def clone_tree(src_venv, dst_venv, final_path=None, mode=None):
+    """
+    Clone src_venv to dst_venv (which must not exist), rewriting absolute
+    references to src_venv into final_path (default dst_venv; differs when
+    cloning into a staging folder that is renamed afterwards).
+    Returns {method: file count, "rewritten": n}.
+    """
+    mode = mode or os.environ.get("DX_VENV_TEMPLATE_LINK", "auto").strip().lower() or "auto"
+    src_venv, dst_venv = os.path.abspath(src_venv), os.path.abspath(dst_venv)
+    final_path = os.path.abspath(final_path or dst_venv)
+    replacements = _replacements(src_venv, final_path)
+    jobs = []
+    for root, dirs, files in os.walk(src_venv):
+        rel_root = os.path.relpath(root, src_venv)
+        out_root = dst_venv if rel_root == "." else os.path.join(dst_venv, rel_root)
+        os.makedirs(out_root, exist_ok=True)
+        for name in dirs + files:
+            src = os.path.join(root, name)
+            if not os.path.islink(src):
+                continue
+            target = os.readlink(src)
+            if target.startswith(src_venv):
+                target = final_path + target[len(src_venv):]
+            os.symlink(target, os.path.join(out_root, name),
+                       target_is_directory=os.path.isdir(src))
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+        for name in files:
+            src = os.path.join(root, name)
+            if os.path.islink(src):
+                continue
+            rel = name if rel_root == "." else os.path.join(rel_root, name)
+            if rel == TEMPLATE_MARKER:
+                continue
+            jobs.append((src, os.path.join(out_root, name), _needs_rewrite(rel)))
+
+    def work(job):
+        src, dst, rewrite = job
+        if rewrite and _rewrite_file(src, dst, replacements):
+            return "rewritten"
+        return _place_file(src, dst, mode)
+
+    counts = {}
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        for method in pool.map(work, jobs):
+            counts[method] = counts.get(method, 0) + 1
+    return counts
+
+
+def relocate(venv_path, old_path, new_path=None):
+    """
+    Rewrite references to old_path inside venv_path (in place) so the venv
+    works once moved to new_path (default venv_path). Rewritten files are
+    replaced, not edited, so files shared by hardlink are never changed.
+    Returns the number of files and symlinks rewritten.
+    """
+    venv_path = os.path.abspath(venv_path)
+    old_path = os.path.abspath(old_path)
+    new_path = os.path.abspath(new_path or venv_path)
+    replacements = _replacements(old_path, new_path)
+    rewritten = 0
+    for root, dirs, files in os.walk(venv_path):
+        rel_root = os.path.relpath(root, venv_path)
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                target = os.readlink(path)
+                if target.startswith(old_path):
+                    os.remove(path)
+                    os.symlink(new_path + target[len(old_path):], path,
+                               target_is_directory=name in dirs)
+                    rewritten += 1
+                continue
+            rel = name if rel_root == "." else os.path.join(rel_root, name)
+            if name in files and _needs_rewrite(rel):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                if _rewrite_file(path, tmp_path, replacements):
+                    os.replace(tmp_path, path)
+                    rewritten += 1
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+    return rewritten
+
+
+def _staging_path(dst):
+    return f"{dst}.cloning-{os.getpid()}"
+
+
+def _move_into_place(staging, dst):
+    """Atomic rename; an empty pre-created destination folder is replaced."""
+    if os.path.isdir(dst) and not os.listdir(dst):
+        os.rmdir(dst)
+    os.replace(staging, dst)
+
+
+def clone_template(template_venv, dst_venv):
+    """
+    Clone a stored template to dst_venv. Built beside dst_venv first and
+    renamed into place, so a failure never leaves a half-cloned venv.
+    Returns (seconds, counts).
+    """
+    started = time.perf_counter()
+    staging = _staging_path(dst_venv)
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        counts = clone_tree(template_venv, staging, final_path=dst_venv)
+        _move_into_place(staging, dst_venv)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    key_dir = os.path.dirname(template_venv)
+    marker = _read_marker(key_dir)
+    if marker is not None:
+        marker["last_used"] = time.time()
+        _write_marker(key_dir, marker)
+    return time.perf_counter() - started, counts
+
+
+# ----------------------------
+# Helpers: storing and pruning
+# ----------------------------
+
+def store_template(venv_path, key, root=None):
+    """
+    Keep a copy of a freshly created, health-checked venv under key.
+    The copy is completed before the marker is written, so readers never see
+    a partial template. Returns the template venv path (existing one if
+    another process stored it first).
+    """
+    root = root or template_root()
+    key_dir = os.path.join(root, key)
+    existing = find_template(key, root)
+    if existing:
+        return existing
+    folder = os.path.basename(os.path.abspath(venv_path))
+    staging_dir = _staging_path(key_dir)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    try:
+        # a full copy: the project venv will change, the template must not
+        counts = clone_tree(venv_path, os.path.join(staging_dir, folder),
+                            final_path=os.path.join(key_dir, folder), mode="copy")
+        now = time.time()
+        _write_marker(staging_dir, {"version": 1, "key": key, "folder": folder, "created": now,
+                                    "last_used": now, "files": sum(counts.values())})
+        os.makedirs(root, exist_ok=True)
+        try:
+            os.replace(staging_dir, key_dir)
+        except OSError:
+            shutil.rmtree(staging_dir, ignore_errors=True)  # lost the race; theirs is as good
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    prune(root=root, keep=_keep_count())
+    return find_template(key, root)
+
+
+def prune(root=None, keep=None):
+    """Remove all but the keep most recently used templates; returns how many were removed."""
+    root = root or template_root()
+    keep = _keep_count() if keep is None else keep
+    try:
+        entries = [e.path for e in os.scandir(root) if e.is_dir() and ".cloning-" not in e.name]
+    except OSError:
+        return 0
+    marked = [(_read_marker(p) or {}).get("last_used", 0) for p in entries]
+    removed = 0
+    for _, path in sorted(zip(marked, entries), reverse=True)[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def format_counts(counts):
+    return ", ".join(f"{n} {method}" for method, n in sorted(counts.items()))
@@ -0,0 +1,209 @@
+"""
+Shared wheelhouse for venv creation: one per-user folder of built wheels
+that every project installs from offline.
+
+    prefetch:  pip wheel -r requirements.txt -w <wheelhouse> --find-links <wheelhouse>
+    install:   pip install --no-index --find-links <wheelhouse> -r requirements.txt
+
+The prefetch builds sdist-only pins into wheels while the index is reachable
+(a bare 'pip download' would store the sdist, whose build backend, e.g.
+setuptools, cannot be resolved by the offline install), and reuses wheels
+already in the folder instead of downloading them again.
+
+Creating the same environment twice (or two projects sharing packages) then
+downloads each file once. Use is recorded per file in INDEX_FILENAME; after
+each install the folder is trimmed back to its size budget, least recently
+used files first.
+
+Location: DX_WHEELHOUSE, else the per-user cache folder (see default_wheelhouse).
+Budget:   DX_WHEELHOUSE_MAX_MB, else DEFAULT_MAX_MB.
+
+Bundle for injection like any other helper:
+    python generator.py dx_wheelhouse.py > dx_wheelhouse_gz64.txt
+"""
+
+import os
+import re
+import json
+import time
+import platform
+from urllib.parse import urlsplit, unquote
+from urllib.request import url2pathname
+
+INDEX_FILENAME = ".wheelhouse_index.json"
+DEFAULT_MAX_MB = 2048
+_DIST_EXTENSIONS = (".whl", ".tar.gz", ".zip")
+_PIN_RX = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*===?\s*([^\s;#,\\]+)\s*(?:[;#\\].*)?$")
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def default_wheelhouse():
+    override = os.environ.get("DX_WHEELHOUSE", "").strip()
+    if override:
+        return override
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "TroikaTronix", "DX-Wheelhouse")
+    if platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Caches/TroikaTronix/DX-Wheelhouse")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dx-wheelhouse")
+
+
+def max_bytes():
+    try:
+        return int(float(os.environ.get("DX_WHEELHOUSE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+
+def _dist_name_version(filename):
+    lower = filename.lower()
+    if lower.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        return (canonical_name(parts[0]), parts[1]) if len(parts) in (5, 6) else None
+    for ext in (".tar.gz", ".zip"):
+        if lower.endswith(ext):
+            name, sep, version = filename[:-len(ext)].rpartition("-")
+            return (canonical_name(name), version) if sep else None
+    return None
+
+
+def dist_files(wheelhouse):
+    """{filename: size} of every wheel/sdist in the wheelhouse."""
+    files = {}
+    try:
+        for entry in os.scandir(wheelhouse):
+            if entry.is_file() and entry.name.lower().endswith(_DIST_EXTENSIONS):
+                files[entry.name] = entry.stat().st_size
+    except OSError:
+        pass
+    return files
+
+
+def covers_pins(wheelhouse, requirements_path):
+    """
+    True if requirements_path holds only exact pins (no includes or options)
+    and the wheelhouse has a wheel for every one of them. Then the offline
+    install can be tried before any network prefetch. (An sdist does not
+    count: building it offline would need its build backend.)
+    """
+    have = {_dist_name_version(f) for f in dist_files(wheelhouse) if f.lower().endswith(".whl")}
+    try:
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            lines = f.read().replace("\\\n", " ").splitlines()
+    except OSError:
+        return False
+    pinned = 0
+    for line in lines:
+        text = re.sub(r"\s--hash[=\s]\S+", "", line.split(" #")[0]).strip()
+        if not text or text.startswith("#"):
+            continue
+        m = _PIN_RX.match(text)
+        if not m or (canonical_name(m.group(1)), m.group(2)) not in have:
+            return False
+        pinned += 1
+    return pinned > 0
+
+
+def prefetch_command(python_path, requirements_path, wheelhouse):
+    return [python_path, "-m", "pip", "wheel", "--disable-pip-version-check",
+            "-r", requirements_path, "-w", wheelhouse, "--find-links", wheelhouse]
+
+
+def install_command(python_path, requirements_path, wheelhouse, report_path=None):
+    cmd = [python_path, "-m", "pip", "install", "--disable-pip-version-check",
+           "--no-index", "--find-links", wheelhouse, "-r", requirements_path]
+    if report_path:
+        cmd += ["--report", report_path]
+    return cmd
+
+
+def _load_index(wheelhouse):
+    try:
+        with open(os.path.join(wheelhouse, INDEX_FILENAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("last_used", {}) if data.get("version") == 1 else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_index(wheelhouse, last_used):
+    path = os.path.join(wheelhouse, INDEX_FILENAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "last_used": last_used}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def files_from_report(report_path):
+    """Wheelhouse filenames pip actually installed, from 'pip install --report'."""
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return []
+    used = []
+    for item in report.get("install", []):
+        url = (item.get("download_info") or {}).get("url", "")
+        if url.startswith("file:"):
+            used.append(os.path.basename(url2pathname(unquote(urlsplit(url).path))))
+    return used
+
+
+def mark_used(wheelhouse, filenames):
+    last_used = _load_index(wheelhouse)
+    now = time.time()
+    for name in filenames:
+        last_used[name] = now
+    _save_index(wheelhouse, last_used)
+
+
+def evict(wheelhouse, budget=None, keep=()):
+    """
+    Delete least recently used files until the wheelhouse fits the budget.
+    Files never recorded as used count from their mtime (i.e. download time).
+    keep: filenames just used, never evicted in this pass.
+    Returns (files removed, bytes freed, bytes remaining).
+    """
+    budget = max_bytes() if budget is None else budget
+    files = dist_files(wheelhouse)
+    total = sum(files.values())
+    if total <= budget:
+        return 0, 0, total
+    last_used = _load_index(wheelhouse)
+
+    def stamp(name):
+        try:
+            return max(last_used.get(name, 0), os.path.getmtime(os.path.join(wheelhouse, name)))
+        except OSError:
+            return 0
+
+    removed = freed = 0
+    protected = set(keep)
+    for name in sorted(files, key=stamp):
+        if total <= budget:
+            break
+        if name in protected:
+            continue
+        try:
+            os.remove(os.path.join(wheelhouse, name))
+        except OSError:
+            continue
+        total -= files[name]
+        freed += files[name]
+        removed += 1
+        last_used.pop(name, None)
+    _save_index(wheelhouse, {k: v for k, v in last_used.items() if k in files})
+    return removed, freed, total
+
+
+def ensure_wheelhouse(path=None):
+    path = path or default_wheelhouse()
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,344 @@
+# local_index_server.py
+"""
+A stand-in package index for exercising the requirement validators offline.
+
+Serves the parts of the PyPI API the VENV-Manager scripts use, from fixture data:
+
+    /pypi/<name>/json            project JSON (info + releases)
+    /pypi/<name>/<version>/json  release JSON (info.requires_dist + urls)
+    /simple/                     simple index (HTML)
+    /simple/<name>/              simple project page (HTML, or PEP 691 JSON
+                                 when Accept: application/vnd.pypi.simple.v1+json)
+    /packages/<filename>         placeholder file bodies matching size/sha256
+
+Failure injection (all per request, seeded so runs are repeatable):
+    latency      seconds slept before answering
+    error_rate   fraction of requests answered with 503
+    tls_failure  fraction of TLS connections aborted with a handshake alert
+                 (only when serving https with certfile/keyfile)
+
+Fixture format (JSON file or dict):
+    {"requests": {"2.31.0": {"requires_python": ">=3.7",
+                             "requires_dist": ["idna<4,>=2.5"],
+                             "files": ["requests-2.31.0-py3-none-any.whl",
+                                       "requests-2.31.0.tar.gz"],
+                             "yanked": false}}}
+
+Files may also be dicts with "filename", "size", "yanked".
+
+Run standalone:
+    python local_index_server.py fixtures.json --port 8765 --latency 0.05
+then point a validator at it:
+    DX_PYPI_URL=http://127.0.0.1:8765
+"""
+
+import hashlib
+import json
+import random
+import re
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+_TLS_ALERT_HANDSHAKE_FAILURE = b"\x15\x03\x01\x00\x02\x02\x28"
+
+
+def canonical_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _file_body(filename, size):
+    """Deterministic placeholder bytes, so digests are stable between runs."""
+    seed = hashlib.sha256(filename.encode("utf-8")).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+def _default_size(filename):
+    return 4096 + int(hashlib.sha256(filename.encode("utf-8")).hexdigest()[:4], 16)
+
+
+def _release_sort_key(version):
+    # Good enough for fixture ordering; validators do the real PEP 440 work
+    return [int(p) if p.isdigit() else -1 for p in re.split(r"[.+!-]", version)]
+
+
+class FixtureIndex:
+    """Fixture projects plus the placeholder body of every file they list."""
+
+    def __init__(self, fixtures):
+        self.projects = {}
+        self.files = {}
+        self.base_url = ""
+        for name, releases in fixtures.items():
+            self.projects[canonical_name(name)] = (name, releases)
+            for release in releases.values():
+                for raw in release.get("files", []):
+                    self._file_entry(raw, release)
+
+    def _file_entry(self, raw, release):
+        if isinstance(raw, str):
+            raw = {"filename": raw}
+        filename = raw["filename"]
+        size = int(raw.get("size") or _default_size(filename))
+        if filename not in self.files:
+            self.files[filename] = _file_body(filename, size)
+        body = self.files[filename]
+        return {
+            "filename": filename,
+            "url": f"{self.base_url}/packages/{filename}",
+            "packagetype": "bdist_wheel" if filename.endswith(".whl") else "sdist",
+            "size": len(body),
+            "digests": {"sha256": hashlib.sha256(body).hexdigest()},
+            "requires_python": release.get("requires_python"),
+            "yanked": bool(raw.get("yanked", release.get("yanked", False))),
+        }
+
+    def _info(self, name, version, release):
+        return {
+            "name": name,
+            "version": version,
+            "requires_python": release.get("requires_python"),
+            "requires_dist": release.get("requires_dist") or None,
+        }
+
+    def project_json(self, key):
+        name, releases = self.projects[key]
+        rendered = {v: [self._file_entry(f, r) for f in r.get("files", [])] for v, r in releases.items()}
+        latest = max(releases, key=_release_sort_key) if releases else ""
+        return {
+            "info": self._info(name, latest, releases.get(latest, {})),
+            "releases": rendered,
+            "urls": rendered.get(latest, []),
+        }
+
+    def release_json(self, key, version):
+        name, releases = self.projects[key]
+        release = releases.get(version)
+        if release is None:
+            return None
+        return {
+            "info": self._info(name, version, release),
+            "urls": [self._file_entry(f, release) for f in release.get("files", [])],
+        }
+
+    def simple_files(self, key):
+        _, releases = self.projects[key]
+        return [self._file_entry(f, r) for r in releases.values() for f in r.get("files", [])]
+
+
+class IndexStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.tls_failures = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for field, value in counts.items():
+                setattr(self, field, getattr(self, field) + value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "errors": self.errors,
+                "tls_failures": self.tls_failures,
+            }
+
+
+class _IndexHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.stats.add(requests=1, bytes_sent=len(body))
+
+    def _send_json(self, data, content_type="application/json"):
+        self._send(200, json.dumps(data).encode("utf-8"), content_type)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and server.roll() < server.error_rate:
+            server.stats.add(errors=1)
+            self._send(503, b"injected failure", "text/plain")
+            return
+
+        path = unquote(urlsplit(self.path).path)
+        parts = [p for p in path.split("/") if p]
+        index = server.index
+
+        if len(parts) in (3, 4) and parts[0] == "pypi" and parts[-1] == "json":
+            key = canonical_name(parts[1])
+            if key in index.projects:
+                data = index.project_json(key) if len(parts) == 3 else index.release_json(key, parts[2])
+                if data is not None:
+                    self._send_json(data)
+                    return
+        elif parts == ["simple"]:
+            links = "".join(f'<a href="/simple/{k}/">{n}</a>\n' for k, (n, _) in sorted(index.projects.items()))
+            self._send(200, f"<!DOCTYPE html><html><body>\n{links}</body></html>".encode("utf-8"), "text/html")
+            return
+        elif len(parts) == 2 and parts[0] == "simple":
+            key = canonical_name(parts[1])
+            if key in index.projects:
+                files = index.simple_files(key)
+                if SIMPLE_JSON in (self.headers.get("Accept") or ""):
+                    self._send_json({
+                        "meta": {"api-version": "1.0"},
+                        "name": key,
+                        "files": [{
+                            "filename": f["filename"],
+                            "url": f["url"],
+                            "hashes": f["digests"],
+                            "requires-python": f["requires_python"],
+                            "yanked": f["yanked"],
+                        } for f in files],
+                    }, SIMPLE_JSON)
+                    return
+                links = "".join(
+                    f'<a href="{f["url"]}#sha256={f["digests"]["sha256"]}"'
+                    + (f' data-requires-python="{f["requires_python"].replace(">", "&gt;").replace("<", "&lt;")}"' if f["requires_python"] else "")
+                    + (' data-yanked=""' if f["yanked"] else "")
+                    + f'>{f["filename"]}</a>\n'
+                    for f in files
+                )
+                self._send(200, f"<!DOCTYPE html><html><body>\n{links}</body></html>".encode("utf-8"), "text/html")
+                return
+        elif len(parts) == 2 and parts[0] == "packages" and parts[1] in index.files:
+            self._send(200, index.files[parts[1]], "application/octet-stream")
+            return
+
+        self._send(404, b"not found", "text/plain")
+
+
+class LocalIndexServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in index. Use as a context manager:
+
+        with LocalIndexServer(fixtures, latency=0.02) as srv:
+            url = srv.url
+            ...
+            print(srv.stats.snapshot())
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0,
+                 tls_failure=0.0, certfile=None, keyfile=None, seed=0, verbose=False):
+        if isinstance(fixtures, str):
+            with open(fixtures, "r", encoding="utf-8") as f:
+                fixtures = json.load(f)
+        self.index = FixtureIndex(fixtures)
+        self.stats = IndexStats()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tls_failure = tls_failure
+        self.verbose = verbose
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._tls = None
+        if certfile:
+            self._tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self._tls.load_cert_chain(certfile, keyfile)
+        super().__init__((host, port), _IndexHandler)
+        scheme = "https" if self._tls else "http"
+        self.url = f"{scheme}://{host}:{self.server_address[1]}"
+        self.index.base_url = self.url
+        self._thread = None
+
+    def roll(self):
+        with self._rng_lock:
+            return self._rng.random()
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        if self._tls is None:
+            return sock, addr
+        if self.tls_failure and self.roll() < self.tls_failure:
+            self.stats.add(tls_failures=1)
+            try:
+                sock.settimeout(2)
+                sock.recv(4096)
+                sock.sendall(_TLS_ALERT_HANDSHAKE_FAILURE)
+            except OSError:
+                pass
+            sock.close()
+            raise OSError("injected TLS failure")
+        return self._tls.wrap_socket(sock, server_side=True), addr
+
+    def handle_error(self, request, client_address):
+        # Aborted handshakes and dropped clients are expected under failure injection
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve fixture data as a PyPI-compatible index.")
+    parser.add_argument("fixtures", help="fixture JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--tls-failure", type=float, default=0.0, help="fraction of aborted TLS handshakes")
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = LocalIndexServer(args.fixtures, args.host, args.port, args.latency, args.error_rate,
+                              args.tls_failure, args.certfile, args.keyfile, args.seed, verbose=True)
+    print(f"Serving {len(server.index.projects)} projects at {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.snapshot()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,16 @@ import sys
 import importlib
 
 # iz_input 1 "Trigger"
+# iz_input 2 "Hash Mode"     # 0: plain pins, 1: add --hash=sha256 lines for pip --require-hashes
+# iz_input 3 "Wheelhouse"    # optional folder of wheels/sdists to hash instead of asking the index
+# iz_input 4 "Pin Scope"     # 0: every package, 1: top-level only, 2: top-level + constraints.txt with all pins
+# iz_input 5 "Merge Mode"    # 0: overwrite, 1: merge into the existing file(s), keeping layout and comments
 # iz_output 1 "Status Message"
 
 dsh = None  # module-level reference
+lockfile = None   # dx_lockfile, only needed for Hash Mode
+inventory = None  # dx_inventory; falls back to dsh.execute_pip_list() when not available
+merger = None     # dx_requirements_merge, only needed for Merge Mode
 def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
     try:
         mod = sys.modules.get(module_name)
@@ -51,11 +58,14 @@ def import_many(names, strict=True):
         return None
 
 
-def python_init(izzyTrigger):
-    global dsh
+def python_init(izzyTrigger, hash_mode=0, wheelhouse="", pin_scope=0, merge_mode=0):
+    global dsh, lockfile, inventory, merger
     mName = "dx_system_helpers"
     try:
         dsh = import_injected(mName, strict=True)
+        lockfile = import_injected("dx_lockfile")
+        inventory = import_injected("dx_inventory")
+        merger = import_injected("dx_requirements_merge")
         return "init"
     except RuntimeError:
         print("Unable to load injected module: " + mName)
@@ -64,13 +74,32 @@ def python_init(izzyTrigger):
         return "INIT error"
 
 
-def python_main(izzyTrigger):
+def _merge_into_existing(path, content_lines, diffs):
+    """
+    Merge Mode: content for dsh.write_to_file() with the generated lines merged
+    into the file already at path; the diff summary is appended to diffs.
+    """
+    if not os.path.isfile(path):
+        return content_lines
+    with open(path, 'r') as f:
+        old_text = f.read()
+    text, summary = merger.merge_requirements(old_text, "".join(content_lines))
+    diffs.append(merger.format_summary(summary, os.path.basename(path)))
+    return [text]
+
+
+def python_main(izzyTrigger, hash_mode=0, wheelhouse="", pin_scope=0, merge_mode=0):
     """
     Generates a requirements.txt file listing all installed Python packages,
     excluding those in the bad-list.
 
     Args:
     izzyTrigger (bool): A trigger input to start the script execution.
+    hash_mode (bool): Lock every pin with its sha256 digests.
+    wheelhouse (str): Folder whose files are hashed in preference to the index.
+    pin_scope (int): 0 all packages, 1 top-level only, 2 top-level plus a
+        constraints.txt holding every pin (referenced with -c).
+    merge_mode (bool): Merge into the existing file(s) instead of overwriting.
 
     Returns:
     str: Status message indicating the outcome of the operation.
@@ -84,20 +113,68 @@ def python_main(izzyTrigger):
     filepath = os.path.join(project_directory, 'requirements.txt')
 
     if izzyTrigger:
-        # Execute pip list and handle errors
-        success, result = dsh.execute_pip_list()
-        if not success:
-            return result  # Return error message from execute_pip_list
-
-        # Prepare the content for requirements.txt, excluding packages in bad_list
-        content_lines = []
-        for line in result.splitlines()[2:]:  # Skip header lines
-            package, version = line.split()[:2]
-            if package.lower() not in bad_list:
-                content_lines.append(f"{package}=={version}\n")
+        if merge_mode and merger is None:
+            return "Merge Mode needs the dx_requirements_merge module; requirements.txt not written."
+
+        if inventory is not None:
+            # importlib.metadata scan, cached per site-packages mtime
+            pins = inventory.installed_pins(exclude=bad_list)
+        else:
+            # Execute pip list and handle errors
+            success, result = dsh.execute_pip_list()
+            if not success:
+                return result  # Return error message from execute_pip_list
+
+            # Prepare the content for requirements.txt, excluding packages in bad_list
+            pins = []
+            for line in result.splitlines()[2:]:  # Skip header lines
+                package, version = line.split()[:2]
+                if package.lower() not in bad_list:
+                    pins.append((package, version))
+
+        header_lines, notes, diffs = [], [], []
+        if pin_scope and hash_mode:
+            # --require-hashes needs every package hashed in the requirements file itself
+            notes.append("Pin Scope ignored: Hash Mode locks every installed package.")
+        elif pin_scope:
+            if inventory is None:
+                return "Pin Scope needs the dx_inventory module; requirements.txt not written."
+            all_pins = pins
+            pins = [(d.name, d.version) for d in inventory.top_level(exclude=bad_list)]
+            notes.append(f"{len(pins)} top-level of {len(all_pins)} installed packages")
+            header_lines.append("# Top-level packages only; their dependencies are resolved by pip\n")
+            if pin_scope == 2:
+                constraints_path = os.path.join(project_directory, 'constraints.txt')
+                constraint_lines = [f"{package}=={version}\n" for package, version in all_pins]
+                if merge_mode:
+                    constraint_lines = _merge_into_existing(constraints_path, constraint_lines, diffs)
+                success, message = dsh.write_to_file(constraints_path, constraint_lines)
+                if not success:
+                    return message
+                header_lines.append("-c constraints.txt\n")
+                notes.append("full pins written to constraints.txt")
+
+        if hash_mode:
+            if lockfile is None:
+                return "Hash Mode needs the dx_lockfile module; requirements.txt not written."
+            hashes, hash_errors = lockfile.lock_hashes(pins, project_directory, wheelhouse or None)
+            if hash_errors:
+                # One unhashed pin would make pip reject the whole hash-checked file
+                return "Some pins have no hashes; requirements.txt not written:\n" + "\n".join(hash_errors)
+            content_lines = [lockfile.format_hashed_pin(p, v, hashes[(p, v)]) for p, v in pins]
+        else:
+            content_lines = [f"{package}=={version}\n" for package, version in pins]
+
+        content_lines = header_lines + content_lines
+        if merge_mode:
+            content_lines = _merge_into_existing(filepath, content_lines, diffs)
 
         # Write to requirements.txt and handle errors
         success, message = dsh.write_to_file(filepath, content_lines)
+        if success and notes:
+            message += " (" + "; ".join(notes) + ")"
+        if success and diffs:
+            message += "\n" + "\n".join(diffs)
         return message
 
     return "Script did not run. Trigger not activated."
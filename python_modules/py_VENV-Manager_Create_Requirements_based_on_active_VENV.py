@@ -3,7 +3,14 @@ A module to generate a requirements.txt file listing all installed Python packag
 
 This script generates a file excluding certain packages (e.g., build tools) and
 adds metadata such as Python version, platform, and timestamp. It is optimized
-to operate only when triggered.
+to operate only when triggered. With Hash Mode on, every pin is followed by its
+--hash=sha256 lines (pip --require-hashes), via the dx_lockfile helper.
+Installed packages are read with the dx_inventory helper (importlib.metadata,
+cached per site-packages mtime); 'pip list' is only used when it is missing.
+Pin Scope can limit the file to top-level packages (those no other installed
+package depends on), optionally with every pin moved to constraints.txt.
+Merge Mode updates an existing requirements.txt in place (dx_requirements_merge)
+so comments, grouping and hand-written ranges survive, and reports the diff.
 
 Functions:
     python_main: Main function to execute the requirements file creation process.
@@ -13,12 +20,63 @@ import subprocess
 import sys
 import os
 import platform
+import importlib
 from datetime import datetime
 
 # iz_input 1 "Trigger"
+# iz_input 2 "Hash Mode"     # 0: plain pins, 1: add --hash=sha256 lines for pip --require-hashes
+# iz_input 3 "Wheelhouse"    # optional folder of wheels/sdists to hash instead of asking the index
+# iz_input 4 "Pin Scope"     # 0: every package, 1: top-level only, 2: top-level + constraints.txt with all pins
+# iz_input 5 "Merge Mode"    # 0: overwrite, 1: merge into the existing file(s), keeping layout and comments
 # iz_output 1 "Status Message"
 
-def python_main(izzyTrigger):
+lockfile = None   # dx_lockfile, only needed for Hash Mode
+inventory = None  # dx_inventory; falls back to 'pip list' when not available
+merger = None     # dx_requirements_merge, only needed for Merge Mode
+
+
+def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
+    try:
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            mod = importlib.import_module(module_name)
+        elif reload:
+            mod = importlib.reload(mod)
+        return mod
+    except Exception as e:
+        print(f"Import failed for '{module_name}': {type(e).__name__}: {e}")
+        print("Hint: ensure your injector actor ran and remains active, or the module is on sys.path.")
+        if strict:
+            raise RuntimeError(f"Required module not available: {module_name}") from e
+        return None
+
+
+def python_init(izzyTrigger, hash_mode=0, wheelhouse="", pin_scope=0, merge_mode=0):
+    global lockfile, inventory, merger
+    lockfile = import_injected("dx_lockfile")
+    inventory = import_injected("dx_inventory")
+    merger = import_injected("dx_requirements_merge")
+    return "init"
+
+
+def _write_requirements(path, text, merge_mode):
+    """
+    Write text to path, or merge it into the file already there.
+    Returns the merge's diff summary, or None when the file was overwritten.
+    """
+    if merge_mode and os.path.isfile(path):
+        with open(path, 'r', newline='') as f:
+            old_text = f.read()
+        text, summary = merger.merge_requirements(old_text, text)
+        with open(path, 'w', newline='') as f:
+            f.write(text)
+        return merger.format_summary(summary, os.path.basename(path))
+    with open(path, 'w') as f:
+        f.write(text)
+    return None
+
+
+def python_main(izzyTrigger, hash_mode=0, wheelhouse="", pin_scope=0, merge_mode=0):
     """
     Generates a requirements.txt file listing all installed Python packages,
     excluding those in the bad-list, and includes helpful header comments
@@ -26,6 +84,11 @@ def python_main(izzyTrigger):
 
     Args:
     izzyTrigger (bool): A trigger input to start the script execution.
+    hash_mode (bool): Lock every pin with its sha256 digests.
+    wheelhouse (str): Folder whose files are hashed in preference to the index.
+    pin_scope (int): 0 all packages, 1 top-level only, 2 top-level plus a
+        constraints.txt holding every pin (referenced with -c).
+    merge_mode (bool): Merge into the existing file(s) instead of overwriting.
 
     Returns:
     str: Status message indicating the outcome of the operation.
@@ -35,29 +98,84 @@ def python_main(izzyTrigger):
     python_modules_path = os.path.join(os.path.dirname(__file__), '')
     project_directory = os.path.abspath(os.path.join(python_modules_path, os.pardir))
     filepath = os.path.join(project_directory, 'requirements.txt')
+    constraints_path = os.path.join(project_directory, 'constraints.txt')
 
     if izzyTrigger:
         try:
-            result = subprocess.run([sys.executable, '-m', 'pip', 'list'], stdout=subprocess.PIPE, text=True, stderr=subprocess.PIPE)
+            if inventory is not None:
+                pins = inventory.installed_pins(exclude=bad_list)
+            else:
+                result = subprocess.run([sys.executable, '-m', 'pip', 'list'], stdout=subprocess.PIPE, text=True, stderr=subprocess.PIPE)
 
-            if result.returncode != 0:
-                return "Error in running pip list: " + result.stderr
+                if result.returncode != 0:
+                    return "Error in running pip list: " + result.stderr
+
+                pins = []
+                for line in result.stdout.splitlines()[2:]:  # Skip pip list header
+                    package, version = line.split()[:2]
+                    if package.lower() not in bad_list:
+                        pins.append((package, version))
 
             python_version = platform.python_version()
             platform_info = f"{platform.system()} {platform.release()}"
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
+            all_pins, notes = None, []
+            if pin_scope and hash_mode:
+                # --require-hashes needs every package hashed in the requirements file itself
+                notes.append("Pin Scope ignored: Hash Mode locks every installed package.")
+            elif pin_scope:
+                if inventory is None:
+                    return "Pin Scope needs the dx_inventory module; requirements.txt not written."
+                all_pins = pins
+                pins = [(d.name, d.version) for d in inventory.top_level(exclude=bad_list)]
+                notes.append(f"{len(pins)} top-level of {len(all_pins)} installed packages")
+
+            if merge_mode and merger is None:
+                return "Merge Mode needs the dx_requirements_merge module; requirements.txt not written."
+
+            hashes = None
+            if hash_mode:
+                if lockfile is None:
+                    return "Hash Mode needs the dx_lockfile module; requirements.txt not written."
+                hashes, hash_errors = lockfile.lock_hashes(pins, project_directory, wheelhouse or None)
+                if hash_errors:
+                    # One unhashed pin would make pip reject the whole hash-checked file
+                    return "Some pins have no hashes; requirements.txt not written:\n" + "\n".join(hash_errors)
+
+            header = (f"# Created with Pythoner running Python version {python_version}\n"
+                      f"# Created on platform {platform_info}\n"
+                      f"# Timestamp: {timestamp}\n")
+            diffs = []
             try:
-                with open(filepath, 'w') as f:
-                    # Write header comments
-                    f.write(f"# Created with Pythoner running Python version {python_version}\n")
-                    f.write(f"# Created on platform {platform_info}\n")
-                    f.write(f"# Timestamp: {timestamp}\n")
-                    for line in result.stdout.splitlines()[2:]:  # Skip pip list header
-                        package, version = line.split()[:2]
-                        if package.lower() not in bad_list:
-                            f.write(f"{package}=={version}\n")
-                return "requirements.txt created at " + filepath
+                if all_pins is not None and pin_scope == 2:
+                    text = header + "# Full pins of the environment; applied through -c in requirements.txt\n"
+                    text += "".join(f"{package}=={version}\n" for package, version in all_pins)
+                    diffs.append(_write_requirements(constraints_path, text, merge_mode))
+                    notes.append("full pins written to constraints.txt")
+
+                # Header comments, then one pin (or hashed pin block) per package
+                text = header
+                if all_pins is not None:
+                    text += "# Top-level packages only; their dependencies are resolved by pip\n"
+                    if pin_scope == 2:
+                        text += "-c constraints.txt\n"
+                if hashes is not None:
+                    text += "# Hash-locked: install with pip install --require-hashes -r requirements.txt\n"
+                for package, version in pins:
+                    if hashes is None:
+                        text += f"{package}=={version}\n"
+                    else:
+                        text += lockfile.format_hashed_pin(package, version, hashes[(package, version)])
+                diffs.append(_write_requirements(filepath, text, merge_mode))
+
+                diffs = [d for d in diffs if d]
+                message = ("requirements.txt merged at " if diffs else "requirements.txt created at ") + filepath
+                if notes:
+                    message += " (" + "; ".join(notes) + ")"
+                if diffs:
+                    message += "\n" + "\n".join(diffs)
+                return message
             except IOError as e:
                 return "IOError: Failed to write to file: " + str(e)
         except subprocess.SubprocessError as e:
@@ -67,4 +185,5 @@ def python_main(izzyTrigger):
 
 if __name__ == '__main__':
     # This section runs only in an IDE and is ignored by Pythoner
+    python_init(True)
     print(python_main(True))
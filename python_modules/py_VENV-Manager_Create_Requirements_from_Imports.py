@@ -0,0 +1,286 @@
+"""
+Builds a minimal requirements.txt from what the project's python_modules
+actually import, rather than from everything installed in the venv.
+
+Every .py file under <project_path>/python_modules is parsed (in a thread pool)
+and its top-level imports are collected, including string arguments to
+import_injected(), importlib.import_module() and __import__(). Parse results
+are cached in SCAN_CACHE_FILENAME keyed by each file's mtime and size, so only
+edited files are parsed again. Imports are then mapped to installed
+distributions with importlib.metadata.packages_distributions(); standard
+library and project-local modules are dropped, and imports guarded by
+'except ImportError' are reported as optional instead of required.
+
+With write_file off the proposed requirements are only returned as status;
+with it on, requirements.txt is written (the previous one is kept as
+original_requirements.txt, like the Less-OR-Equal rewrite actor does).
+write_file 2 merges into the existing file instead (dx_requirements_merge),
+keeping its comments and layout, and reports what changed.
+"""
+
+import os
+import sys
+import ast
+import json
+import shutil
+import platform
+import importlib
+from datetime import datetime
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor
+
+# iz_input 1 "project_path"
+# iz_input 2 "trigger"
+# iz_input 3 "write_file"   # 0: preview only, 1: write requirements.txt, 2: merge into requirements.txt
+# iz_output 1 "status"
+
+SCAN_CACHE_FILENAME = ".import_scan_cache.json"
+SCAN_WORKERS = 8
+DYNAMIC_IMPORT_CALLS = {"import_injected", "import_module", "__import__"}
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+SKIP_DIRS = {"__pycache__", ".git", "Virtual_Env", "venv", ".venv"}
+
+# ----------------------------
+# Helpers: scanning
+# ----------------------------
+
+def _call_name(func):
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _guards_import_error(handler):
+    """True for 'except:', 'except ImportError' and friends (also in tuples)."""
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(_call_name(t) in IMPORT_ERRORS for t in types)
+
+
+def _imported_names(node):
+    if isinstance(node, ast.Import):
+        return [alias.name.split(".")[0] for alias in node.names]
+    if isinstance(node, ast.ImportFrom):
+        return [node.module.split(".")[0]] if node.level == 0 and node.module else []
+    if isinstance(node, ast.Call) and _call_name(node.func) in DYNAMIC_IMPORT_CALLS:
+        if node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            name = node.args[0].value.split(".")[0]
+            return [name] if name.isidentifier() else []
+    return []
+
+
+def _imports_in_source(source, filename):
+    """
+    (required, optional) sorted top-level module names imported by one file;
+    optional ones only appear inside try blocks that catch ImportError.
+    """
+    tree = ast.parse(source, filename=filename)
+    guarded = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and any(_guards_import_error(h) for h in node.handlers):
+            for stmt in node.body:
+                guarded.update(id(n) for n in ast.walk(stmt))
+    required, optional = set(), set()
+    for node in ast.walk(tree):
+        names = _imported_names(node)
+        (optional if id(node) in guarded else required).update(names)
+    return sorted(required), sorted(optional - required)
+
+
+def _scan_file(path):
+    """((required, optional), error) for one file; parse errors are reported, not raised."""
+    try:
+        with open(path, "rb") as f:
+            source = f.read()
+        return _imports_in_source(source, path), None
+    except (SyntaxError, ValueError) as e:
+        return None, f"⚠️ Could not parse {os.path.basename(path)}: {e}"
+    except OSError as e:
+        return None, f"⚠️ Could not read {os.path.basename(path)}: {e}"
+
+
+def _python_files(modules_path):
+    for root, dirs, files in os.walk(modules_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in files:
+            if name.endswith(".py"):
+                yield os.path.join(root, name)
+
+
+def _local_module_names(modules_path):
+    """Modules importable from python_modules itself: never requirements."""
+    names = set()
+    for entry in os.scandir(modules_path):
+        if entry.is_file() and entry.name.endswith(".py"):
+            names.add(entry.name[:-3])
+        elif entry.is_dir() and os.path.isfile(os.path.join(entry.path, "__init__.py")):
+            names.add(entry.name)
+    return names
+
+
+def _load_scan_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("files", {}) if data.get("version") == 2 else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_scan_cache(cache_path, files):
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "files": files}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def scan_imports(modules_path, cache_path):
+    """
+    ({module: [files importing it]}, {optional module: [files]}, warnings,
+    number of files actually parsed; the rest came from the cache).
+    """
+    cache = _load_scan_cache(cache_path)
+    fresh, stale = {}, []
+    for path in _python_files(modules_path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = cache.get(path)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            fresh[path] = entry
+        else:
+            stale.append((path, st))
+
+    warnings = []
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(stale))) as pool:
+            results = list(pool.map(lambda item: _scan_file(item[0]), stale))
+        for (path, st), (imports, error) in zip(stale, results):
+            if error:
+                warnings.append(error)
+                continue  # retried next run
+            fresh[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                           "imports": imports[0], "optional": imports[1]}
+
+    _save_scan_cache(cache_path, fresh)  # also drops deleted files
+
+    used, optional = {}, {}
+    for path, entry in sorted(fresh.items()):
+        for name in entry["imports"]:
+            used.setdefault(name, []).append(os.path.relpath(path, modules_path))
+        for name in entry["optional"]:
+            optional.setdefault(name, []).append(os.path.relpath(path, modules_path))
+    return used, {k: v for k, v in optional.items() if k not in used}, warnings, len(stale)
+
+# ----------------------------
+# Helpers: mapping to distributions
+# ----------------------------
+
+def _stdlib_names():
+    names = set(getattr(sys, "stdlib_module_names", ())) | set(sys.builtin_module_names)
+    names.add("__future__")
+    return names
+
+
+def _resolve_distributions(module_names, providers):
+    """
+    ({distribution name: version}, {distribution: [modules]}, [unresolved modules]).
+    A module provided by several distributions (namespace packages) maps to all.
+    """
+    dists, provided, unresolved = {}, {}, []
+    for module in sorted(module_names):
+        names = providers.get(module)
+        if not names:
+            unresolved.append(module)
+            continue
+        for dist_name in sorted(set(names)):
+            if dist_name not in dists:
+                try:
+                    dists[dist_name] = metadata.version(dist_name)
+                except metadata.PackageNotFoundError:
+                    continue
+            provided.setdefault(dist_name, []).append(module)
+    return dists, provided, unresolved
+
+# --------------------------------------
+# Pythoner lifecycle wrappers
+# --------------------------------------
+
+def python_init(project_path, trigger, write_file=0):
+    return
+
+
+def python_main(project_path, trigger, write_file=0):
+    if not trigger:
+        return "❌"
+
+    modules_path = os.path.join(project_path, 'python_modules')
+    if not os.path.isdir(modules_path):
+        return f"❌ python_modules not found at: {modules_path}"
+
+    cache_path = os.path.join(project_path, SCAN_CACHE_FILENAME)
+    used, optional, status_messages, parsed = scan_imports(modules_path, cache_path)
+
+    ignore = _stdlib_names() | _local_module_names(modules_path)
+    third_party = {name: files for name, files in used.items() if name not in ignore}
+    providers = metadata.packages_distributions()  # {import name: [distribution names]}
+    dists, provided, unresolved = _resolve_distributions(third_party, providers)
+    optional_dists, _, _ = _resolve_distributions((n for n in optional if n not in ignore), providers)
+    for name in sorted(set(optional_dists) - set(dists), key=str.lower):
+        status_messages.append(f"ℹ️ {name}=={optional_dists[name]} is only imported optionally; not required")
+
+    for module in unresolved:
+        status_messages.append(f"⚠️ import '{module}' ({third_party[module][0]}) is not provided by any installed distribution")
+
+    pins = [f"{name}=={version}" for name, version in sorted(dists.items(), key=lambda kv: kv[0].lower())]
+    for name in sorted(dists, key=str.lower):
+        status_messages.append(f"✅ {name}=={dists[name]} ← {', '.join(provided[name])}")
+    status_messages.append(
+        f"ℹ️ {len(pins)} requirement(s) from {len(third_party)} third-party import(s); "
+        f"{parsed} file(s) parsed, the rest reused from {SCAN_CACHE_FILENAME}")
+
+    if write_file:
+        req_path = os.path.join(project_path, 'requirements.txt')
+        backup_path = os.path.join(project_path, 'original_requirements.txt')
+        text = (f"# Created from python_modules imports with Python {platform.python_version()}\n"
+                f"# Created on platform {platform.system()} {platform.release()}\n"
+                f"# Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                + "".join(pin + "\n" for pin in pins))
+        try:
+            merger = None
+            if write_file == 2:
+                try:
+                    merger = sys.modules.get("dx_requirements_merge") or importlib.import_module("dx_requirements_merge")
+                except ImportError:
+                    status_messages.append("⚠️ dx_requirements_merge not available; overwriting instead of merging")
+            if os.path.isfile(req_path):
+                shutil.copy(req_path, backup_path)
+                status_messages.append(f"✅ Backed up original to: {backup_path}")
+                if merger is not None:
+                    with open(req_path, 'r', newline='') as f:
+                        text, summary = merger.merge_requirements(f.read(), text)
+                    status_messages.append(merger.format_summary(summary))
+            with open(req_path, 'w', newline='' if merger else None) as f:
+                f.write(text)
+            status_messages.append(f"✅ requirements.txt written at: {req_path}")
+        except OSError as e:
+            status_messages.append(f"❌ Failed to write requirements.txt: {e}")
+
+    return "\n".join(status_messages)
+
+
+def python_finalize():
+    pass
+
+
+if __name__ == '__main__':
+    test_path = r"/your/project/path"
+    print(python_main(test_path, True, 0))
+    python_finalize()
@@ -1,12 +1,29 @@
 import subprocess
 import os
 import re
+import sys
+import shutil
 import platform
+import importlib
+import threading
+import time
+import json
+import hashlib
 
 # iz_input 1 "Venv Folder Name"          # optional; defaults to "Virtual_Env" if blank
 # iz_input 2 "Filepath for Venv Creation" # optional; defaults to <project_root> if blank
 # iz_input 3 "Use Requirements"           # 0/1 (False/True)
 # iz_input 4 "Trigger"
+# iz_input 5 "Use Wheelhouse"             # 0/1: prefetch into the shared wheelhouse, install offline from it
+# iz_input 6 "Sync Existing"              # 0: error if venv exists, 1: sync it to requirements.txt, 2: plan only
+# iz_input 7 "Use Template"               # 0/1: clone from / store into the venv template cache
+# iz_input 8 "Background"                 # 0/1: run as a background job; Trigger starts it, later calls report progress
+# iz_input 9 "Cancel"                     # 1 cancels the running background job
+# iz_input 10 "Poll"                      # any change just reports the background job's progress
+# iz_input 11 "Pip Upgrade"               # 0: auto (only when outdated), 1: always, 2: never
+# iz_input 12 "Venv Backend"              # 0: auto (fastest benchmarked), 1: virtualenv, 2: venv + seed wheels, 3: in-process
+# iz_input 13 "Deep Health Check"         # 0/1: also import every installed distribution once the venv is ready
+# iz_input 14 "Precompile"                # 0/1: compile site-packages and python_modules to bytecode at the end
 # iz_output 1 "Status Message"
 
 
@@ -45,6 +62,95 @@ USE CASES
        - *Use Requirements*: 1 (True)
        - *Trigger*: 1 (True)
 
+SHARED WHEELHOUSE
+==================
+With *Use Wheelhouse* on, Stage 3 installs through dx_wheelhouse: packages
+are downloaded (sdists built into wheels) once into a per-user wheelhouse
+(prefetch) and installed with `--no-index --find-links`, so rebuilding a venv
+or creating another project with the same pins needs no downloads. When every
+pin is already present the prefetch is skipped entirely. The wheelhouse is trimmed to its size budget
+(least recently used first) after each install.
+
+INCREMENTAL SYNC
+=================
+With *Sync Existing* set and the venv already present, it is not rebuilt:
+installed distributions are read from its site-packages (dx_inventory) and
+compared with requirements.txt (dx_venv_sync). The plan -- packages to
+install, to upgrade/downgrade, and to remove because nothing requested needs
+them -- is printed first, then applied with one `pip uninstall` and one
+`pip install` call covering only what differs (through the wheelhouse when
+*Use Wheelhouse* is on). *Sync Existing* = 2 prints the plan and stops.
+
+TEMPLATE CACHE
+===============
+With *Use Template* on, every successfully created and health-checked venv
+is also stored in a per-user template cache (dx_venv_template), keyed by the
+interpreter, the creation flags and the requirements. The next venv with the
+same key is cloned from it -- reflinked or hardlinked where the filesystem
+allows, copied in parallel otherwise -- with its paths rewritten, instead of
+running virtualenv and pip again. A clone that fails the health check is
+discarded and the venv is built normally.
+
+BACKGROUND JOB
+===============
+With *Background* on, the Trigger starts the whole build in a worker thread
+(the actual work still runs in subprocesses) and python_main returns at once,
+so Isadora keeps rendering. Every later call -- e.g. a Pulse Generator wired
+to *Poll* -- returns the current stage, a percentage and the last output
+line; once the job ends, the final status is returned until the next
+Trigger. *Cancel* kills the running subprocess; a cancelled build resumes
+on the next Trigger (see below), a cancelled sync leaves the venv as far as
+pip got.
+
+PIP SELF-UPGRADE
+=================
+Stage 2 no longer always asks the index for a new pip. With *Pip Upgrade* on
+auto (0), dx_pip_bootstrap reads the venv's pip version from its metadata and
+upgrades only when it is older than the newest pip in the wheelhouse (then
+offline, from the wheelhouse) or than the newest release supporting the venv's
+Python, which is looked up at most once a week and cached per user. Offline, the bundled pip is kept.
+1 restores the unconditional upgrade, 2 never upgrades.
+
+CREATION BACKEND
+=================
+Stage 1 can use virtualenv (the original path), stdlib `venv --without-pip`
+with pip seeded offline from local wheels, or venv.EnvBuilder in-process
+(only possible when the running interpreter is Pythoner's, i.e. never inside
+Isadora). On auto, dx_venv_backends benchmarks the available backends once
+per Pythoner install -- creation time, disk footprint, health check -- caches
+the result per user and uses the fastest working one. Without the helper,
+virtualenv is used as before.
+
+HEALTH CHECKS
+==============
+Health check results are cached inside the venv (dx_venv_health), keyed by
+the venv interpreter's path, size and mtime and the pyvenv.cfg contents, so
+an unchanged venv is not started again just to import `encodings`. With
+*Deep Health Check* on, the finished (or synced, or cloned) venv also
+imports the top-level modules of every installed distribution, in parallel
+in one child process; that runs again only when the interpreter setup or
+site-packages changed. Failing imports are listed in the status.
+
+PRECOMPILATION
+===============
+With *Precompile* on, a final stage compiles the venv's site-packages and the
+project's python_modules folder to bytecode with the venv's python
+(dx_precompile): compileall in a process pool, `checked-hash` .pyc files that
+stay valid when the venv is cloned or copied, and only files without a
+current .pyc, so re-running after a sync is cheap. The first import during a
+show then never pays the compile cost. Files compiled and the time taken are
+reported.
+
+RESUMABLE BUILDS
+=================
+A new venv is built in <venv>.partial (when dx_venv_template is available
+to rewrite its paths; in place otherwise) with a journal of completed stages:
+created, stdlib patched, health-checked, pip upgraded, requirements
+installed. If a stage fails, the next Trigger resumes after the last
+completed one; the requirements stage only counts as done for the same
+requirements.txt contents. The finished venv is renamed into place in one
+step, so a half-built directory is never mistaken for a working venv.
+
 PLATFORM NOTES
 ===============
 - **Windows**:
@@ -65,6 +171,58 @@ reliability on both platforms.
 """
 
 
+wheelhouse = None  # dx_wheelhouse, only needed for Use Wheelhouse
+inventory = None   # dx_inventory, only needed for Sync Existing
+venv_sync = None   # dx_venv_sync, only needed for Sync Existing
+venv_template = None  # dx_venv_template, only needed for Use Template
+runner = None         # dx_runner; without it commands run through the plain Popen loop
+pip_bootstrap = None  # dx_pip_bootstrap; without it Stage 2 always upgrades pip
+venv_backends = None  # dx_venv_backends; without it Stage 1 always uses virtualenv
+venv_health = None    # dx_venv_health; without it every health check starts the venv's python
+precompiler = None    # dx_precompile, only needed for Precompile
+PIP_POLICIES = {0: "auto", 1: "always", 2: "never"}
+VENV_BACKENDS = {1: "virtualenv", 2: "venv", 3: "inprocess"}  # 0: auto
+LOG_FILENAME = "venv_creation.log"
+JOURNAL_FILENAME = ".dx_build_journal.json"
+STAGING_SUFFIX = ".partial"
+_job = None           # _CreationJob of the current/last background run
+_last_trigger = False
+_current = threading.local()  # .job inside the worker thread, .runner during a build
+
+
+def import_injected(module_name: str, *, reload: bool = False, strict: bool = False):
+    try:
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            mod = importlib.import_module(module_name)
+        elif reload:
+            mod = importlib.reload(mod)
+        return mod
+    except Exception as e:
+        print(f"Import failed for '{module_name}': {type(e).__name__}: {e}")
+        print("Hint: ensure your injector actor ran and remains active, or the module is on sys.path.")
+        if strict:
+            raise RuntimeError(f"Required module not available: {module_name}") from e
+        return None
+
+
+def python_init(venv_folder_name, venv_creation_path, use_requirements, izzyTrigger, use_wheelhouse=0,
+                sync_existing=0, use_template=0, background=0, cancel=0, poll=0, pip_upgrade=0,
+                venv_backend=0, deep_health_check=0, precompile=0):
+    global wheelhouse, inventory, venv_sync, venv_template, runner, pip_bootstrap, venv_backends, venv_health
+    global precompiler
+    wheelhouse = import_injected("dx_wheelhouse")
+    inventory = import_injected("dx_inventory")
+    venv_sync = import_injected("dx_venv_sync")
+    venv_template = import_injected("dx_venv_template")
+    runner = import_injected("dx_runner")
+    pip_bootstrap = import_injected("dx_pip_bootstrap")
+    venv_backends = import_injected("dx_venv_backends")
+    venv_health = import_injected("dx_venv_health")
+    precompiler = import_injected("dx_precompile")
+    return "init"
+
+
 def get_default_pythoner_path():
     if platform.system() == "Windows":
         return r"C:\Program Files\Common Files\TroikaTronix\Isadora Plugins\Pythoner.izzyplug\python.exe"
@@ -92,6 +250,17 @@ def get_default_pythoner_path():
 # ---------- utilities ----------
 
 def run_command_with_progress(cmd_list, working_dir=None, env=None):
+    """
+    Run one build command; returns its output (with dx_runner only the last
+    lines -- the full output goes to LOG_FILENAME beside the venv).
+    """
+    active = getattr(_current, "runner", None)
+    if active is not None:
+        try:
+            return active.run(cmd_list, cwd=working_dir, env=env).output
+        except runner.RunCancelled as e:
+            raise JobCancelled(cmd_list[0]) from e
+
     creationflags = 0
     if platform.system() == "Windows":
         creationflags = subprocess.CREATE_NO_WINDOW
@@ -105,16 +274,172 @@ def run_command_with_progress(cmd_list, working_dir=None, env=None):
         bufsize=1,
         creationflags=creationflags
     )
-    output = ""
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job.process = process
+        if job.cancelled.is_set():
+            process.kill()
+    output = []
     for line in process.stdout:
         print(line.rstrip())
-        output += line
+        output.append(line)
+        if job is not None:
+            job.on_line(line)
+    output = "".join(output)
     process.wait()
+    if job is not None:
+        job.process = None
+        if job.cancelled.is_set():
+            raise JobCancelled(cmd_list[0])
     if process.returncode != 0:
         raise subprocess.CalledProcessError(process.returncode, cmd_list, output)
     return output
 
 
+# ---------- background job ----------
+
+class JobCancelled(Exception):
+    pass
+
+
+class _CreationJob:
+    """State shared between the worker thread and python_main polls."""
+
+    ITEM_PREFIXES = ("Collecting ", "Processing ", "Obtaining ")
+
+    def __init__(self):
+        self.stage = "Starting…"
+        self.percent = 0
+        self.floor = 0        # the current stage's percentage range
+        self.until = 0
+        self.expected = 0     # requirement lines the current stage works through
+        self.seen = 0
+        self.last_line = ""
+        self.result = None
+        self.process = None   # plain Popen fallback
+        self.runner = None    # dx_runner.Runner of this build
+        self.cancelled = threading.Event()
+        self.started = time.time()
+        self.thread = None
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def enter_stage(self, message, percent, until=None, expected=0):
+        if self.cancelled.is_set():
+            raise JobCancelled(message)
+        self.stage, self.percent, self.floor = message, percent, percent
+        self.until, self.expected, self.seen = (until or percent), expected, 0
+
+    def on_line(self, line):
+        line = line.strip()
+        if line:
+            self.last_line = line
+        if self.expected and line.startswith(self.ITEM_PREFIXES):
+            self.seen += 1
+            done = min(1.0, self.seen / self.expected)
+            self.percent = min(self.until - 1, self.floor + int((self.until - self.floor) * done))
+
+    def on_event(self, event):
+        if event["event"] == "line":
+            self.on_line(event["line"])
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.runner is not None:
+            self.runner.cancel()
+        process = self.process
+        if process is not None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def status_line(self):
+        if self.result is not None:
+            return self.result
+        elapsed = time.time() - self.started
+        state = "Cancelling" if self.cancelled.is_set() else "Running"
+        line = f"⏳ {state} ({elapsed:.0f}s) {self.percent}% {self.stage}"
+        return f"{line}\n{self.last_line}" if self.last_line else line
+
+
+def _stage(message, percent, until=None, expected=0, timing=None):
+    """
+    Print a stage banner and, inside a background job, advance its progress.
+    timing names the stage in the [Timing] summary; None keeps the current one.
+    """
+    print(message)
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job.enter_stage(message, percent, until, expected)
+    active = getattr(_current, "runner", None)
+    if active is not None and timing:
+        active.enter_stage(timing)
+
+
+def _begin_build(venv_creation_path):
+    """Runner for this build's commands (None without dx_runner)."""
+    if runner is None:
+        return None
+    job = getattr(_current, "job", None)
+    active = runner.Runner(log_path=os.path.join(venv_creation_path, LOG_FILENAME),
+                           on_event=job.on_event if job is not None else None)
+    if job is not None:
+        job.runner = active
+        if job.cancelled.is_set():
+            active.cancel()
+    _current.runner = active
+    return active
+
+
+def _end_build():
+    """Close the last stage; returns the [Timing] line ('' without dx_runner)."""
+    active = getattr(_current, "runner", None)
+    _current.runner = None
+    if active is None:
+        return ""
+    active.finish_stage()
+    summary = active.timing_summary()
+    if summary:
+        print(summary)
+    return summary
+
+
+def _failure_details(e):
+    """Last lines of a failed command's output and where the full log is."""
+    lines = (e.output or "").strip().splitlines()[-15:] if isinstance(e.output, str) else []
+    active = getattr(_current, "runner", None)
+    if active is not None and active.log_path:
+        lines.append(f"(full output: {active.log_path})")
+    return "\n".join(lines)
+
+
+def _count_requirements(requirements_path):
+    try:
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip() and not line.lstrip().startswith(("#", "-", "--hash")))
+    except OSError:
+        return 0
+
+
+def _run_job(job, args):
+    _current.job = job
+    try:
+        job.result = _create_venv(*args)
+        summary = _end_build()
+        if summary and job.result:
+            job.result += "\n" + summary
+    except JobCancelled:
+        job.result = "Cancelled."
+    except Exception as e:
+        job.result = f"Error during setup: {type(e).__name__}: {e}"
+    finally:
+        job.percent = 100
+        _current.job = None
+        _current.runner = None
+
+
 def ensure_windows_dlls_folder(pythoner_path):
     if platform.system() == "Windows":
         base_dir = os.path.dirname(pythoner_path)
@@ -159,7 +484,12 @@ def _ensure_stdlib_for_embedded_windows(pythoner_path, venv_path):
         return f"Warning: Could not write {os.path.basename(pth_path)}: {e}"
 
 
-def _health_check_python(py_exe, env=None):
+def _health_check_python(py_exe, env=None, venv_path=None, deep=False):
+    """(ok, message); cached in venv_path by dx_venv_health when it is available."""
+    if venv_health is not None and venv_path:
+        ok, msg, _ = venv_health.check(venv_path, lambda cmd: run_command_with_progress(cmd, env=env),
+                                       deep, py_exe)
+        return ok, msg
     try:
         out = run_command_with_progress([py_exe, "-c", "import encodings, sys; print('OK', sys.version)"],
                                         env=env)
@@ -202,12 +532,245 @@ def _darwin_framework_root(pythoner_path):
     return None
 
 
-# ---------- main ----------
+def _upgrade_pip(python_path, build_path, working_dir, env, policy, use_wheelhouse):
+    """Stage 2 according to the pip upgrade policy."""
+    if pip_bootstrap is None:
+        if policy == "never":
+            print("[Stage 2] Skipping pip upgrade as requested.")
+            return
+        _stage("[Stage 2] Upgrading pip…", 30, 40, timing="pip upgrade")
+        run_command_with_progress([python_path, "-m", "pip", "install", "--upgrade", "pip"],
+                                  working_dir=working_dir, env=env)
+        return
 
-def python_main(venv_folder_name, venv_creation_path, use_requirements, izzyTrigger):
-    if not izzyTrigger:
+    wh = wheelhouse.ensure_wheelhouse() if use_wheelhouse and wheelhouse is not None else None
+    action, target, reason = pip_bootstrap.plan_upgrade(build_path, policy, wh)
+    if action == "skip":
+        print(f"[Stage 2] Skipping pip upgrade: {reason}")
         return
+    source = "wheelhouse" if action == "wheelhouse" else "index"
+    _stage(f"[Stage 2] Upgrading pip from the {source}: {reason}…", 30, 40, timing="pip upgrade")
+    run_command_with_progress(pip_bootstrap.upgrade_command(python_path, action, target, wh),
+                              working_dir=working_dir, env=env)
+    if action == "index":
+        # the index just served the newest pip this interpreter supports (which
+        # may be older than its latest release): remember it for the next builds
+        upgraded = pip_bootstrap.installed_pip_version(build_path)
+        if upgraded:
+            pip_bootstrap.remember_known_good(upgraded, pip_bootstrap.venv_python_version(build_path))
+
+
+def _install_from_wheelhouse(python_path, requirements_path, working_dir, env):
+    """Stage 3 via the shared wheelhouse; returns a one-line wheelhouse summary."""
+    wh = wheelhouse.ensure_wheelhouse()
+    report_path = os.path.join(working_dir, ".pip-install-report.json")
+    install_cmd = wheelhouse.install_command(python_path, requirements_path, wh, report_path)
+    expected = _count_requirements(requirements_path)
+
+    installed = False
+    if wheelhouse.covers_pins(wh, requirements_path):
+        _stage(f"[Stage 3] All pins already in wheelhouse {wh}; installing offline…", 40, 95, expected, "install")
+        try:
+            run_command_with_progress(install_cmd, working_dir=working_dir, env=env)
+            installed = True
+        except subprocess.CalledProcessError:
+            print("[Stage 3] Offline install incomplete; prefetching missing files…")
+    if not installed:
+        _stage(f"[Stage 3a] Prefetching into wheelhouse {wh}…", 40, 75, expected, "prefetch")
+        run_command_with_progress(wheelhouse.prefetch_command(python_path, requirements_path, wh),
+                                  working_dir=working_dir, env=env)
+        _stage("[Stage 3b] Installing offline from wheelhouse…", 75, 95, expected, "install")
+        run_command_with_progress(install_cmd, working_dir=working_dir, env=env)
+
+    used = wheelhouse.files_from_report(report_path)
+    try:
+        os.remove(report_path)
+    except OSError:
+        pass
+    wheelhouse.mark_used(wh, used)
+    removed, freed, remaining = wheelhouse.evict(wh, keep=used)
+    summary = f"[Wheelhouse] {len(used)} file(s) used, {remaining / 1048576:.0f} MB cached"
+    if removed:
+        summary += f", {removed} least recently used file(s) evicted ({freed / 1048576:.0f} MB)"
+    return summary
+
+
+def _sync_existing_venv(full_venv_path, requirements_path, working_dir, env, use_wheelhouse, plan_only):
+    """Bring an existing venv in line with requirements.txt; returns the status message."""
+    python_path = _venv_python_path(full_venv_path)
+    if not os.path.exists(python_path):
+        return f"Error: Could not find Python in virtual environment at: {python_path}"
+
+    requirements, options = venv_sync.read_requirements(requirements_path)
+    inventory.clear_cache()
+    dists = inventory.installed_distributions(inventory.site_packages(full_venv_path))
+    plan = venv_sync.plan_sync(requirements, dists, inventory.dependency_graph(dists))
+    print(venv_sync.format_plan(plan))
+    if plan_only:
+        return f"Sync plan for {full_venv_path} (not applied):\n{venv_sync.format_plan(plan)}"
+    if not (plan["install"] or plan["upgrade"] or plan["remove"]):
+        return f"Virtual environment at {full_venv_path} already matches requirements.txt"
+
+    if plan["remove"]:
+        _stage(f"[Sync] Removing {len(plan['remove'])} package(s)…", 20, 40, timing="uninstall")
+        run_command_with_progress(venv_sync.uninstall_command(python_path, plan),
+                                  working_dir=working_dir, env=env)
+
+    if plan["install"] or plan["upgrade"]:
+        sync_req_path = venv_sync.write_sync_requirements(
+            os.path.join(full_venv_path, venv_sync.SYNC_REQUIREMENTS_FILENAME), plan, options)
+        try:
+            _stage(f"[Sync] Installing {len(plan['install']) + len(plan['upgrade'])} package(s)…", 40, 95,
+                   len(plan["install"]) + len(plan["upgrade"]), "install")
+            if use_wheelhouse and wheelhouse is not None:
+                print(_install_from_wheelhouse(python_path, sync_req_path, working_dir, env))
+            else:
+                run_command_with_progress(venv_sync.install_command(python_path, sync_req_path),
+                                          working_dir=working_dir, env=env)
+        finally:
+            try:
+                os.remove(sync_req_path)
+            except OSError:
+                pass
+
+    return (f"Virtual environment synced at {full_venv_path}: {len(plan['install'])} installed, "
+            f"{len(plan['upgrade'])} upgraded, {len(plan['remove'])} removed")
+
+
+def _clone_from_template(template_path, full_venv_path, env):
+    """Stage 1 from the template cache; returns True if the clone is usable."""
+    _stage(f"[Stage 1] Cloning virtual environment from template {template_path}…", 5, 90, timing="clone")
+    try:
+        seconds, counts = venv_template.clone_template(template_path, full_venv_path)
+    except OSError as e:
+        print(f"[Template] Clone failed ({e}); creating normally.")
+        return False
+    ok, health_msg = _health_check_python(_venv_python_path(full_venv_path), env=env, venv_path=full_venv_path)
+    if not ok:
+        print(f"[Template] Clone failed the health check; creating normally.\n{health_msg}")
+        shutil.rmtree(full_venv_path, ignore_errors=True)
+        return False
+    print(f"[Template] Cloned in {seconds:.1f}s ({venv_template.format_counts(counts)})")
+    print(f"[Health] {health_msg}")
+    return True
+
+
+def _store_as_template(full_venv_path, key):
+    try:
+        stored = venv_template.store_template(full_venv_path, key)
+        print(f"[Template] Stored for reuse at {stored}")
+    except OSError as e:
+        print(f"[Template] Could not store template: {e}")
+
+
+# ---------- build journal ----------
+
+def _build_key(pythoner_path, create_args):
+    """Identifies what a partial build was started with; a different key starts over."""
+    try:
+        st = os.stat(pythoner_path)
+        stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        stamp = ""
+    return hashlib.sha256("\0".join([pythoner_path, stamp, *create_args]).encode("utf-8")).hexdigest()[:16]
+
 
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _load_journal(build_path, key):
+    """{stage: info} completed by an earlier attempt on build_path, or {}."""
+    try:
+        with open(os.path.join(build_path, JOURNAL_FILENAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == 1 and data.get("key") == key:
+            return data.get("stages", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _journal_stage(build_path, key, journal, stage, **info):
+    journal[stage] = dict(info, finished=time.time())
+    path = os.path.join(build_path, JOURNAL_FILENAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "key": key, "stages": journal}, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[Warning] Could not update build journal: {e}")
+
+
+def _finish_build(build_path, full_venv_path):
+    """Drop the journal and, for a staged build, rewrite its paths and rename it into place."""
+    if build_path != full_venv_path:
+        count = venv_template.relocate(build_path, build_path, full_venv_path)
+        print(f"[Stage 4] Rewrote {count} path reference(s); moving into place…")
+        if os.path.isdir(full_venv_path) and not os.listdir(full_venv_path):
+            os.rmdir(full_venv_path)  # e.g. pre-created by the create-virtual_env-folder actor
+        os.replace(build_path, full_venv_path)
+    try:
+        os.remove(os.path.join(full_venv_path, JOURNAL_FILENAME))
+    except OSError:
+        pass
+
+
+def _choose_backend(venv_backend, pythoner_path, symlinks, working_dir, env, seed_dirs):
+    """Backend name for Stage 1: the requested one, or the fastest benchmarked on auto."""
+    if venv_backends is None:
+        if venv_backend:
+            print("[Backend] dx_venv_backends not available; using virtualenv.")
+        return "virtualenv"
+    requested = VENV_BACKENDS.get(int(venv_backend or 0))
+    if requested:
+        return requested
+    run = lambda cmd: run_command_with_progress(cmd, working_dir=working_dir, env=env)
+    before_seed = lambda path: _ensure_stdlib_for_embedded_windows(pythoner_path, path)
+    _stage("[Backend] Choosing the venv creation backend…", 2, 5, timing="benchmark")
+    backend, results, fresh = venv_backends.choose(pythoner_path, symlinks, run, seed_dirs, before_seed)
+    print(f"[Backend] {'Benchmarked' if fresh else 'Cached benchmark'}:\n{venv_backends.format_results(results)}")
+    print(f"[Backend] Using {backend}")
+    return backend
+
+
+def _deep_health_check(full_venv_path, env):
+    """Import check of every installed distribution; a note for the status message, or ''."""
+    if venv_health is None:
+        return "\n[Health] Deep Health Check needs the dx_venv_health module."
+    _stage("[Health] Importing every installed distribution…", 97, timing="health check")
+    ok, health_msg = _health_check_python(_venv_python_path(full_venv_path), env=env,
+                                          venv_path=full_venv_path, deep=True)
+    print(f"[Health] {health_msg}")
+    return "" if ok else f"\nWarning: deep health check failed:\n{health_msg}"
+
+
+def _precompile(full_venv_path, working_dir, env):
+    """Bytecode for site-packages and python_modules; a note for the status message."""
+    if precompiler is None:
+        return "\n[Precompile] Precompile needs the dx_precompile module."
+    _stage("[Precompile] Compiling site-packages and python_modules to bytecode…", 96, timing="precompile")
+    python_modules = os.path.dirname(os.path.abspath(__file__))
+    try:
+        out = run_command_with_progress(
+            precompiler.precompile_command(_venv_python_path(full_venv_path), [python_modules]),
+            working_dir=working_dir, env=env)
+    except subprocess.CalledProcessError as e:
+        return f"\nWarning: precompilation failed (modules compile on first import instead):\n{_failure_details(e)}"
+    report = precompiler.parse_report(out)
+    note = precompiler.format_report(report) if report else "finished without a report"
+    print(f"[Precompile] {note}")
+    return f"\n[Precompile] {note}"
+
+
+# ---------- main ----------
+
+def _create_venv(venv_folder_name, venv_creation_path, use_requirements, use_wheelhouse=0,
+                 sync_existing=0, use_template=0, pip_upgrade=0, venv_backend=0, deep_health_check=0,
+                 precompile=0):
+    """The whole build; returns the final status message."""
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     venv_folder_name = (venv_folder_name or "").strip() or "Virtual_Env"
     venv_creation_path = (venv_creation_path or "").strip() or project_root
@@ -226,9 +789,12 @@ def python_main(venv_folder_name, venv_creation_path, use_requirements, izzyTrig
         print(msg); return msg
 
     full_venv_path = os.path.join(venv_creation_path, venv_folder_name)
+    _begin_build(venv_creation_path)
 
     venv_indicators = ['Lib', 'Scripts', 'bin', 'pyvenv.cfg']
-    if any(os.path.exists(os.path.join(full_venv_path, it)) for it in venv_indicators):
+    venv_exists = (any(os.path.exists(os.path.join(full_venv_path, it)) for it in venv_indicators)
+                   and not os.path.isfile(os.path.join(full_venv_path, JOURNAL_FILENAME)))  # unfinished: resume
+    if venv_exists and not sync_existing:
         msg = f"Error: The directory '{full_venv_path}' already contains a virtual environment."
         print(msg); return msg
 
@@ -256,68 +822,201 @@ def python_main(venv_folder_name, venv_creation_path, use_requirements, izzyTrig
 
     ensure_windows_dlls_folder(pythoner_path)
 
-    try:
-        print("[Stage 1] Creating virtual environment…")
-        create_args = ["--no-download", "--python", pythoner_path]
-        if platform.system() == "Darwin":
-            create_args.insert(0, "--symlinks")
+    if venv_exists:
+        requirements_path = os.path.join(venv_creation_path, "requirements.txt")
+        if not bool(use_requirements):
+            msg = "Error: Sync Existing syncs to requirements.txt; turn on Use Requirements to sync."
+        elif inventory is None or venv_sync is None:
+            msg = "Error: Sync Existing needs the dx_inventory and dx_venv_sync modules."
+        elif not os.path.exists(requirements_path):
+            msg = "Error: requirements.txt not found in the provided path."
         else:
-            create_args.insert(0, "--copies")
-
-        run_command_with_progress(
-            [pythoner_path, "-m", "virtualenv", *create_args, full_venv_path],
-            working_dir=venv_creation_path,
-            env=clean_env
-        )
-
-        python_path = _venv_python_path(full_venv_path)
-        print(f"[Debug] Using Python at: {python_path}")
-        if not os.path.exists(python_path):
-            msg = f"Error: Could not find Python in virtual environment at: {python_path}"
-            print(msg); return msg
+            env_for_venv = mac_env if platform.system() == "Darwin" else clean_env
+            try:
+                msg = _sync_existing_venv(full_venv_path, requirements_path, venv_creation_path,
+                                          env_for_venv, use_wheelhouse, sync_existing == 2)
+                if precompile and sync_existing != 2:
+                    msg += _precompile(full_venv_path, venv_creation_path, env_for_venv)
+                if deep_health_check and sync_existing != 2:
+                    msg += _deep_health_check(full_venv_path, env_for_venv)
+            except subprocess.CalledProcessError as e:
+                msg = f"Error during sync: {e}\n{_failure_details(e)}".rstrip()
+            except JobCancelled:
+                msg = f"Sync cancelled; {full_venv_path} may be partially updated."
+        print(msg); return msg
 
-        warn = _ensure_stdlib_for_embedded_windows(pythoner_path, full_venv_path)
-        if warn:
-            print(warn)
+    symlinks = platform.system() == "Darwin"
+    env_for_venv = mac_env if platform.system() == "Darwin" else clean_env
+    seed_dirs = [wheelhouse.ensure_wheelhouse()] if use_wheelhouse and wheelhouse is not None else []
+    backend = _choose_backend(venv_backend, pythoner_path, symlinks, venv_creation_path, env_for_venv, seed_dirs)
+    if venv_backends is not None:
+        create_args = venv_backends.create_args(backend, pythoner_path, symlinks)
+    else:
+        create_args = ["--symlinks" if symlinks else "--copies", "--no-download", "--python", pythoner_path]
 
-        print("[Health] Checking stdlib import (encodings)…")
-        env_for_venv = mac_env if platform.system() == "Darwin" else clean_env
-        ok, health_msg = _health_check_python(python_path, env=env_for_venv)
-        if not ok:
-            msg = f"Venv created but failed stdlib health check:\n{health_msg}"
+    template_key = None
+    if use_template and venv_template is None:
+        print("[Template] dx_venv_template not available; creating normally.")
+    elif use_template:
+        requirements_path = os.path.join(venv_creation_path, "requirements.txt")
+        use_file = bool(use_requirements) and os.path.exists(requirements_path)
+        template_key = venv_template.template_key(pythoner_path, requirements_path if use_file else None,
+                                                  create_args + ["requirements" if use_file else "bare"])
+        template_path = venv_template.find_template(template_key)
+        if template_path and _clone_from_template(template_path, full_venv_path, env_for_venv):
+            msg = f"Virtual environment created from template at {full_venv_path}"
+            if precompile:
+                msg += _precompile(full_venv_path, venv_creation_path, env_for_venv)
+            if deep_health_check:
+                msg += _deep_health_check(full_venv_path, env_for_venv)
             print(msg); return msg
-        else:
+
+    requirements_path = os.path.join(venv_creation_path, "requirements.txt")
+    if use_requirements and not os.path.exists(requirements_path):
+        msg = "Error: requirements.txt not found in the provided path."
+        print(msg); return msg
+
+    # Build beside the target and rename at the end when paths can be rewritten
+    # (dx_venv_template); otherwise build in place. Either way the journal lets
+    # a failed or cancelled build resume where it stopped.
+    build_path = full_venv_path + STAGING_SUFFIX if venv_template is not None else full_venv_path
+    build_key = _build_key(pythoner_path, create_args)
+    journal = _load_journal(build_path, build_key)
+    if journal:
+        print(f"[Resume] Completed earlier: {', '.join(journal)}")
+    elif os.path.exists(build_path) and build_path != full_venv_path:
+        print(f"[Resume] Discarding an incompatible partial build at {build_path}")
+        shutil.rmtree(build_path, ignore_errors=True)
+    python_path = _venv_python_path(build_path)
+
+    try:
+        if "created" not in journal:
+            _stage(f"[Stage 1] Creating virtual environment ({backend})…", 5, 25, timing="create")
+            if backend == "virtualenv":
+                run_command_with_progress(
+                    [pythoner_path, "-m", "virtualenv", *create_args, "--prompt", venv_folder_name, build_path],
+                    working_dir=venv_creation_path,
+                    env=clean_env
+                )
+            else:
+                try:
+                    venv_backends.create(
+                        backend, pythoner_path, build_path, symlinks,
+                        lambda cmd: run_command_with_progress(cmd, working_dir=venv_creation_path, env=env_for_venv),
+                        seed_dirs, lambda path: _ensure_stdlib_for_embedded_windows(pythoner_path, path),
+                        prompt=venv_folder_name)  # not the staging folder's name
+                except (RuntimeError, OSError) as e:
+                    msg = f"Error: {backend} backend could not create the venv: {e}"
+                    print(msg); return msg
+            python_path = _venv_python_path(build_path)
+            print(f"[Debug] Using Python at: {python_path}")
+            if not os.path.exists(python_path):
+                msg = f"Error: Could not find Python in virtual environment at: {python_path}"
+                print(msg); return msg
+            _journal_stage(build_path, build_key, journal, "created")
+
+        if "stdlib patched" not in journal:
+            warn = _ensure_stdlib_for_embedded_windows(pythoner_path, build_path)
+            if warn:
+                print(warn)
+            _journal_stage(build_path, build_key, journal, "stdlib patched")
+
+        if "health-checked" not in journal:
+            _stage("[Health] Checking stdlib import (encodings)…", 25, timing="health check")
+            ok, health_msg = _health_check_python(python_path, env=env_for_venv, venv_path=build_path)
+            if not ok:
+                msg = (f"Venv created but failed stdlib health check:\n{health_msg}\n"
+                       f"Delete {build_path} to start over.")
+                print(msg); return msg
             print(f"[Health] {health_msg}")
+            _journal_stage(build_path, build_key, journal, "health-checked")
 
         if not bool(use_requirements):
-            msg = f"Virtual environment created successfully at {full_venv_path}"
             print("[Stage 2] Skipping pip/requirements as requested.")
-            print(msg); return msg
-
-        print("[Stage 2] Upgrading pip…")
-        run_command_with_progress(
-            [python_path, "-m", "pip", "install", "--upgrade", "pip"],
-            working_dir=venv_creation_path,
-            env=env_for_venv
-        )
+        else:
+            if "pip upgraded" not in journal:
+                _upgrade_pip(python_path, build_path, venv_creation_path, env_for_venv,
+                             PIP_POLICIES.get(int(pip_upgrade or 0), "auto"), use_wheelhouse)
+                _journal_stage(build_path, build_key, journal, "pip upgraded")
+
+            req_hash = _file_hash(requirements_path)
+            if journal.get("requirements installed", {}).get("sha256") != req_hash:
+                if use_wheelhouse and wheelhouse is not None:
+                    print(_install_from_wheelhouse(python_path, requirements_path, venv_creation_path, env_for_venv))
+                else:
+                    if use_wheelhouse:
+                        print("[Stage 3] dx_wheelhouse not available; installing from the index instead.")
+                    _stage("[Stage 3] Installing packages from requirements.txt…", 40, 95,
+                           _count_requirements(requirements_path), "install")
+                    run_command_with_progress(
+                        [python_path, "-m", "pip", "install", "-r", requirements_path],
+                        working_dir=venv_creation_path,
+                        env=env_for_venv
+                    )
+                _journal_stage(build_path, build_key, journal, "requirements installed", sha256=req_hash)
 
-        requirements_path = os.path.join(venv_creation_path, "requirements.txt")
-        if not os.path.exists(requirements_path):
-            msg = "Error: requirements.txt not found in the provided path."
+        try:
+            _finish_build(build_path, full_venv_path)
+        except OSError as e:
+            msg = (f"Error: Could not move the finished build into place:\n{full_venv_path}\n{e}\n"
+                   f"Empty or remove that folder and trigger again; {build_path} is kept.")
             print(msg); return msg
-
-        print("[Stage 3] Installing packages from requirements.txt…")
-        run_command_with_progress(
-            [python_path, "-m", "pip", "install", "-r", requirements_path],
-            working_dir=venv_creation_path,
-            env=env_for_venv
-        )
-
-        print("[Stage 4] Done.")
         msg = f"Virtual environment created successfully at {full_venv_path}"
+        if precompile:
+            # Before storing: checked-hash .pyc files stay valid in every clone
+            msg += _precompile(full_venv_path, venv_creation_path, env_for_venv)
+        if template_key:
+            _store_as_template(full_venv_path, template_key)
+        if deep_health_check:
+            msg += _deep_health_check(full_venv_path, env_for_venv)
+        _stage("[Stage 4] Done.", 100)
         print(msg); return msg
 
     except subprocess.CalledProcessError as e:
-        msg = f"Error during setup: {e}"
+        msg = (f"Error during setup: {e}\n{_failure_details(e)}\n"
+               f"Trigger again to resume from the failed stage.").rstrip()
         print(msg)
         return msg
+    except JobCancelled:
+        msg = f"Cancelled; the partial build at {build_path} resumes on the next Trigger."
+        print(msg)
+        return msg
+
+
+def python_main(venv_folder_name, venv_creation_path, use_requirements, izzyTrigger, use_wheelhouse=0,
+                sync_existing=0, use_template=0, background=0, cancel=0, poll=0, pip_upgrade=0,
+                venv_backend=0, deep_health_check=0, precompile=0):
+    global _job, _last_trigger
+    rising = bool(izzyTrigger) and not _last_trigger
+    _last_trigger = bool(izzyTrigger)
+    args = (venv_folder_name, venv_creation_path, use_requirements, use_wheelhouse, sync_existing, use_template,
+            pip_upgrade, venv_backend, deep_health_check, precompile)
+
+    if _job is not None and _job.running():
+        if cancel:
+            _job.cancel()
+        return _job.status_line()
+    if background:
+        if rising:
+            _job = _CreationJob()
+            _job.thread = threading.Thread(target=_run_job, args=(_job, args),
+                                           name="venv-creation", daemon=True)
+            _job.thread.start()
+            return _job.status_line()
+        return _job.status_line() if _job is not None else None
+
+    if not izzyTrigger:
+        return
+    try:
+        msg = _create_venv(*args)
+        summary = _end_build()
+        return f"{msg}\n{summary}" if summary and msg else msg
+    finally:
+        _current.runner = None
+
+
+def python_finalize():
+    # Never leave pip running behind a deactivated actor
+    if _job is not None and _job.running():
+        _job.cancel()
+        _job.thread.join(timeout=5)
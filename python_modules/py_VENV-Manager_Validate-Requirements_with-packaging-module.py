@@ -14,15 +14,26 @@ import urllib.request
 import urllib.error
 import ssl
 import sys, importlib
+import time
+import hashlib
+import platform
+from concurrent.futures import ThreadPoolExecutor
 # from packaging import tags  # we use module injection to allow us to use this without installing this module
 
 # iz_input 1 "project_path"
 # iz_input 2 "trigger"
+# iz_input 3 "check_dependencies"   # 0/1: also walk requires_dist of every pin
+# iz_input 4 "json_report"          # 0/1: return a JSON report instead of status lines
 # iz_output 1 "status"
 
 
 packaging = None
 tags = None
+requirements = None
+pkg_version = None
+utils = None
+specifiers = None
+PYTHON_VERSION = None
 PLATFORM_TAGS = []
 
 
@@ -62,20 +73,25 @@ def import_many(names, strict=True):
         return None
 
 
-def python_init(project_path, trigger):
-    global packaging, tags, PLATFORM_TAGS
+def python_init(project_path, trigger, check_dependencies=0, json_report=0):
+    global packaging, tags, requirements, pkg_version, utils, specifiers, PYTHON_VERSION, PLATFORM_TAGS
     mName = "packaging"
     try:
         packaging = import_injected(mName, strict=True)
         # import importlib
         # from packaging import tags
         tags = importlib.import_module("packaging.tags")
+        requirements = importlib.import_module("packaging.requirements")
+        pkg_version = importlib.import_module("packaging.version")
+        utils = importlib.import_module("packaging.utils")
+        specifiers = importlib.import_module("packaging.specifiers")
+        PYTHON_VERSION = pkg_version.Version(platform.python_version())
         PLATFORM_TAGS = [str(t) for t in tags.sys_tags()]
         return "init"
     except RuntimeError:
         print("Unable to load injected module: " + mName)
         # or: print(f"Unable to load injected module: {mName}")
-        packaging = tags = None
+        packaging = tags = requirements = pkg_version = utils = specifiers = PYTHON_VERSION = None
         PLATFORM_TAGS = []
         return "INIT error"
 
@@ -87,92 +103,570 @@ default_context = ssl.create_default_context()
 # PLATFORM_TAGS = [str(tag) for tag in tags.sys_tags()]
 # print("Platform tags (first 5):", PLATFORM_TAGS[:5])  # For debugging
 
+# DX_PYPI_URL points the validator at a mirror or at local_index_server.py
+PYPI_URL = os.environ.get("DX_PYPI_URL", "https://pypi.org").rstrip("/")
+PYPI_JSON_URL = PYPI_URL + "/pypi/{}/json"
+PYPI_RELEASE_JSON_URL = PYPI_URL + "/pypi/{}/{}/json"
+CLOSURE_WORKERS = 8  # parallel metadata fetches per dependency level
 
-def python_main(project_path, trigger):
+
+def _iter_requirement_lines(req_path, constraint=False, _seen=None):
     """
-    Validates versions listed in requirements.txt using PyPI API.
-    Checks if version exists AND if a compatible wheel is available.
+    Yield (line_text, is_constraint, note) for every requirement in req_path,
+    following '-r'/'--requirement' and '-c'/'--constraint' includes (relative
+    to the including file), joining '\\' continuations and dropping comments
+    and per-requirement options such as '--hash=...'.
+    Global pip options (-i, --index-url, -f, ...) are skipped; 'note' is set
+    for lines that cannot be checked (missing include, editable install).
     """
-    if not PLATFORM_TAGS:
-        return "packaging not available"
+    _seen = set() if _seen is None else _seen
+    real = os.path.realpath(req_path)
+    if real in _seen:
+        return
+    _seen.add(real)
+
+    with open(req_path, 'r', encoding="utf-8") as file:
+        logical, pending = [], ""
+        for raw_line in file:
+            line = raw_line.rstrip("\r\n")
+            if line.endswith("\\"):
+                pending += line[:-1] + " "
+                continue
+            logical.append(pending + line)
+            pending = ""
+        if pending:
+            logical.append(pending)
+
+    base_dir = os.path.dirname(req_path)
+    for line in logical:
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if not line:
+            continue
+
+        include = re.match(r"^(-r|--requirement|-c|--constraint)(?:\s*=\s*|\s+)(\S+)$", line)
+        if include:
+            flag, target = include.groups()
+            target = os.path.join(base_dir, target) if not os.path.isabs(target) else target
+            nested_constraint = constraint or flag in ("-c", "--constraint")
+            if not os.path.isfile(target):
+                yield (f"{flag} {include.group(2)}", nested_constraint, f"include not found: {target}")
+                continue
+            yield from _iter_requirement_lines(target, nested_constraint, _seen)
+            continue
 
-    if not trigger:
-        return "Waiting for Trigger"
+        if line.startswith("-"):
+            if line.startswith(("-e", "--editable")):
+                yield (line, constraint, "editable requirements are not checked against PyPI")
+            continue
 
-    # Construct path to requirements.txt
-    req_path = os.path.join(project_path, 'requirements.txt')
-    if not os.path.isfile(req_path):
-        return f"Error: requirements.txt not found at {req_path}"
+        line = re.split(r"\s+--?[A-Za-z]", line, maxsplit=1)[0].strip()
+        yield (line, constraint, None)
 
-    status_messages = []
-    with open(req_path, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            match = re.match(r'^([a-zA-Z0-9_\-]+)==([\d\.]+)$', line)
-            if not match:
-                status_messages.append(f"⚠️ Unrecognized format: {line}")
-                continue
 
-            pkg, version = match.groups()
-            url = f"https://pypi.org/pypi/{pkg}/json"
-            data = None
-            ssl_warning = False
+def _fetch_json(url, pkg):
+    """
+    GET a PyPI JSON document.
+    Returns (data, ssl_warning, error_message).
+    """
+    try:
+        with urllib.request.urlopen(url, context=default_context) as response:
+            return json.load(response), False, None
 
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, ssl.SSLError):
             try:
-                with urllib.request.urlopen(url, context=default_context) as response:
-                    data = json.load(response)
+                insecure_context = ssl._create_unverified_context()
+                with urllib.request.urlopen(url, context=insecure_context) as response:
+                    return json.load(response), True, None
+            except Exception as fallback_error:
+                return None, False, f"❌ SSL error checking {pkg}: {fallback_error}"
+        return None, False, f"❌ URLError checking {pkg}: {e}"
+
+    except Exception as e:
+        return None, False, f"❌ Error checking {pkg}: {e}"
+
+
+def _fetch_project(pkg):
+    """Project-level JSON (all releases and their files)."""
+    return _fetch_json(PYPI_JSON_URL.format(pkg), pkg)
 
-            except urllib.error.URLError as e:
-                if isinstance(e.reason, ssl.SSLError):
+
+def _fetch_requires_dist(pkg, version):
+    """
+    Release-level JSON for pkg==version.
+    Returns (requires_dist list, error_message).
+    """
+    data, _, error = _fetch_json(PYPI_RELEASE_JSON_URL.format(pkg, version), pkg)
+    if error:
+        return None, error
+    if not data:
+        return None, f"❌ No data returned for {pkg}=={version}"
+    return (data.get("info") or {}).get("requires_dist") or [], None
+
+
+def _store_project(projects, name, fetched):
+    """Cache a _fetch_project() result as a project dict, or an error string."""
+    data, ssl_warning, error = fetched
+    key = utils.canonicalize_name(name)
+    if error:
+        projects[key] = error
+    elif not data:
+        projects[key] = f"❌ No data returned for {name}"
+    else:
+        projects[key] = {"data": data, "releases": _release_index(data), "ssl_warning": ssl_warning}
+    return projects[key]
+
+
+def _release_index(data):
+    """
+    Parse every release key once into {Version: files}; yanked-only releases
+    and non-PEP 440 keys are dropped.
+    """
+    parsed = {}
+    for ver_text, files in (data.get("releases") or {}).items():
+        try:
+            ver = pkg_version.Version(ver_text)
+        except pkg_version.InvalidVersion:
+            continue
+        if files and all(f.get("yanked") for f in files):
+            continue
+        parsed[ver] = files
+    return parsed
+
+
+_TAG_RANKS = None  # {str(tag): index in PLATFORM_TAGS}
+
+
+def _wheel_rank(filename):
+    """Best (lowest) PLATFORM_TAGS index among the wheel's tags, or None if not installable."""
+    global _TAG_RANKS
+    if _TAG_RANKS is None:
+        _TAG_RANKS = {tag: rank for rank, tag in enumerate(PLATFORM_TAGS)}
+    try:
+        _, _, _, wheel_tags = utils.parse_wheel_filename(filename)
+    except (utils.InvalidWheelFilename, pkg_version.InvalidVersion):
+        return None
+    ranks = [_TAG_RANKS[str(t)] for t in wheel_tags if str(t) in _TAG_RANKS]
+    return min(ranks) if ranks else None
+
+
+def _is_wheel_compatible(filename):
+    """True if pip would accept this wheel filename on the running interpreter."""
+    return _wheel_rank(filename) is not None
+
+
+def _wheel_summary(files):
+    """(compatible, has_wheels) for a release's file list."""
+    wheels = [r for r in files if r["filename"].endswith(".whl")]
+    return any(_is_wheel_compatible(w["filename"]) for w in wheels), bool(wheels)
+
+
+def _check_requirement(req, constraint_specs, project):
+    """
+    Resolve one parsed requirement against its project's release index and
+    return (status message, resolved version or None).
+    """
+    pkg = req.name
+    spec_set = req.specifier
+    for extra_spec in constraint_specs:
+        spec_set &= extra_spec
+    releases = project["releases"]
+    finals = [ver for ver in releases if not ver.is_prerelease]
+    latest = str(max(finals or releases)) if releases else "N/A"
+    exact = [s for s in spec_set if s.operator in ("==", "===") and not s.version.endswith(".*")]
+    pinned = len(spec_set) == 1 and bool(exact)
+
+    # Single batch evaluation of the specifier set over the cached release list
+    matches = sorted(spec_set.filter(releases.keys()), reverse=True)
+    files_by_version = releases
+    if pinned and not matches:
+        # Exact pins may point at yanked releases; pip still installs those
+        raw = (project["data"].get("releases") or {}).get(exact[0].version)
+        if raw is not None:
+            pinned_version = pkg_version.Version(exact[0].version)
+            matches = [pinned_version]
+            files_by_version = {**releases, pinned_version: raw}
+
+    display = f"{pkg}{spec_set}"
+    if not matches:
+        if pinned:
+            return f"❌ {pkg}=={exact[0].version} not found (latest: {latest})", None
+        return f"❌ {display} matches no release (latest: {latest})", None
+
+    best = matches[0]
+    compatible, has_wheels = _wheel_summary(files_by_version[best])
+    label = f"{pkg}=={best}" if pinned else f"{display} → {best}"
+    if compatible:
+        return f"✅ {label} is available and compatible", best
+    if not pinned:
+        # Ranged requirement: pip may fall back to an older matching wheel
+        for older in matches[1:]:
+            if _wheel_summary(files_by_version[older])[0]:
+                return f"⚠️ {label} has no compatible wheel; newest compatible match is {older}", older
+    if has_wheels:
+        return f"⚠️ {label} exists but has NO compatible wheel for this platform", best
+    return f"⚠️ {label} exists but only as source (no wheels)", best
+
+
+def _python_compatible(requires_python):
+    """True if a file's 'requires_python' admits the running interpreter."""
+    if not requires_python:
+        return True
+    try:
+        spec_set = specifiers.SpecifierSet(requires_python)
+    except specifiers.InvalidSpecifier:
+        return True  # unparseable metadata: let pip decide
+    return spec_set.contains(PYTHON_VERSION, prereleases=True)
+
+
+def _pick_installable(spec_set, project):
+    """
+    The version pip would pick for a dependency: the newest matching release
+    that has a compatible wheel or, failing that, an sdist it could build.
+    Returns (version, needs_build) or (None, False).
+    """
+    releases = project["releases"]
+    for ver in sorted(spec_set.filter(releases.keys()), reverse=True):
+        files = [f for f in releases[ver] if _python_compatible(f.get("requires_python"))]
+        if any(f["filename"].endswith(".whl") and _is_wheel_compatible(f["filename"]) for f in files):
+            return ver, False
+        if any(f.get("packagetype") == "sdist" or f["filename"].endswith((".tar.gz", ".zip"))
+               for f in files):
+            return ver, True
+    return None, False
+
+
+def _check_closure(roots, projects, constraints):
+    """
+    Walk requires_dist metadata from the resolved top-level pins, level by
+    level, fetching each level's metadata in parallel. Markers are evaluated
+    for the running interpreter (with the extras requested by the parent).
+    Returns (status messages, complete); stops at the first node with no
+    installable release for this interpreter and reports its dependency path.
+    'complete' is False when a metadata fetch failed, so the verdict must not
+    be cached.
+    """
+    chosen = {}     # canonical name -> Version picked for it
+    metadata = {}   # (canonical name, version text) -> (requires_dist, error)
+    seen = set()    # (canonical name, version text, extras)
+    source_builds = []
+    queue = []
+    for req, ver in roots:
+        chosen[utils.canonicalize_name(req.name)] = ver
+        queue.append((req.name, ver, tuple(sorted(req.extras)), (f"{req.name}=={ver}",)))
+
+    with ThreadPoolExecutor(max_workers=CLOSURE_WORKERS) as pool:
+        while queue:
+            level = []
+            for node in queue:
+                node_key = (utils.canonicalize_name(node[0]), str(node[1]), node[2])
+                if node_key not in seen:
+                    seen.add(node_key)
+                    level.append(node)
+
+            # 1) requires_dist of every node on this level, in parallel
+            missing = sorted({(utils.canonicalize_name(name), str(ver)): name for name, ver, _, _ in level
+                              if (utils.canonicalize_name(name), str(ver)) not in metadata}.items())
+            fetched = pool.map(lambda item: _fetch_requires_dist(item[1], item[0][1]), missing)
+            for (meta_key, _), result in zip(missing, fetched):
+                metadata[meta_key] = result
+
+            # 2) dependencies that apply to this interpreter
+            deps = []
+            for name, ver, extras, path in level:
+                requires, error = metadata[(utils.canonicalize_name(name), str(ver))]
+                if error:
+                    return [f"❌ Dependency closure: no metadata for {name}=={ver} ({error}) "
+                            f"[path: {' → '.join(path)}]"], False
+                for text in requires:
                     try:
-                        insecure_context = ssl._create_unverified_context()
-                        with urllib.request.urlopen(url, context=insecure_context) as response:
-                            data = json.load(response)
-                            ssl_warning = True
-                    except Exception as fallback_error:
-                        status_messages.append(f"❌ SSL error checking {pkg}: {fallback_error}")
+                        dep = requirements.Requirement(text)
+                    except requirements.InvalidRequirement:
+                        continue
+                    if dep.url:
                         continue
+                    if dep.marker is not None and not any(
+                            dep.marker.evaluate({"extra": e}) for e in (extras or ("",))):
+                        continue
+                    deps.append((path, dep))
+
+            # 3) release lists of newly seen projects, in parallel
+            new_names = sorted({utils.canonicalize_name(dep.name): dep.name for _, dep in deps
+                                if utils.canonicalize_name(dep.name) not in projects}.items())
+            for (_, name), result in zip(new_names, pool.map(lambda item: _fetch_project(item[1]), new_names)):
+                _store_project(projects, name, result)
+
+            # 4) resolve each dependency against its cached release list
+            queue = []
+            for path, dep in deps:
+                key = utils.canonicalize_name(dep.name)
+                dep_text = f"{dep.name}{dep.specifier}"
+                dep_path = path + (dep_text,)
+                project = projects[key]
+                if isinstance(project, str):
+                    return [f"❌ Dependency closure: {project} [path: {' → '.join(dep_path)}]"], False
+                if key in chosen:
+                    ver = chosen[key]
+                    if not dep.specifier.contains(ver, prereleases=True):
+                        return [f"❌ Dependency closure: {dep_text} conflicts with "
+                                f"{dep.name}=={ver} [path: {' → '.join(dep_path)}]"], True
                 else:
-                    status_messages.append(f"❌ URLError checking {pkg}: {e}")
-                    continue
+                    spec_set = dep.specifier
+                    for extra_spec in constraints.get(key, []):
+                        spec_set &= extra_spec
+                    ver, needs_build = _pick_installable(spec_set, project)
+                    if ver is None:
+                        return [f"❌ Dependency closure: {dep_text} has no installable "
+                                f"release for this interpreter [path: {' → '.join(dep_path)}]"], True
+                    chosen[key] = ver
+                    if needs_build:
+                        source_builds.append(path + (f"{dep.name}=={ver}",))
+                queue.append((dep.name, ver, tuple(sorted(dep.extras)), path + (f"{dep.name}=={ver}",)))
 
-            except Exception as e:
-                status_messages.append(f"❌ Error checking {pkg}: {e}")
-                continue
+    messages = [f"⚠️ Dependency closure: {path[-1]} needs a source build (no compatible wheel) "
+                f"[path: {' → '.join(path)}]" for path in source_builds]
+    messages.append(f"✅ Dependency closure: {len(chosen)} packages resolved, "
+                    f"{len(chosen) - len(source_builds)} with compatible wheels")
+    return messages, True
 
-            # Analyze result
-            if data:
-                available = data.get("releases", {}).keys()
-                if version in available:
-                    # Check wheel compatibility
-                    releases = data.get("releases", {}).get(version, [])
-                    wheels = [r for r in releases if r["filename"].endswith(".whl")]
-
-                    compatible = False
-                    for wheel in wheels:
-                        filename = wheel["filename"].lower()
-                        if any(tag.lower() in filename for tag in PLATFORM_TAGS):
-                            compatible = True
-                            break
-
-                    if compatible:
-                        msg = f"✅ {pkg}=={version} is available and compatible"
-                    elif wheels:
-                        msg = f"⚠️ {pkg}=={version} exists but has NO compatible wheel for this platform"
-                    else:
-                        msg = f"⚠️ {pkg}=={version} exists but only as source (no wheels)"
 
-                else:
-                    latest = sorted(available)[-1] if available else "N/A"
-                    msg = f"❌ {pkg}=={version} not found (latest: {latest})"
+# ----------------------------
+# Helpers: incremental cache
+# ----------------------------
+
+CACHE_FILENAME = ".requirements_validation_cache.json"
+CACHE_TTL_SECONDS = 6 * 60 * 60  # re-check a cached verdict after this long (new releases, yanks)
+CACHE_VERSION = 2  # bump when the entry layout changes
+VALIDATOR_ID = "with-packaging"
+
+
+def _environment_fingerprint():
+    """Short hash of the interpreter version and its ordered wheel tags."""
+    text = f"{sys.implementation.name} {platform.python_version()}\n" + "\n".join(PLATFORM_TAGS)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _load_cache(cache_path):
+    """Previous verdicts {key: {"message", "resolved", "detail", "checked"}}; empty on any problem."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("entries", {}) if data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_cache(cache_path, entries):
+    """Write verdicts atomically, dropping expired ones. Failures are ignored."""
+    now = time.time()
+    live = {k: v for k, v in entries.items() if now - v.get("checked", 0) < CACHE_TTL_SECONDS}
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": live}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def _cached(cache, key, now):
+    entry = cache.get(key)
+    if entry and now - entry.get("checked", 0) < CACHE_TTL_SECONDS:
+        return entry
+    return None
+
+def _requirement_key(req, constraint_specs):
+    """Normalized requirement text: canonical name, extras, sorted specifiers, marker."""
+    specs = sorted(str(s) for s in req.specifier)
+    specs += sorted(str(s) for spec_set in constraint_specs for s in spec_set)
+    marker = str(req.marker) if req.marker is not None else ""
+    return f"{utils.canonicalize_name(req.name)}[{','.join(sorted(req.extras))}]{','.join(specs)};{marker}"
+
+
+# ----------------------------
+# Helpers: JSON report
+# ----------------------------
+
+REPORT_STATUS = {"✅": "ok", "⚠": "warning", "❌": "error", "⏭": "skipped"}
 
-                if ssl_warning:
-                    msg += " (SSL fallback used)"
 
-                status_messages.append(msg)
+def _file_summary(f):
+    digests = f.get("digests") or {}
+    return {"filename": f.get("filename"), "size": f.get("size"),
+            "sha256": digests.get("sha256"), "url": f.get("url")}
+
+
+def _release_detail(project, version):
+    """
+    Download facts for a resolved release: the wheel pip would pick (best tag
+    rank among files whose requires_python admits this interpreter), the sdist,
+    and the release's requires_python.
+    """
+    files = project["releases"].get(version) \
+        or (project["data"].get("releases") or {}).get(str(version)) or []
+    wheel, wheel_rank = None, None
+    for f in files:
+        if not _python_compatible(f.get("requires_python")):
+            continue
+        rank = _wheel_rank(f.get("filename", ""))
+        if rank is not None and (wheel_rank is None or rank < wheel_rank):
+            wheel, wheel_rank = f, rank
+    sdist = next((f for f in files if f.get("packagetype") == "sdist"
+                  or f.get("filename", "").endswith((".tar.gz", ".zip"))), None)
+    requires_python = next((f["requires_python"] for f in ([wheel] if wheel else []) + files
+                            if f.get("requires_python")), None)
+    return {
+        "requires_python": requires_python,
+        "wheel": wheel and _file_summary(wheel),
+        "sdist": sdist and _file_summary(sdist),
+        "source_only": wheel is None and sdist is not None,
+    }
+
+
+def _result(line, name, message, resolved=None, detail=None):
+    """One report row; status is read off the message's leading emoji."""
+    row = {"line": line, "name": name, "status": REPORT_STATUS.get(message[:1], "info"),
+           "message": message, "resolved_version": resolved}
+    row.update(detail or {"requires_python": None, "wheel": None, "sdist": None, "source_only": False})
+    return row
+
+
+def _build_report(results, closure_messages, reused):
+    """Rows plus totals: verdict counts, bytes pip would download, source-only count."""
+    totals = {"requirements": len(results), "ok": 0, "warning": 0, "error": 0, "skipped": 0,
+              "download_bytes": 0, "source_only": 0}
+    for row in results:
+        if row["status"] in totals:
+            totals[row["status"]] += 1
+        download = row["wheel"] or row["sdist"]
+        if row["resolved_version"] and download:
+            totals["download_bytes"] += download.get("size") or 0
+        if row["resolved_version"] and row["source_only"]:
+            totals["source_only"] += 1
+    return {
+        "validator": VALIDATOR_ID,
+        "index": PYPI_URL,
+        "requirements": results,
+        "dependencies": [{"status": REPORT_STATUS.get(m[:1], "info"), "message": m} for m in closure_messages],
+        "cached": reused,
+        "totals": totals,
+    }
+
+
+def python_main(project_path, trigger, check_dependencies=0, json_report=0):
+    """
+    Validates requirements.txt against the PyPI API.
+    Accepts PEP 508 lines (specifiers, extras, environment markers) and follows
+    -r/-c includes. Each project's release list is fetched once and every
+    specifier set is resolved against it to a concrete best version, which is
+    then checked for a compatible wheel.
+    With check_dependencies set, the requires_dist closure of the resolved pins
+    is crawled as well (see _check_closure).
+    Verdicts are persisted in CACHE_FILENAME next to requirements.txt; only new
+    or edited lines (or verdicts older than CACHE_TTL_SECONDS) hit the index.
+    With json_report set, returns a JSON document instead (see _build_report):
+    per-requirement status, resolved version, chosen wheel with size/sha256,
+    requires_python, plus download-size and source-only totals.
+    """
+    if not PLATFORM_TAGS:
+        return "packaging not available"
+
+    if not trigger:
+        return "Waiting for Trigger"
+
+    # Construct path to requirements.txt
+    req_path = os.path.join(project_path, 'requirements.txt')
+    if not os.path.isfile(req_path):
+        return f"Error: requirements.txt not found at {req_path}"
+
+    results = []            # report rows, in file order
+    reqs = []               # (line, Requirement or queued message), in file order
+    constraints = {}        # canonical name -> [SpecifierSet, ...]
+    for line, is_constraint, note in _iter_requirement_lines(req_path):
+        if note:
+            reqs.append((line, f"⚠️ {line}: {note}"))
+            continue
+        try:
+            req = requirements.Requirement(line)
+        except requirements.InvalidRequirement:
+            reqs.append((line, f"⚠️ Unrecognized format: {line}"))
+            continue
+        if is_constraint:
+            constraints.setdefault(utils.canonicalize_name(req.name), []).append(req.specifier)
+        else:
+            reqs.append((line, req))
+
+    projects = {}           # canonical name -> {"data", "releases", "ssl_warning"} or error str
+    roots = []              # (Requirement, resolved Version) for the closure check
+
+    # Verdicts from earlier runs, keyed by normalized requirement + interpreter/tag fingerprint
+    cache_path = os.path.join(project_path, CACHE_FILENAME)
+    cache = _load_cache(cache_path)
+    fingerprint = _environment_fingerprint()
+    now = time.time()
+    reused = 0
+    for line, req in reqs:
+        if isinstance(req, str):
+            results.append(_result(line, None, req))
+            continue
+        if req.marker is not None:
+            if not any(req.marker.evaluate({"extra": e}) for e in (sorted(req.extras) or [""])):
+                results.append(_result(line, req.name, f"⏭️ {line} skipped (marker does not apply to this interpreter)"))
+                continue
+
+        if req.url:
+            results.append(_result(line, req.name, f"⚠️ {req.name} @ {req.url} is a direct reference; not checked against PyPI"))
+            continue
+
+        key = utils.canonicalize_name(req.name)
+        line_key = _cache_key(VALIDATOR_ID, fingerprint, _requirement_key(req, constraints.get(key, [])))
+        entry = _cached(cache, line_key, now)
+        if entry is None:
+            project = projects.get(key) or _store_project(projects, req.name, _fetch_project(req.name))
+            if isinstance(project, str):
+                results.append(_result(line, req.name, project))  # network errors are never cached
+                continue
+            msg, resolved = _check_requirement(req, constraints.get(key, []), project)
+            if project["ssl_warning"]:
+                msg += " (SSL fallback used)"
+            detail = _release_detail(project, resolved) if resolved else None
+            entry = cache[line_key] = {"message": msg, "resolved": resolved and str(resolved),
+                                       "detail": detail, "checked": now}
+        else:
+            reused += 1
+
+        results.append(_result(line, req.name, entry["message"], entry["resolved"], entry["detail"]))
+        if entry["resolved"]:
+            roots.append((req, pkg_version.Version(entry["resolved"])))
+
+    closure_messages = []
+    if check_dependencies and roots:
+        # Constraints narrow the versions picked for dependencies too, so they are part of the key
+        closure_key = _cache_key(VALIDATOR_ID, fingerprint, "closure", *sorted(
+            f"{utils.canonicalize_name(req.name)}[{','.join(sorted(req.extras))}]=={ver}" for req, ver in roots), *sorted(
+            f"-c {key}{','.join(sorted(str(s) for spec_set in specs for s in spec_set))}"
+            for key, specs in constraints.items()))
+        entry = _cached(cache, closure_key, now)
+        if entry is None:
+            messages, complete = _check_closure(roots, projects, constraints)
+            entry = {"messages": messages, "checked": now}
+            if complete:
+                cache[closure_key] = entry
+        else:
+            reused += 1
+        closure_messages = entry["messages"]
+
+    _save_cache(cache_path, cache)
+    if json_report:
+        return json.dumps(_build_report(results, closure_messages, reused), ensure_ascii=False, indent=2)
+
+    status_messages = [row["message"] for row in results] + closure_messages
+    if reused:
+        status_messages.append(f"ℹ️ {reused} unchanged result(s) reused from {CACHE_FILENAME}")
 
     return "\n".join(status_messages) if status_messages else "✅ All entries valid."
 
@@ -185,5 +679,6 @@ def python_finalize():
 if __name__ == '__main__':
     # For external testing
     test_path = r"/your/project/path"
-    print(python_main(test_path, True))
+    print(python_init(test_path, True, True))
+    print(python_main(test_path, True, True))
     python_finalize()
@@ -3,12 +3,21 @@ import re
 import sys
 import json
 import ssl
+import struct
+import time
+import hashlib
+import subprocess
+import sysconfig
+import importlib.machinery
 import urllib.request
 import urllib.error
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
 # iz_input 1 "project_path"
 # iz_input 2 "trigger"
+# iz_input 3 "check_dependencies"   # 0/1: also walk requires_dist of every pin
+# iz_input 4 "json_report"          # 0/1: return a JSON report instead of status lines
 # iz_output 1 "status"
 
 # Use system default SSL context
@@ -17,193 +26,1338 @@ _default_ctx = ssl.create_default_context()
 # ----------------------------
 # Helpers: environment tagging
 # ----------------------------
+#
+# Self-contained port of the tag ordering used by packaging.tags.sys_tags(),
+# so this actor ranks wheels exactly like pip does without needing the
+# 'packaging' module to be injected. Tags are plain (interpreter, abi, platform)
+# tuples; the full ordered list is built once per process and turned into a
+# {tag: rank} dict so each wheel tag triple is an O(1) lookup.
 
-def _py_tags():
+_INTERPRETER_SHORT_NAMES = {
+    "python": "py",
+    "cpython": "cp",
+    "pypy": "pp",
+    "ironpython": "ip",
+    "jython": "jy",
+}
+
+# glibc 2.17 (CentOS 7), 2.12 (CentOS 6), 2.5 (CentOS 5) legacy aliases
+_LEGACY_MANYLINUX_MAP = {
+    (2, 17): "manylinux2014",
+    (2, 12): "manylinux2010",
+    (2, 5): "manylinux1",
+}
+_LAST_GLIBC_MINOR = 50  # guess used for any past glibc major version
+_MANYLINUX_ARCHS = {"x86_64", "aarch64", "ppc64", "ppc64le", "s390x", "loongarch64", "riscv64"}
+
+_IS_32BIT = struct.calcsize("P") == 4
+
+_SYS_TAGS = None        # ordered list of (interpreter, abi, platform), best first
+_SYS_TAG_RANKS = None   # {(interpreter, abi, platform): rank}
+
+
+def _normalize_tag_string(value):
+    return value.replace(".", "_").replace("-", "_").replace(" ", "_")
+
+
+def _version_nodot(version):
+    return "".join(map(str, version))
+
+
+def _interpreter_name():
+    name = sys.implementation.name
+    return _INTERPRETER_SHORT_NAMES.get(name) or name
+
+
+def _interpreter_version():
+    version = sysconfig.get_config_var("py_version_nodot")
+    return str(version) if version else _version_nodot(sys.version_info[:2])
+
+
+def _cpython_abis(py_version):
+    """ABI tags for this CPython build, most specific first (e.g. ['cp311'])."""
+    py_version = tuple(py_version)
+    abis = []
+    version = _version_nodot(py_version[:2])
+    threading = debug = pymalloc = ucs4 = ""
+    with_debug = sysconfig.get_config_var("Py_DEBUG")
+    has_refcount = hasattr(sys, "gettotalrefcount")
+    # Windows doesn't set Py_DEBUG; look for debug extension suffixes instead
+    has_ext = "_d.pyd" in importlib.machinery.EXTENSION_SUFFIXES
+    if with_debug or (with_debug is None and (has_refcount or has_ext)):
+        debug = "d"
+    if py_version >= (3, 13) and sysconfig.get_config_var("Py_GIL_DISABLED"):
+        threading = "t"
+    if py_version < (3, 8):
+        with_pymalloc = sysconfig.get_config_var("WITH_PYMALLOC")
+        if with_pymalloc or with_pymalloc is None:
+            pymalloc = "m"
+        if py_version < (3, 3):
+            unicode_size = sysconfig.get_config_var("Py_UNICODE_SIZE")
+            if unicode_size == 4 or (unicode_size is None and sys.maxunicode == 0x10FFFF):
+                ucs4 = "u"
+    elif debug:
+        # Debug builds can also load "normal" extension modules
+        abis.append(f"cp{version}{threading}")
+    abis.insert(0, f"cp{version}{threading}{debug}{pymalloc}{ucs4}")
+    return abis
+
+
+def _generic_abi():
+    """ABI tag derived from EXT_SUFFIX for non-CPython interpreters."""
+    ext_suffix = sysconfig.get_config_var("EXT_SUFFIX")
+    if not isinstance(ext_suffix, str) or not ext_suffix.startswith("."):
+        return []
+    parts = ext_suffix.split(".")
+    if len(parts) < 3:
+        # CPython 3.7 and earlier used plain ".pyd" on Windows
+        return _cpython_abis(sys.version_info[:2])
+    soabi = parts[1]
+    if soabi.startswith("cpython"):
+        cpython_parts = soabi.split("-")
+        if len(cpython_parts) < 2 or not cpython_parts[1]:
+            return []
+        abi = "cp" + cpython_parts[1]
+    elif soabi.startswith("cp"):
+        abi = soabi.split("-")[0]
+    elif soabi.startswith("pypy"):
+        abi = "-".join(soabi.split("-")[:2])
+    elif soabi.startswith("graalpy"):
+        abi = "-".join(soabi.split("-")[:3])
+    elif soabi:
+        abi = soabi
+    else:
+        return []
+    return [_normalize_tag_string(abi)]
+
+
+# ---- macOS ----
+
+def _mac_binary_formats(version, cpu_arch):
+    formats = [cpu_arch]
+    if cpu_arch == "x86_64":
+        if version < (10, 4):
+            return []
+        formats.extend(["intel", "fat64", "fat32"])
+    elif cpu_arch == "i386":
+        if version < (10, 4):
+            return []
+        formats.extend(["intel", "fat32", "fat"])
+    elif cpu_arch == "ppc64":
+        if version > (10, 5) or version < (10, 4):
+            return []
+        formats.append("fat64")
+    elif cpu_arch == "ppc":
+        if version > (10, 6):
+            return []
+        formats.extend(["fat32", "fat"])
+    if cpu_arch in {"arm64", "x86_64"}:
+        formats.append("universal2")
+    if cpu_arch in {"x86_64", "i386", "ppc64", "ppc", "intel"}:
+        formats.append("universal")
+    return formats
+
+
+def _mac_version():
+    """Real macOS (major, minor), also when Python reports the 10.16 compat version."""
+    version_str, _, _ = platform.mac_ver()
+    try:
+        version = tuple(map(int, version_str.split(".")[:2]))
+    except ValueError:
+        version = ()
+    if version == (10, 16):
+        # Built against an older SDK: ask a child interpreter with compat mode off
+        try:
+            out = subprocess.run(
+                [sys.executable, "-sS", "-c", "import platform; print(platform.mac_ver()[0])"],
+                check=True, env={"SYSTEM_VERSION_COMPAT": "0"},
+                stdout=subprocess.PIPE, text=True
+            ).stdout
+            version = tuple(map(int, out.split(".")[:2]))
+        except Exception:
+            pass
+    if len(version) == 1:
+        version = (version[0], 0)
+    return version if len(version) == 2 else (11, 0)  # assume modern macOS if parsing fails
+
+
+def _mac_platforms():
+    version = _mac_version()
+    arch = platform.mac_ver()[2] or platform.machine()
+    if _IS_32BIT:
+        arch = "ppc" if arch.startswith("ppc") else "i386"
+
+    tags = []
+    if (10, 0) <= version < (11, 0):
+        # Before macOS 11 each yearly release bumped the minor number
+        for minor in range(version[1], -1, -1):
+            for fmt in _mac_binary_formats((10, minor), arch):
+                tags.append(f"macosx_10_{minor}_{fmt}")
+    if version >= (11, 0):
+        # From macOS 11 each yearly release bumps the major number
+        for major in range(version[0], 10, -1):
+            for fmt in _mac_binary_formats((major, 0), arch):
+                tags.append(f"macosx_{major}_0_{fmt}")
+        # x86_64 runs binaries built for older releases; arm64 only via universal2
+        for minor in range(16, 3, -1):
+            if arch == "x86_64":
+                for fmt in _mac_binary_formats((10, minor), arch):
+                    tags.append(f"macosx_10_{minor}_{fmt}")
+            else:
+                tags.append(f"macosx_10_{minor}_universal2")
+    return tags
+
+
+# ---- Linux (glibc / musl) ----
+
+def _read_elf_header(path):
     """
-    Return a set of acceptable python and abi tags for this interpreter.
-    Examples (CPython 3.11): {'cp311', 'py311', 'py31', 'py3'}
-    Accept ABI: {'cp311', 'abi3', 'none'}  (the 'none' is for pure-python)
+    Minimal ELF reader: returns dict(capacity, encoding, machine, flags, interpreter)
+    or None if the file is not a readable ELF executable.
     """
-    impl = platform.python_implementation()
-    major, minor = sys.version_info[:2]
+    try:
+        with open(path, "rb") as f:
+            ident = f.read(16)
+            if len(ident) < 16 or ident[:4] != b"\x7fELF":
+                return None
+            capacity, encoding = ident[4], ident[5]
+            fmts = {
+                (1, 1): ("<HHIIIIIHHH", "<IIIIIIII", (0, 1, 4)),
+                (1, 2): (">HHIIIIIHHH", ">IIIIIIII", (0, 1, 4)),
+                (2, 1): ("<HHIQQQIHHH", "<IIQQQQQQ", (0, 2, 5)),
+                (2, 2): (">HHIQQQIHHH", ">IIQQQQQQ", (0, 2, 5)),
+            }.get((capacity, encoding))
+            if fmts is None:
+                return None
+            e_fmt, p_fmt, p_idx = fmts
+            fields = struct.unpack(e_fmt, f.read(struct.calcsize(e_fmt)))
+            machine, e_phoff, flags, e_phentsize, e_phnum = (
+                fields[1], fields[4], fields[6], fields[8], fields[9])
+
+            interpreter = None
+            for index in range(e_phnum):
+                f.seek(e_phoff + e_phentsize * index)
+                raw = f.read(struct.calcsize(p_fmt))
+                if len(raw) < struct.calcsize(p_fmt):
+                    continue
+                ph = struct.unpack(p_fmt, raw)
+                if ph[p_idx[0]] != 3:  # PT_INTERP
+                    continue
+                f.seek(ph[p_idx[1]])
+                interpreter = os.fsdecode(f.read(ph[p_idx[2]])).strip("\0")
+                break
+    except (OSError, struct.error, ValueError):
+        return None
+    return {"capacity": capacity, "encoding": encoding, "machine": machine,
+            "flags": flags, "interpreter": interpreter}
+
+
+def _glibc_version():
+    """(major, minor) of the running glibc via os.confstr (ctypes fallback), or (-1, -1)."""
+    version_str = None
+    try:
+        _, version_str = os.confstr("CS_GNU_LIBC_VERSION").rsplit()
+    except (AttributeError, OSError, ValueError):
+        version_str = None
+    if not version_str:
+        try:
+            import ctypes
+            fn = ctypes.CDLL(None).gnu_get_libc_version
+            fn.restype = ctypes.c_char_p
+            version_str = fn().decode("ascii")
+        except Exception:
+            version_str = None
+    m = re.match(r"(\d+)\.(\d+)", version_str or "")
+    return (int(m.group(1)), int(m.group(2))) if m else (-1, -1)
 
-    tags = set()
-    abi = set()
 
-    # Python tags commonly seen in wheels
-    # e.g., cp311, cp310; py311; py3; py2.py3 (in filename it’ll be 'py2.py3')
-    if impl == "CPython":
-        tags.add(f"cp{major}{minor}")
-        abi.add(f"cp{major}{minor}")  # exact ABI for CPython
-        abi.add("abi3")               # stable ABI wheels are often OK
-    # Generic python tags accepted for any implementation of given version
-    tags.add(f"py{major}{minor}")
-    # include broader py3 tag (many wheels publish 'py3')
-    tags.add(f"py{major}")
+def _musl_version():
+    """(major, minor) of the musl loader this interpreter is linked against, or None."""
+    elf = _read_elf_header(sys.executable)
+    ld = elf and elf["interpreter"]
+    if not ld or "musl" not in ld:
+        return None
+    try:
+        proc = subprocess.run([ld], check=False, stderr=subprocess.PIPE, text=True)
+    except OSError:
+        return None
+    lines = [n for n in (n.strip() for n in proc.stderr.splitlines()) if n]
+    if len(lines) < 2 or lines[0][:4] != "musl":
+        return None
+    m = re.match(r"Version (\d+)\.(\d+)", lines[1])
+    return (int(m.group(1)), int(m.group(2))) if m else None
 
-    # Pure-python ABI tag:
-    abi.add("none")
 
-    return tags, abi
+def _have_manylinux_abi(archs):
+    if "armv7l" in archs or "i686" in archs:
+        elf = _read_elf_header(sys.executable)
+        if not elf or elf["capacity"] != 1 or elf["encoding"] != 1:
+            return False
+        if "armv7l" in archs:
+            # ARM EABI v5, hard-float
+            return (elf["machine"] == 40
+                    and elf["flags"] & 0xFF000000 == 0x05000000
+                    and elf["flags"] & 0x00000400 == 0x00000400)
+        return elf["machine"] == 3
+    return any(arch in _MANYLINUX_ARCHS for arch in archs)
+
+
+def _manylinux_compatible(arch, glibc, sys_glibc, manylinux_mod):
+    if sys_glibc < glibc:
+        return False
+    if manylinux_mod is None:
+        return True
+    if hasattr(manylinux_mod, "manylinux_compatible"):
+        result = manylinux_mod.manylinux_compatible(glibc[0], glibc[1], arch)
+        return True if result is None else bool(result)
+    legacy_attr = {(2, 5): "manylinux1_compatible",
+                   (2, 12): "manylinux2010_compatible",
+                   (2, 17): "manylinux2014_compatible"}.get(glibc)
+    if legacy_attr and hasattr(manylinux_mod, legacy_attr):
+        return bool(getattr(manylinux_mod, legacy_attr))
+    return True
+
+
+def _manylinux_platforms(archs):
+    if not _have_manylinux_abi(archs):
+        return []
+    try:
+        manylinux_mod = __import__("_manylinux")  # distro override (PEP 600)
+    except ImportError:
+        manylinux_mod = None
+
+    sys_glibc = _glibc_version()
+    # Oldest glibc considered: 2.17 in general, 2.5 on x86/i686
+    too_old = (2, 4) if set(archs) & {"x86_64", "i686"} else (2, 16)
+    glibc_max_list = [sys_glibc]
+    for major in range(sys_glibc[0] - 1, 1, -1):
+        glibc_max_list.append((major, _LAST_GLIBC_MINOR))
+
+    tags = []
+    for arch in archs:
+        for glibc_max in glibc_max_list:
+            min_minor = too_old[1] if glibc_max[0] == too_old[0] else -1
+            for minor in range(glibc_max[1], min_minor, -1):
+                glibc = (glibc_max[0], minor)
+                if _manylinux_compatible(arch, glibc, sys_glibc, manylinux_mod):
+                    tags.append(f"manylinux_{glibc[0]}_{glibc[1]}_{arch}")
+                    legacy = _LEGACY_MANYLINUX_MAP.get(glibc)
+                    if legacy:
+                        tags.append(f"{legacy}_{arch}")
+    return tags
+
+
+def _musllinux_platforms(archs):
+    musl = _musl_version()
+    if musl is None:
+        return []
+    return [f"musllinux_{musl[0]}_{minor}_{arch}"
+            for arch in archs for minor in range(musl[1], -1, -1)]
+
+
+def _linux_platforms():
+    linux = _normalize_tag_string(sysconfig.get_platform())
+    if not linux.startswith("linux_"):
+        return [linux]
+    if _IS_32BIT:
+        if linux == "linux_x86_64":
+            linux = "linux_i686"
+        elif linux == "linux_aarch64":
+            linux = "linux_armv8l"
+    _, arch = linux.split("_", 1)
+    archs = {"armv8l": ["armv8l", "armv7l"]}.get(arch, [arch])
+    tags = [f"linux_{a}" for a in archs]
+    tags += _manylinux_platforms(archs)
+    tags += _musllinux_platforms(archs)
+    return tags
+
 
 def _platform_tags():
     """
-    Return a set of acceptable *platform* tags for this machine.
-    Includes 'any' for pure-python wheels.
-    """
-    plat = sys.platform
-    machine = platform.machine().lower()
-    tags = set(["any"])  # pure-python wheel platform tag
-
-    # Normalize arch
-    arch = None
-    if machine in ("x86_64", "amd64"):
-        arch = "x86_64"
-    elif machine in ("aarch64", "arm64"):
-        arch = "arm64"
-    elif machine in ("i386", "i686", "x86"):
-        arch = "i386"
-    elif machine.startswith("armv7"):
-        arch = "armv7l"
-
-    if plat.startswith("win"):
-        # Common Windows platform tags
-        if arch == "x86_64":
-            tags.add("win_amd64")
-        elif arch == "arm64":
-            tags.add("win_arm64")
-        elif arch in ("i386",):
-            tags.add("win32")
-
-    elif plat == "darwin":
-        # macOS tags look like: macosx_10_9_x86_64, macosx_11_0_arm64, macosx_11_0_universal2
-        # We’ll generate a small ladder of versions from current down a few releases.
-        mac_ver_str, _, _ = platform.mac_ver()
-        if mac_ver_str:
-            parts = mac_ver_str.split(".")
-            try:
-                major = int(parts[0])
-                minor = int(parts[1]) if len(parts) > 1 else 0
-            except Exception:
-                major, minor = 11, 0  # assume modern macOS if parsing fails
+    Ordered list of acceptable *platform* tags for this machine, best first.
+    Pure-python 'any' is handled separately by _sys_tags().
+    """
+    system = platform.system()
+    if system == "Darwin":
+        return _mac_platforms()
+    if system == "Linux":
+        return _linux_platforms()
+    # Windows and everything else: the sysconfig platform (e.g. win_amd64)
+    return [_normalize_tag_string(sysconfig.get_platform())]
+
+
+# ---- full ordered tag list ----
+
+def _py_interpreter_range(py_version):
+    """py311, py3, py310, py39, ... py30"""
+    yield f"py{_version_nodot(py_version[:2])}"
+    yield f"py{py_version[0]}"
+    for minor in range(py_version[1] - 1, -1, -1):
+        yield f"py{_version_nodot((py_version[0], minor))}"
+
+
+def _sys_tags():
+    """
+    Ordered list of (interpreter, abi, platform) tags supported by this
+    interpreter, best match first. Mirrors packaging.tags.sys_tags().
+    Computed once per process.
+    """
+    global _SYS_TAGS
+    if _SYS_TAGS is not None:
+        return _SYS_TAGS
+
+    py_version = sys.version_info[:2]
+    platforms = _platform_tags()
+    interp_name = _interpreter_name()
+    tags = []
+
+    if interp_name == "cp":
+        interpreter = f"cp{_version_nodot(py_version)}"
+        abis = _cpython_abis(py_version)
+        threading = bool(re.match(r"cp\d+.*t", abis[0]))
+        for explicit in (("abi3", "abi3t", "none") if threading else ("abi3", "none")):
+            if explicit in abis:
+                abis.remove(explicit)
+        for abi in abis:
+            tags.extend((interpreter, abi, p) for p in platforms)
+        stable = "abi3t" if threading else "abi3"
+        tags.extend((interpreter, stable, p) for p in platforms)
+        tags.extend((interpreter, "none", p) for p in platforms)
+        # Stable ABI wheels built for older CPython minors still load
+        for minor in range(py_version[1] - 1, 1, -1):
+            older = f"cp{_version_nodot((py_version[0], minor))}"
+            tags.extend((older, stable, p) for p in platforms)
+        compat_interpreter = "cp" + _interpreter_version()
+    else:
+        interpreter = interp_name + _interpreter_version()
+        abis = _generic_abi()
+        if "none" not in abis:
+            abis.append("none")
+        for abi in abis:
+            tags.extend((interpreter, abi, p) for p in platforms)
+        compat_interpreter = "pp3" if interp_name == "pp" else None
+
+    for version in _py_interpreter_range(py_version):
+        tags.extend((version, "none", p) for p in platforms)
+    if compat_interpreter:
+        tags.append((compat_interpreter, "none", "any"))
+    tags.extend((version, "none", "any") for version in _py_interpreter_range(py_version))
+
+    _SYS_TAGS = tags
+    return _SYS_TAGS
+
+
+def _sys_tag_ranks():
+    """{(interpreter, abi, platform): rank} with 0 = most preferred. Memoized."""
+    global _SYS_TAG_RANKS
+    if _SYS_TAG_RANKS is None:
+        ranks = {}
+        for rank, tag in enumerate(_sys_tags()):
+            ranks.setdefault(tag, rank)  # keep first occurrence
+        _SYS_TAG_RANKS = ranks
+    return _SYS_TAG_RANKS
+
+# ----------------------------
+# Helpers: wheel parsing/check
+# ----------------------------
+
+def _wheel_tags_from_filename(filename):
+    """
+    Parse a wheel filename into the set of (interpreter, abi, platform) triples it
+    declares, expanding compressed tag sets such as 'py2.py3-none-any'.
+    Layout: {name}-{version}(-{build})?-{python}-{abi}-{platform}.whl
+    """
+    if not filename.lower().endswith(".whl"):
+        return set()
+    parts = filename[:-4].split("-")
+    if len(parts) not in (5, 6):
+        return set()
+    py_field, abi_field, plat_field = (p.lower() for p in parts[-3:])
+    return {(py, abi, plat)
+            for py in py_field.split(".")
+            for abi in abi_field.split(".")
+            for plat in plat_field.split(".")}
+
+
+def _wheel_rank(filename):
+    """
+    Best (lowest) rank of any tag triple in the wheel filename, or None if the
+    wheel is not installable on this interpreter. One dict lookup per triple.
+    """
+    ranks = _sys_tag_ranks()
+    best = None
+    for tag in _wheel_tags_from_filename(filename):
+        rank = ranks.get(tag)
+        if rank is not None and (best is None or rank < best):
+            best = rank
+    return best
+
+
+def _is_wheel_compatible(filename):
+    """True if pip would accept this wheel filename on the running interpreter."""
+    return _wheel_rank(filename) is not None
+
+# ----------------------------
+# Helpers: PEP 440 versions
+# ----------------------------
+
+_VERSION_RX = re.compile(
+    r"""^\s*v?
+        (?:(?P<epoch>[0-9]+)!)?
+        (?P<release>[0-9]+(?:\.[0-9]+)*)
+        (?P<pre>[-_\.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)[-_\.]?(?P<pre_n>[0-9]+)?)?
+        (?P<post>(?:-(?P<post_n1>[0-9]+))|(?:[-_\.]?(?P<post_l>post|rev|r)[-_\.]?(?P<post_n2>[0-9]+)?))?
+        (?P<dev>[-_\.]?(?P<dev_l>dev)[-_\.]?(?P<dev_n>[0-9]+)?)?
+        (?:\+(?P<local>[a-z0-9]+(?:[-_\.][a-z0-9]+)*))?
+        \s*$""",
+    re.VERBOSE | re.IGNORECASE
+)
+
+_PRE_NORMAL = {"alpha": "a", "a": "a", "beta": "b", "b": "b",
+               "c": "rc", "pre": "rc", "preview": "rc", "rc": "rc"}
+_PRE_ORDER = {"a": 0, "b": 1, "rc": 2}
+
+
+class _Version:
+    """
+    Parsed PEP 440 version. Instances compare by the same ordering pip uses,
+    so '10.0' > '9.0' and '1.0rc1' < '1.0' < '1.0.post1'.
+    """
+    __slots__ = ("text", "epoch", "release", "pre", "post", "dev", "local", "key", "public_key")
+
+    def __init__(self, text, m):
+        self.text = text
+        self.epoch = int(m.group("epoch") or 0)
+        self.release = tuple(int(p) for p in m.group("release").split("."))
+        self.pre = None
+        if m.group("pre"):
+            self.pre = (_PRE_NORMAL[m.group("pre_l").lower()], int(m.group("pre_n") or 0))
+        self.post = None
+        if m.group("post"):
+            self.post = int(m.group("post_n1") or m.group("post_n2") or 0)
+        self.dev = int(m.group("dev_n") or 0) if m.group("dev") else None
+        self.local = None
+        if m.group("local"):
+            self.local = tuple(int(p) if p.isdigit() else p.lower()
+                               for p in re.split(r"[-_\.]", m.group("local")))
+
+        release = list(self.release)
+        while len(release) > 1 and release[-1] == 0:
+            release.pop()
+        if self.pre is None and self.post is None and self.dev is not None:
+            pre_key = (0,)                                   # 1.0.dev0 sorts before 1.0a0
+        elif self.pre is None:
+            pre_key = (2,)
         else:
-            major, minor = 11, 0
-
-        # Produce a few downward-compatible tags (wheels often ship with minimums like 10_9)
-        ladder = []
-        if major >= 11:
-            # macOS 11+ uses major as the first number
-            for mj in range(major, max(10, major - 5), -1):
-                ladder.append((mj, 0))
+            pre_key = (1, _PRE_ORDER[self.pre[0]], self.pre[1])
+        post_key = (0,) if self.post is None else (1, self.post)
+        dev_key = (1,) if self.dev is None else (0, self.dev)
+        self.public_key = (self.epoch, tuple(release), pre_key, post_key, dev_key)
+        if self.local is None:
+            local_key = (0,)
         else:
-            # pre-11 style (10.x)
-            for mn in range(minor, max(0, minor - 5), -1):
-                ladder.append((10, mn))
-
-        arch_opts = set()
-        if arch == "x86_64":
-            arch_opts.update(["x86_64", "universal2"])  # universal2 often works
-        elif arch == "arm64":
-            arch_opts.update(["arm64", "universal2"])
+            local_key = (1, tuple((1, p, "") if isinstance(p, int) else (0, 0, p) for p in self.local))
+        self.key = self.public_key + (local_key,)
+
+    @property
+    def is_prerelease(self):
+        return self.pre is not None or self.dev is not None
+
+    @property
+    def is_postrelease(self):
+        return self.post is not None
+
+    def base_key(self):
+        release = list(self.release)
+        while len(release) > 1 and release[-1] == 0:
+            release.pop()
+        return (self.epoch, tuple(release))
+
+    def __eq__(self, other):
+        return isinstance(other, _Version) and self.key == other.key
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __str__(self):
+        return self.text
+
+
+def _parse_version(text):
+    """Return a _Version, or None if text is not a valid PEP 440 version."""
+    m = _VERSION_RX.match(text or "")
+    return _Version(text.strip(), m) if m else None
+
+
+def _release_prefix_match(candidate, prefix_release, epoch):
+    """True if candidate's release (zero-padded) starts with prefix_release."""
+    if candidate.epoch != epoch:
+        return False
+    release = candidate.release + (0,) * max(0, len(prefix_release) - len(candidate.release))
+    return release[:len(prefix_release)] == tuple(prefix_release)
+
+# ----------------------------
+# Helpers: PEP 440 specifiers
+# ----------------------------
+
+_SPEC_RX = re.compile(r"^\s*(~=|===|==|!=|<=|>=|<|>)\s*([^\s,;]+)\s*$")
+
+
+def _parse_specifiers(text):
+    """
+    Parse '>=1.0,<2' into [(op, version_text), ...].
+    Returns None if any clause is malformed.
+    """
+    specs = []
+    text = (text or "").strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    if not text.strip():
+        return specs
+    for clause in text.split(","):
+        m = _SPEC_RX.match(clause)
+        if not m:
+            return None
+        op, ver = m.groups()
+        if op != "===":
+            wildcard = ver.endswith(".*")
+            if wildcard and op not in ("==", "!="):
+                return None
+            if _parse_version(ver[:-2] if wildcard else ver) is None:
+                return None
+        specs.append((op, ver))
+    return specs
+
+
+def _spec_allows_prereleases(specs):
+    """A specifier set opts into pre-releases if any clause names one."""
+    for op, ver in specs:
+        if op == "!=":
+            continue
+        parsed = _parse_version(ver[:-2] if ver.endswith(".*") else ver)
+        if parsed is not None and parsed.is_prerelease:
+            return True
+    return False
+
+
+def _spec_contains(op, ver, candidate):
+    """Evaluate a single PEP 440 clause (op, ver) against a parsed candidate."""
+    if op == "===":
+        return candidate.text.lower() == ver.lower()
+
+    if op in ("==", "!=") and ver.endswith(".*"):
+        prefix = _parse_version(ver[:-2])
+        matched = _release_prefix_match(candidate, prefix.release, prefix.epoch)
+        if matched and (prefix.pre or prefix.post is not None or prefix.dev is not None):
+            matched = candidate.public_key[2:] == prefix.public_key[2:]
+        return matched if op == "==" else not matched
+
+    spec = _parse_version(ver)
+    if op in ("==", "!="):
+        if spec.local is None:
+            equal = candidate.public_key == spec.public_key
         else:
-            # fallback: accept both common mac arches
-            arch_opts.update(["x86_64", "arm64", "universal2"])
+            equal = candidate.key == spec.key
+        return equal if op == "==" else not equal
+
+    if op == "~=":
+        return (candidate.public_key >= spec.public_key
+                and _release_prefix_match(candidate, spec.release[:-1], spec.epoch))
+    if op == "<=":
+        return candidate.public_key <= spec.public_key
+    if op == ">=":
+        return candidate.public_key >= spec.public_key
+    if op == "<":
+        if not candidate.public_key < spec.public_key:
+            return False
+        # '<1.0' must not admit 1.0rc1 unless the spec itself is a pre-release
+        return not (not spec.is_prerelease and candidate.is_prerelease
+                    and candidate.base_key() == spec.base_key())
+    if op == ">":
+        if not candidate.public_key > spec.public_key:
+            return False
+        # '>1.0' must not admit 1.0.post1 or 1.0+local unless asked for
+        if not spec.is_postrelease and candidate.is_postrelease \
+                and candidate.public_key[:3] == spec.public_key[:3]:
+            return False
+        return not (candidate.local is not None and candidate.public_key == spec.public_key)
+    return False
+
+
+def _filter_versions(specs, versions):
+    """
+    Evaluate a whole specifier set against an already parsed release list in a
+    single pass. Pre-releases are only returned when the set asks for them or
+    when nothing else matches (pip's behaviour).
+    """
+    allow_pre = _spec_allows_prereleases(specs)
+    finals, pres = [], []
+    for v in versions:
+        if all(_spec_contains(op, ver, v) for op, ver in specs):
+            (pres if v.is_prerelease and not allow_pre else finals).append(v)
+    return finals or pres
+
+# ----------------------------
+# Helpers: PEP 508 requirements
+# ----------------------------
+
+_REQ_RX = re.compile(
+    r"""^\s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)
+        \s*(?:\[(?P<extras>[^\]]*)\])?
+        \s*(?P<rest>.*?)\s*$""",
+    re.VERBOSE
+)
+
+
+def _canonical_name(name):
+    """PEP 503 normalized project name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
 
-        for (mj, mn) in ladder:
-            for a in arch_opts:
-                tags.add(f"macosx_{mj}_{mn}_{a}")
 
+def _parse_requirement(text):
+    """
+    Parse a PEP 508 requirement string.
+    Returns dict(name, extras, specs, url, marker) or None if it is malformed.
+    """
+    m = _REQ_RX.match(text)
+    if not m:
+        return None
+    rest = m.group("rest")
+    url = None
+    marker = None
+    if rest.startswith("@"):
+        # URL form: the marker separator must be preceded by whitespace
+        url_match = re.match(r"^@\s*(\S+)(?:\s+;\s*(.*))?$", rest)
+        if not url_match:
+            return None
+        url = url_match.group(1)
+        marker = (url_match.group(2) or "").strip() or None
+        specs = []
     else:
-        # Linux & others
-        # Wheels commonly have manylinux*/musllinux*/linux_* tags.
-        # We accept general linux tags for the matching arch.
-        if arch in ("x86_64", "arm64", "i386", "armv7l"):
-            tags.add(f"linux_{arch}")
-            # manylinux / musllinux (broad acceptance for our purposes)
-            tags.update({
-                f"manylinux1_{arch}", f"manylinux2010_{arch}", f"manylinux2014_{arch}",
-                f"manylinux_2_17_{arch}", f"manylinux_2_28_{arch}",
-                f"musllinux_1_1_{arch}"
-            })
+        spec_part, _, marker_part = rest.partition(";")
+        specs = _parse_specifiers(spec_part)
+        if specs is None:
+            return None
+        marker = marker_part.strip() or None
+    extras = sorted({e.strip().lower() for e in (m.group("extras") or "").split(",") if e.strip()})
+    return {"name": m.group("name"), "extras": extras, "specs": specs, "url": url, "marker": marker}
 
-    return tags
 
-_PY_TAGS, _ABI_TAGS = _py_tags()
-_PLAT_TAGS = _platform_tags()
+def _format_requirement(req, specs=None):
+    specs = req["specs"] if specs is None else specs
+    extras = f"[{','.join(req['extras'])}]" if req["extras"] else ""
+    return f"{req['name']}{extras}{','.join(op + ver for op, ver in specs)}"
 
 # ----------------------------
-# Helpers: wheel parsing/check
+# Helpers: PEP 508 markers
 # ----------------------------
 
-_WHEEL_RX = re.compile(
-    r"""^(?P<namever>.+?)-
-        (?P<pyver>[A-Za-z0-9\.]+)-
-        (?P<abi>[A-Za-z0-9\.]+)-
-        (?P<plat>[A-Za-z0-9\._]+)
-        \.whl$""",
+_MARKER_TOKEN_RX = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\()|(?P<rparen>\))|
+        (?P<string>'[^']*'|"[^"]*")|
+        (?P<op>===|==|!=|<=|>=|~=|<|>|not\s+in\b|in\b)|
+        (?P<bool>and\b|or\b)|
+        (?P<var>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
     re.VERBOSE
 )
 
-def _wheel_tags_from_filename(filename):
+_MARKER_ENV = None
+
+
+def _marker_environment():
+    """PEP 508 environment of the running (target) interpreter."""
+    global _MARKER_ENV
+    if _MARKER_ENV is None:
+        iver = sys.implementation.version
+        impl_version = f"{iver.major}.{iver.minor}.{iver.micro}"
+        if iver.releaselevel != "final":
+            impl_version += iver.releaselevel[0] + str(iver.serial)
+        _MARKER_ENV = {
+            "implementation_name": sys.implementation.name,
+            "implementation_version": impl_version,
+            "os_name": os.name,
+            "platform_machine": platform.machine(),
+            "platform_release": platform.release(),
+            "platform_system": platform.system(),
+            "platform_version": platform.version(),
+            "python_full_version": platform.python_version(),
+            "platform_python_implementation": platform.python_implementation(),
+            "python_version": ".".join(platform.python_version_tuple()[:2]),
+            "sys_platform": sys.platform,
+        }
+    return _MARKER_ENV
+
+
+def _tokenize_marker(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _MARKER_TOKEN_RX.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Invalid marker near: {text[pos:]!r}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "op":
+            value = re.sub(r"\s+", " ", value)
+        tokens.append((kind, value))
+        pos = m.end()
+    return tokens
+
+
+def _marker_compare(lhs, op, rhs):
+    """Version-aware when both sides parse as versions, plain string ops otherwise."""
+    if op in ("in", "not in"):
+        return (lhs in rhs) if op == "in" else (lhs not in rhs)
+    candidate = _parse_version(lhs)
+    if candidate is not None and (op == "===" or _parse_specifiers(op + rhs)):
+        # Markers always accept pre-releases (python_full_version may be an rc)
+        return _spec_contains(op, rhs, candidate)
+    return {"==": lhs == rhs, "!=": lhs != rhs, "<": lhs < rhs, "<=": lhs <= rhs,
+            ">": lhs > rhs, ">=": lhs >= rhs}.get(op, False)
+
+
+def _evaluate_marker(text, extras=None):
     """
-    Parse a wheel filename and return (py_tags, abi_tags, plat_tags) as sets.
-    Supports multiple dot-separated tags in each field.
+    Evaluate a PEP 508 marker for the running interpreter.
+    'extra' is compared against each requested extra (any match wins).
+    Raises ValueError on malformed markers.
     """
-    m = _WHEEL_RX.match(filename)
-    if not m:
-        return set(), set(), set()
+    tokens = _tokenize_marker(text)
+    env = dict(_marker_environment())
+    extra_values = [_canonical_name(e) for e in (extras or [])] or [""]
+    pos = 0
 
-    py = set(m.group("pyver").split("."))
-    abi = set(m.group("abi").split("."))
-    plat = set(m.group("plat").split("."))
-    return py, abi, plat
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
 
-def _is_wheel_compatible(filename):
+    def take(kind=None):
+        nonlocal pos
+        tok = peek()
+        if tok[0] is None or (kind and tok[0] != kind):
+            raise ValueError(f"Invalid marker: {text!r}")
+        pos += 1
+        return tok
+
+    def value():
+        kind, val = take()
+        if kind == "string":
+            return ("str", val[1:-1])
+        if kind == "var":
+            if val != "extra" and val not in env:
+                raise ValueError(f"Unknown marker variable: {val}")
+            return ("var", val)
+        raise ValueError(f"Invalid marker: {text!r}")
+
+    def resolve(item, extra):
+        kind, val = item
+        if kind == "str":
+            return val
+        return extra if val == "extra" else env[val]
+
+    def atom():
+        if peek()[0] == "lparen":
+            take("lparen")
+            result = expr()
+            take("rparen")
+            return result
+        lhs = value()
+        _, op = take("op")
+        rhs = value()
+        if "extra" in (lhs[1] if lhs[0] == "var" else None, rhs[1] if rhs[0] == "var" else None):
+            normalized = [(k, _canonical_name(v) if k == "str" else v) for k, v in (lhs, rhs)]
+            return any(_marker_compare(resolve(normalized[0], e), op, resolve(normalized[1], e))
+                       for e in extra_values)
+        return _marker_compare(resolve(lhs, ""), op, resolve(rhs, ""))
+
+    def and_expr():
+        result = atom()
+        while peek() == ("bool", "and"):
+            take()
+            result = atom() and result
+        return result
+
+    def expr():
+        result = and_expr()
+        while peek() == ("bool", "or"):
+            take()
+            result = and_expr() or result
+        return result
+
+    result = expr()
+    if pos != len(tokens):
+        raise ValueError(f"Invalid marker: {text!r}")
+    return result
+
+# ----------------------------
+# Helpers: requirements files
+# ----------------------------
+
+def _iter_requirement_lines(req_path, constraint=False, _seen=None):
     """
-    Compatibility heuristic:
-    - If platform contains 'any' and abi contains 'none' -> pure python; require python tag match.
-    - Otherwise require:
-        * python tag matches one of our _PY_TAGS
-        * abi is one of our _ABI_TAGS (or contains 'none' when pure)
-        * platform tag matches one of our _PLAT_TAGS
-      We accept compatibility if ANY combination in dot-sets intersect suitably.
+    Yield (line_text, is_constraint, note) for every requirement in req_path,
+    following '-r'/'--requirement' and '-c'/'--constraint' includes (relative
+    to the including file), joining '\\' continuations and dropping comments
+    and per-requirement options such as '--hash=...'.
+    Global pip options (-i, --index-url, -f, ...) are skipped; 'note' is set
+    for lines that cannot be checked (missing include, editable install).
     """
-    py_tags, abi_tags, plat_tags = _wheel_tags_from_filename(filename)
-    if not py_tags and not abi_tags and not plat_tags:
-        return False
+    _seen = set() if _seen is None else _seen
+    real = os.path.realpath(req_path)
+    if real in _seen:
+        return
+    _seen.add(real)
 
-    # Python tag match
-    if not (py_tags & _PY_TAGS):
-        # Handle py2.py3 style combo: if it contains 'py3' and we're py3, accept.
-        if f"py{sys.version_info[0]}" not in py_tags:
-            return False
+    with open(req_path, "r", encoding="utf-8") as file:
+        logical, pending = [], ""
+        for raw_line in file:
+            line = raw_line.rstrip("\r\n")
+            if line.endswith("\\"):
+                pending += line[:-1] + " "
+                continue
+            logical.append(pending + line)
+            pending = ""
+        if pending:
+            logical.append(pending)
+
+    base_dir = os.path.dirname(req_path)
+    for line in logical:
+        # Comments start at line begin or after whitespace
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if not line:
+            continue
+
+        include = re.match(r"^(-r|--requirement|-c|--constraint)(?:\s*=\s*|\s+)(\S+)$", line)
+        if include:
+            flag, target = include.groups()
+            target = os.path.join(base_dir, target) if not os.path.isabs(target) else target
+            nested_constraint = constraint or flag in ("-c", "--constraint")
+            if not os.path.isfile(target):
+                yield (f"{flag} {include.group(2)}", nested_constraint, f"include not found: {target}")
+                continue
+            yield from _iter_requirement_lines(target, nested_constraint, _seen)
+            continue
+
+        if line.startswith("-"):
+            if line.startswith(("-e", "--editable")):
+                yield (line, constraint, "editable requirements are not checked against PyPI")
+            continue  # global pip options
+
+        # Strip per-requirement options: 'pkg==1.0 --hash=sha256:...'
+        line = re.split(r"\s+--?[A-Za-z]", line, maxsplit=1)[0].strip()
+        yield (line, constraint, None)
+
+# ----------------------------
+# Helpers: PyPI release data
+# ----------------------------
+
+# DX_PYPI_URL points the validator at a mirror or at local_index_server.py
+PYPI_URL = os.environ.get("DX_PYPI_URL", "https://pypi.org").rstrip("/")
+PYPI_JSON_URL = PYPI_URL + "/pypi/{}/json"
+PYPI_RELEASE_JSON_URL = PYPI_URL + "/pypi/{}/{}/json"
+
+
+def _fetch_json(url, pkg):
+    """
+    GET a PyPI JSON document.
+    Returns (data, ssl_warning, error_message).
+    """
+    try:
+        with urllib.request.urlopen(url, context=_default_ctx) as resp:
+            return json.load(resp), False, None
+    except urllib.error.URLError as e:
+        # Attempt insecure fallback for problematic cert stores
+        if isinstance(getattr(e, "reason", None), ssl.SSLError):
+            try:
+                insecure_ctx = ssl._create_unverified_context()
+                with urllib.request.urlopen(url, context=insecure_ctx) as resp:
+                    return json.load(resp), True, None
+            except Exception as fe:
+                return None, False, f"❌ SSL error checking {pkg}: {fe}"
+        return None, False, f"❌ URLError checking {pkg}: {e}"
+    except Exception as e:
+        return None, False, f"❌ Error checking {pkg}: {e}"
+
+
+def _fetch_project(pkg):
+    """Project-level JSON (all releases and their files)."""
+    return _fetch_json(PYPI_JSON_URL.format(pkg), pkg)
+
+
+def _fetch_requires_dist(pkg, version):
+    """
+    Release-level JSON for pkg==version.
+    Returns (requires_dist list, error_message).
+    """
+    data, _, error = _fetch_json(PYPI_RELEASE_JSON_URL.format(pkg, version), pkg)
+    if error:
+        return None, error
+    if not data:
+        return None, f"❌ No data returned for {pkg}=={version}"
+    return (data.get("info") or {}).get("requires_dist") or [], None
+
+
+def _store_project(projects, name, fetched):
+    """Cache a _fetch_project() result as a project dict, or an error string."""
+    data, ssl_warning, error = fetched
+    key = _canonical_name(name)
+    if error:
+        projects[key] = error
+    elif not data:
+        projects[key] = f"❌ No data returned for {name}"
+    else:
+        projects[key] = {"data": data, "releases": _release_index(data), "ssl_warning": ssl_warning}
+    return projects[key]
+
+
+def _release_index(data):
+    """
+    Parse every release key of a PyPI JSON document once.
+    Returns a list of (_Version, files) sorted newest first; yanked-only
+    releases and non-PEP 440 keys are dropped.
+    """
+    parsed = []
+    for ver_text, files in (data.get("releases") or {}).items():
+        ver = _parse_version(ver_text)
+        if ver is None:
+            continue
+        if files and all(f.get("yanked") for f in files):
+            continue
+        parsed.append((ver, files))
+    parsed.sort(key=lambda item: item[0].key, reverse=True)
+    return parsed
+
+
+def _wheel_summary(files):
+    """(compatible, has_wheels) for a release's file list."""
+    wheels = [f for f in files if f.get("filename", "").endswith(".whl")]
+    return any(_is_wheel_compatible(w.get("filename", "")) for w in wheels), bool(wheels)
+
+
+def _check_requirement(req, constraint_specs, project):
+    """
+    Resolve one parsed requirement against its project's release index and
+    return (status message, resolved version or None).
+    """
+    pkg = req["name"]
+    specs = list(req["specs"]) + list(constraint_specs)
+    display = _format_requirement(req, specs)
+    releases = project["releases"]
+    finals = [ver for ver, _ in releases if not ver.is_prerelease]
+    latest = str((finals or [ver for ver, _ in releases] or ["N/A"])[0])
+    pinned = len(specs) == 1 and specs[0][0] in ("==", "===") and not specs[0][1].endswith(".*")
+
+    files_by_version = {ver: files for ver, files in releases}
+    matches = _filter_versions(specs, [ver for ver, _ in releases])
+    if pinned and not matches:
+        # Exact pins may point at yanked releases; pip still installs those
+        raw = (project["data"].get("releases") or {}).get(specs[0][1])
+        pinned_version = _parse_version(specs[0][1])
+        if raw is not None and pinned_version is not None:
+            matches = [pinned_version]
+            files_by_version[pinned_version] = raw
+
+    if not matches:
+        if pinned:
+            return f"❌ {pkg}=={specs[0][1]} not found (latest: {latest})", None
+        return f"❌ {display} matches no release (latest: {latest})", None
+
+    best = matches[0]
+    compatible, has_wheels = _wheel_summary(files_by_version[best])
+    label = f"{pkg}=={best}" if pinned else f"{display} → {best}"
+    if compatible:
+        return f"✅ {label} is available and compatible", best
+    if not pinned:
+        # Ranged requirement: pip may fall back to an older matching wheel
+        for older in matches[1:]:
+            if _wheel_summary(files_by_version[older])[0]:
+                return f"⚠️ {label} has no compatible wheel; newest compatible match is {older}", older
+    if has_wheels:
+        return f"⚠️ {label} exists but has NO compatible wheel for this platform", best
+    return f"⚠️ {label} exists but only as source (no wheels)", best
+
+# ----------------------------
+# Helpers: dependency closure
+# ----------------------------
+
+CLOSURE_WORKERS = 8  # parallel metadata fetches per dependency level
+
+_PYTHON_VERSION = None
 
-    # Platform/ABI handling
-    # Pure-python case:
-    if ("any" in plat_tags) and ("none" in abi_tags):
+
+def _python_compatible(requires_python):
+    """True if a file's 'requires_python' admits the running interpreter."""
+    global _PYTHON_VERSION
+    if not requires_python:
         return True
+    specs = _parse_specifiers(requires_python)
+    if not specs:
+        return True  # unparseable metadata: let pip decide
+    if _PYTHON_VERSION is None:
+        _PYTHON_VERSION = _parse_version(platform.python_version())
+    return all(_spec_contains(op, ver, _PYTHON_VERSION) for op, ver in specs)
 
-    # ABI match (cpXY or abi3)
-    if not (abi_tags & _ABI_TAGS):
-        return False
 
-    # Platform match
-    if not (plat_tags & _PLAT_TAGS):
-        return False
+def _pick_installable(specs, project):
+    """
+    The version pip would pick for a dependency: the newest matching release
+    that has a compatible wheel or, failing that, an sdist it could build.
+    Returns (version, needs_build) or (None, False).
+    """
+    files_by_version = dict(project["releases"])
+    for ver in _filter_versions(specs, list(files_by_version)):
+        files = [f for f in files_by_version[ver] if _python_compatible(f.get("requires_python"))]
+        if any(_is_wheel_compatible(f.get("filename", "")) for f in files):
+            return ver, False
+        if any(f.get("packagetype") == "sdist" or f.get("filename", "").endswith((".tar.gz", ".zip"))
+               for f in files):
+            return ver, True
+    return None, False
 
-    return True
+
+def _format_path(path):
+    return " → ".join(path)
+
+
+def _check_closure(roots, projects, constraints):
+    """
+    Walk requires_dist metadata from the resolved top-level pins, level by
+    level, fetching each level's metadata in parallel. Markers are evaluated
+    for the running interpreter (with the extras requested by the parent).
+    Returns (status messages, complete); stops at the first node with no
+    installable release for this interpreter and reports its dependency path.
+    'complete' is False when a metadata fetch failed, so the verdict must not
+    be cached.
+    """
+    chosen = {}     # canonical name -> _Version picked for it
+    metadata = {}   # (canonical name, version text) -> (requires_dist, error)
+    seen = set()    # (canonical name, version text, extras)
+    source_builds = []
+    queue = []
+    for req, version in roots:
+        chosen[_canonical_name(req["name"])] = version
+        queue.append((req["name"], version, tuple(req["extras"]), (f"{req['name']}=={version}",)))
+
+    with ThreadPoolExecutor(max_workers=CLOSURE_WORKERS) as pool:
+        while queue:
+            level = []
+            for node in queue:
+                node_key = (_canonical_name(node[0]), str(node[1]), node[2])
+                if node_key not in seen:
+                    seen.add(node_key)
+                    level.append(node)
+
+            # 1) requires_dist of every node on this level, in parallel
+            missing = sorted({(_canonical_name(name), str(ver)): name for name, ver, _, _ in level
+                              if (_canonical_name(name), str(ver)) not in metadata}.items())
+            fetched = pool.map(lambda item: _fetch_requires_dist(item[1], item[0][1]), missing)
+            for (meta_key, _), result in zip(missing, fetched):
+                metadata[meta_key] = result
+
+            # 2) dependencies that apply to this interpreter
+            deps = []
+            for name, ver, extras, path in level:
+                requires, error = metadata[(_canonical_name(name), str(ver))]
+                if error:
+                    return [f"❌ Dependency closure: no metadata for {name}=={ver} ({error}) "
+                            f"[path: {_format_path(path)}]"], False
+                for text in requires:
+                    dep = _parse_requirement(text)
+                    if dep is None or dep["url"]:
+                        continue
+                    if dep["marker"]:
+                        try:
+                            if not _evaluate_marker(dep["marker"], extras):
+                                continue
+                        except ValueError:
+                            continue
+                    deps.append((path, dep))
+
+            # 3) release lists of newly seen projects, in parallel
+            new_names = sorted({_canonical_name(dep["name"]): dep["name"] for _, dep in deps
+                                if _canonical_name(dep["name"]) not in projects}.items())
+            for (_, name), result in zip(new_names, pool.map(lambda item: _fetch_project(item[1]), new_names)):
+                _store_project(projects, name, result)
+
+            # 4) resolve each dependency against its cached release list
+            queue = []
+            for path, dep in deps:
+                key = _canonical_name(dep["name"])
+                dep_path = path + (_format_requirement(dep),)
+                project = projects[key]
+                if isinstance(project, str):
+                    return [f"❌ Dependency closure: {project} [path: {_format_path(dep_path)}]"], False
+                if key in chosen:
+                    version = chosen[key]
+                    if not _filter_versions(dep["specs"], [version]):
+                        return [f"❌ Dependency closure: {_format_requirement(dep)} conflicts with "
+                                f"{dep['name']}=={version} [path: {_format_path(dep_path)}]"], True
+                else:
+                    version, needs_build = _pick_installable(dep["specs"] + constraints.get(key, []), project)
+                    if version is None:
+                        return [f"❌ Dependency closure: {_format_requirement(dep)} has no installable "
+                                f"release for this interpreter [path: {_format_path(dep_path)}]"], True
+                    chosen[key] = version
+                    if needs_build:
+                        source_builds.append(dep_path[:-1] + (f"{dep['name']}=={version}",))
+                queue.append((dep["name"], version, tuple(dep["extras"]),
+                              dep_path[:-1] + (f"{dep['name']}=={version}",)))
+
+    messages = [f"⚠️ Dependency closure: {path[-1]} needs a source build (no compatible wheel) "
+                f"[path: {_format_path(path)}]" for path in source_builds]
+    messages.append(f"✅ Dependency closure: {len(chosen)} packages resolved, "
+                    f"{len(chosen) - len(source_builds)} with compatible wheels")
+    return messages, True
+
+# ----------------------------
+# Helpers: incremental cache
+# ----------------------------
+
+CACHE_FILENAME = ".requirements_validation_cache.json"
+CACHE_TTL_SECONDS = 6 * 60 * 60  # re-check a cached verdict after this long (new releases, yanks)
+CACHE_VERSION = 2  # bump when the entry layout changes
+VALIDATOR_ID = "withOUT-packaging"
+
+
+def _environment_fingerprint():
+    """Short hash of the interpreter version and its ordered wheel tags."""
+    text = f"{sys.implementation.name} {platform.python_version()}\n" + "\n".join("-".join(tag) for tag in _sys_tags())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _load_cache(cache_path):
+    """Previous verdicts {key: {"message", "resolved", "detail", "checked"}}; empty on any problem."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("entries", {}) if data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_cache(cache_path, entries):
+    """Write verdicts atomically, dropping expired ones. Failures are ignored."""
+    now = time.time()
+    live = {k: v for k, v in entries.items() if now - v.get("checked", 0) < CACHE_TTL_SECONDS}
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": live}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def _cached(cache, key, now):
+    entry = cache.get(key)
+    if entry and now - entry.get("checked", 0) < CACHE_TTL_SECONDS:
+        return entry
+    return None
+
+def _requirement_key(req, constraint_specs):
+    """Normalized requirement text: canonical name, extras, sorted specifiers, marker."""
+    specs = sorted(op + ver for op, ver in list(req["specs"]) + list(constraint_specs))
+    marker = re.sub(r"\s+", " ", req["marker"] or "").strip()
+    return f"{_canonical_name(req['name'])}[{','.join(req['extras'])}]{','.join(specs)};{marker}"
+
+
+# ----------------------------
+# Helpers: JSON report
+# ----------------------------
+
+REPORT_STATUS = {"✅": "ok", "⚠": "warning", "❌": "error", "⏭": "skipped"}
+
+
+def _file_summary(f):
+    digests = f.get("digests") or {}
+    return {"filename": f.get("filename"), "size": f.get("size"),
+            "sha256": digests.get("sha256"), "url": f.get("url")}
+
+
+def _release_detail(project, version):
+    """
+    Download facts for a resolved release: the wheel pip would pick (best tag
+    rank among files whose requires_python admits this interpreter), the sdist,
+    and the release's requires_python.
+    """
+    files = (project["data"].get("releases") or {}).get(str(version)) or []
+    wheel, wheel_rank = None, None
+    for f in files:
+        if not _python_compatible(f.get("requires_python")):
+            continue
+        rank = _wheel_rank(f.get("filename", ""))
+        if rank is not None and (wheel_rank is None or rank < wheel_rank):
+            wheel, wheel_rank = f, rank
+    sdist = next((f for f in files if f.get("packagetype") == "sdist"
+                  or f.get("filename", "").endswith((".tar.gz", ".zip"))), None)
+    requires_python = next((f["requires_python"] for f in ([wheel] if wheel else []) + files
+                            if f.get("requires_python")), None)
+    return {
+        "requires_python": requires_python,
+        "wheel": wheel and _file_summary(wheel),
+        "sdist": sdist and _file_summary(sdist),
+        "source_only": wheel is None and sdist is not None,
+    }
+
+
+def _result(line, name, message, resolved=None, detail=None):
+    """One report row; status is read off the message's leading emoji."""
+    row = {"line": line, "name": name, "status": REPORT_STATUS.get(message[:1], "info"),
+           "message": message, "resolved_version": resolved}
+    row.update(detail or {"requires_python": None, "wheel": None, "sdist": None, "source_only": False})
+    return row
+
+
+def _build_report(results, closure_messages, reused):
+    """Rows plus totals: verdict counts, bytes pip would download, source-only count."""
+    totals = {"requirements": len(results), "ok": 0, "warning": 0, "error": 0, "skipped": 0,
+              "download_bytes": 0, "source_only": 0}
+    for row in results:
+        if row["status"] in totals:
+            totals[row["status"]] += 1
+        download = row["wheel"] or row["sdist"]
+        if row["resolved_version"] and download:
+            totals["download_bytes"] += download.get("size") or 0
+        if row["resolved_version"] and row["source_only"]:
+            totals["source_only"] += 1
+    return {
+        "validator": VALIDATOR_ID,
+        "index": PYPI_URL,
+        "requirements": results,
+        "dependencies": [{"status": REPORT_STATUS.get(m[:1], "info"), "message": m} for m in closure_messages],
+        "cached": reused,
+        "totals": totals,
+    }
 
 # --------------------------------------
-# Pythoner lifecycle wrappers (unchanged)
+# Pythoner lifecycle wrappers
 # --------------------------------------
 
-def python_init(project_path, trigger):
+def python_init(project_path, trigger, check_dependencies=0, json_report=0):
     return
 
-def python_main(project_path, trigger):
+def python_main(project_path, trigger, check_dependencies=0, json_report=0):
     """
-    Validates versions listed in requirements.txt using PyPI API.
-    Checks if version exists AND if a compatible wheel is likely available.
+    Validates requirements.txt against the PyPI API.
+    Accepts PEP 508 lines (specifiers, extras, environment markers) and follows
+    -r/-c includes. Each project's release list is fetched once and every
+    specifier set is resolved against it to a concrete best version, which is
+    then checked for a compatible wheel using pip's tag order (see _sys_tags).
+    With check_dependencies set, the requires_dist closure of the resolved pins
+    is crawled as well (see _check_closure).
+    Verdicts are persisted in CACHE_FILENAME next to requirements.txt; only new
+    or edited lines (or verdicts older than CACHE_TTL_SECONDS) hit the index.
+    With json_report set, returns a JSON document instead (see _build_report):
+    per-requirement status, resolved version, chosen wheel with size/sha256,
+    requires_python, plus download-size and source-only totals.
     """
     if not trigger:
         return "❌"
@@ -212,76 +1366,93 @@ def python_main(project_path, trigger):
     if not os.path.isfile(req_path):
         return f"Error: requirements.txt not found at {req_path}"
 
-    status_messages = []
-    with open(req_path, 'r', encoding="utf-8") as file:
-        for raw_line in file:
-            line = raw_line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            match = re.match(r'^([a-zA-Z0-9_\-]+)==([\d\.]+)$', line)
-            if not match:
-                status_messages.append(f"⚠️ Unrecognized format: {line}")
-                continue
+    results = []            # report rows, in file order
+    requirements = []       # (line, parsed requirement or queued message), in file order
+    constraints = {}        # canonical name -> [(op, ver), ...]
+    for line, is_constraint, note in _iter_requirement_lines(req_path):
+        if note:
+            requirements.append((line, f"⚠️ {line}: {note}"))
+            continue
+        req = _parse_requirement(line)
+        if req is None:
+            requirements.append((line, f"⚠️ Unrecognized format: {line}"))
+            continue
+        if is_constraint:
+            constraints.setdefault(_canonical_name(req["name"]), []).extend(req["specs"])
+        else:
+            requirements.append((line, req))
 
-            pkg, version = match.groups()
-            url = f"https://pypi.org/pypi/{pkg}/json"
-            data = None
-            ssl_warning = False
+    projects = {}           # canonical name -> {"data", "releases", "ssl_warning"} or error str
+    roots = []              # (requirement, resolved _Version) for the closure check
 
+    # Verdicts from earlier runs, keyed by normalized requirement + interpreter/tag fingerprint
+    cache_path = os.path.join(project_path, CACHE_FILENAME)
+    cache = _load_cache(cache_path)
+    fingerprint = _environment_fingerprint()
+    now = time.time()
+    reused = 0
+    for line, req in requirements:
+        if isinstance(req, str):
+            results.append(_result(line, None, req))
+            continue
+        if req["marker"]:
             try:
-                with urllib.request.urlopen(url, context=_default_ctx) as resp:
-                    data = json.load(resp)
-            except urllib.error.URLError as e:
-                # Attempt insecure fallback for problematic cert stores
-                if isinstance(getattr(e, "reason", None), ssl.SSLError):
-                    try:
-                        insecure_ctx = ssl._create_unverified_context()
-                        with urllib.request.urlopen(url, context=insecure_ctx) as resp:
-                            data = json.load(resp)
-                            ssl_warning = True
-                    except Exception as fe:
-                        status_messages.append(f"❌ SSL error checking {pkg}: {fe}")
-                        continue
-                else:
-                    status_messages.append(f"❌ URLError checking {pkg}: {e}")
-                    continue
-            except Exception as e:
-                status_messages.append(f"❌ Error checking {pkg}: {e}")
+                applies = _evaluate_marker(req["marker"], req["extras"])
+            except ValueError as e:
+                results.append(_result(line, req["name"], f"⚠️ Unrecognized format: {line} ({e})"))
                 continue
-
-            if not data:
-                status_messages.append(f"❌ No data returned for {pkg}")
+            if not applies:
+                results.append(_result(line, req["name"], f"⏭️ {line} skipped (marker does not apply to this interpreter)"))
                 continue
 
-            releases = data.get("releases", {})
-            available_versions = list(releases.keys())
+        if req["url"]:
+            results.append(_result(line, req["name"], f"⚠️ {req['name']} @ {req['url']} is a direct reference; not checked against PyPI"))
+            continue
 
-            if version in releases:
-                files = releases.get(version, [])
-                wheels = [f for f in files if f.get("filename", "").endswith(".whl")]
+        key = _canonical_name(req["name"])
+        line_key = _cache_key(VALIDATOR_ID, fingerprint, _requirement_key(req, constraints.get(key, [])))
+        entry = _cached(cache, line_key, now)
+        if entry is None:
+            project = projects.get(key) or _store_project(projects, req["name"], _fetch_project(req["name"]))
+            if isinstance(project, str):
+                results.append(_result(line, req["name"], project))  # network errors are never cached
+                continue
+            msg, resolved = _check_requirement(req, constraints.get(key, []), project)
+            if project["ssl_warning"]:
+                msg += " (SSL fallback used)"
+            detail = _release_detail(project, resolved) if resolved else None
+            entry = cache[line_key] = {"message": msg, "resolved": resolved and str(resolved),
+                                       "detail": detail, "checked": now}
+        else:
+            reused += 1
 
-                compatible = False
-                for wh in wheels:
-                    fname = wh.get("filename", "")
-                    if _is_wheel_compatible(fname):
-                        compatible = True
-                        break
+        results.append(_result(line, req["name"], entry["message"], entry["resolved"], entry["detail"]))
+        if entry["resolved"]:
+            roots.append((req, _parse_version(entry["resolved"])))
 
-                if compatible:
-                    msg = f"✅ {pkg}=={version} is available and compatible"
-                elif wheels:
-                    msg = f"⚠️ {pkg}=={version} exists but has NO compatible wheel for this platform"
-                else:
-                    msg = f"⚠️ {pkg}=={version} exists but only as source (no wheels)"
-            else:
-                latest = sorted(available_versions)[-1] if available_versions else "N/A"
-                msg = f"❌ {pkg}=={version} not found (latest: {latest})"
+    closure_messages = []
+    if check_dependencies and roots:
+        # Constraints narrow the versions picked for dependencies too, so they are part of the key
+        closure_key = _cache_key(VALIDATOR_ID, fingerprint, "closure", *sorted(
+            f"{_canonical_name(req['name'])}[{','.join(req['extras'])}]=={ver}" for req, ver in roots), *sorted(
+            f"-c {key}{','.join(sorted(op + ver for op, ver in specs))}" for key, specs in constraints.items()))
+        entry = _cached(cache, closure_key, now)
+        if entry is None:
+            messages, complete = _check_closure(roots, projects, constraints)
+            entry = {"messages": messages, "checked": now}
+            if complete:
+                cache[closure_key] = entry
+        else:
+            reused += 1
+        closure_messages = entry["messages"]
 
-            if ssl_warning:
-                msg += " (SSL fallback used)"
+    _save_cache(cache_path, cache)
+    if json_report:
+        return json.dumps(_build_report(results, closure_messages, reused), ensure_ascii=False, indent=2)
 
-            status_messages.append(msg)
+    status_messages = [row["message"] for row in results] + closure_messages
+    if reused:
+        status_messages.append(f"ℹ️ {reused} unchanged result(s) reused from {CACHE_FILENAME}")
 
     return "\n".join(status_messages) if status_messages else "✅ All entries valid."
 
@@ -290,5 +1461,5 @@ def python_finalize():
 
 if __name__ == '__main__':
     test_path = r"/your/project/path"
-    print(python_main(test_path, True))
+    print(python_main(test_path, True, True))
     python_finalize()